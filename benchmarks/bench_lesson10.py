@@ -0,0 +1,21 @@
+from harness import bench, import_lesson, lesson_file
+
+# lesson10: maturity scoring and diagnostic rule matching over a synthetic fleet
+
+def fleet_and_model(n: int):
+    fleet = import_lesson("lesson10", "fleet")
+    diag = import_lesson("lesson10", "ai_diagnose")
+    return diag, list(fleet.generate(n, seed=7)), diag.load_json(lesson_file("lesson10", "model.json"))
+
+@bench("lesson10.maturity_score", sizes=(100, 1_000, 10_000), unit="team")
+def maturity_score(n):
+    diag, teams, model = fleet_and_model(n)
+    scoring = import_lesson("lesson10", "scoring")
+    card = scoring.Scorecard(model)
+    return lambda: [diag.maturity_score(t["signals"], t["capabilities"], model, card) for t in teams]
+
+@bench("lesson10.rule_matches", sizes=(100, 1_000, 10_000), unit="team")
+def rule_matches(n):
+    diag, teams, model = fleet_and_model(n)
+    rules = model["rules"]
+    return lambda: [[r for r in rules if diag.rule_matches(r, t["signals"])] for t in teams]
@@ -0,0 +1,32 @@
+import os
+
+from harness import bench, import_lesson
+
+# lesson2/metrics_demo.py: synthetic event stream -> DataFrame -> DORA / SPACE / PVM metrics
+
+def metrics_demo():
+    os.environ.setdefault("MPLBACKEND", "Agg")          # the module imports pyplot at load time
+    return import_lesson("lesson2", "metrics_demo")
+
+@bench("lesson2.generate_events", sizes=(30, 365, 3650), requires=("pandas", "matplotlib"), unit="day")
+def generate_events(days):
+    md = metrics_demo()
+    return lambda: md.generate_events(days=days, seed=42)
+
+@bench("lesson2.compute_metrics", sizes=(30, 365, 3650), requires=("pandas", "matplotlib"), unit="day")
+def compute_metrics(days):
+    md = metrics_demo()
+    df = md.to_dataframe(md.generate_events(days=days, seed=42))
+
+    def run():
+        mttr = md.compute_mttr(df)
+        md.compute_deployments_per_day(df)
+        md.compute_activity_metrics(df)
+        md.compute_collaboration_metrics(df)
+        md.compute_satisfaction_metrics(df)
+        md.compute_efficiency_metrics(df)
+        md.compute_performance_metrics(df, mttr)
+        md.compute_pvm_vcr(df)
+        md.compute_pvm_iar(df, days)
+        md.compute_pvm_dtr(df)
+    return run
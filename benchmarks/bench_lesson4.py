@@ -0,0 +1,23 @@
+import time
+
+from harness import bench, import_lesson
+
+# lesson4: issuing (IdP) and verifying (API) HS256 access tokens
+
+def claims(i: int) -> dict:
+    now = int(time.time())
+    return {"iss": "http://127.0.0.1:8081", "aud": "cnpe-platform-api", "sub": f"user-{i}",
+            "team": "platform-team", "iat": now, "exp": now + 3600}
+
+@bench("lesson4.jwt_encode", sizes=(100, 1_000, 10_000), unit="token")
+def jwt_encode(n):
+    idp = import_lesson("lesson4", "idp_server")
+    payloads = [claims(i) for i in range(n)]
+    return lambda: [idp.jwt_encode(p) for p in payloads]
+
+@bench("lesson4.verify_jwt", sizes=(100, 1_000, 10_000), unit="token")
+def verify_jwt(n):
+    idp = import_lesson("lesson4", "idp_server")
+    api = import_lesson("lesson4", "api_server")
+    tokens = [idp.jwt_encode(claims(i)) for i in range(n)]
+    return lambda: [api.verify_jwt(t) for t in tokens]
@@ -0,0 +1,33 @@
+import atexit
+import os
+import random
+import shutil
+import tempfile
+
+from harness import bench, import_lesson
+
+# lesson6: SLI / error budget over a synthetic traffic log (one status per line)
+
+STATUSES = ["200"] * 90 + ["201"] * 4 + ["204"] * 2 + ["404"] * 2 + ["500", "503"]
+_tmp = tempfile.mkdtemp(prefix="bench-slo-")
+atexit.register(shutil.rmtree, _tmp, True)
+
+def traffic_log(lines: int) -> str:
+    path = os.path.join(_tmp, f"traffic-{lines}.log")
+    if not os.path.exists(path):
+        rng = random.Random(42)
+        with open(path, "w") as f:
+            f.write("\n".join(rng.choice(STATUSES) for _ in range(lines)) + "\n")
+    return path
+
+@bench("lesson6.slo_in_memory", sizes=(10_000, 100_000, 1_000_000), requires=("yaml",), unit="request")
+def slo_in_memory(lines):
+    calc = import_lesson("lesson6", "calculate_slo")
+    path = traffic_log(lines)
+    return lambda: calc.count_in_memory(path)
+
+@bench("lesson6.slo_stream", sizes=(10_000, 100_000, 1_000_000), unit="request")
+def slo_stream(lines):
+    stream = import_lesson("lesson6", "slo_stream")
+    path = traffic_log(lines)
+    return lambda: stream.count_file(path, workers=1)
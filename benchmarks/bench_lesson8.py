@@ -0,0 +1,38 @@
+import copy
+import random
+
+from harness import bench, import_lesson, lesson_file
+
+# lesson8: gateway routing decisions and config guardrails
+
+def configs():
+    gateway = import_lesson("lesson8", "gateway")
+    return gateway, [gateway.load_config(lesson_file("lesson8", "configs", f"{n}.yaml"))
+                     for n in ("canary", "bluegreen")]
+
+@bench("lesson8.route_request", sizes=(1_000, 10_000, 100_000), requires=("yaml",), unit="request")
+def route_request(n):
+    gateway, (canary, bluegreen) = configs()
+    headers = [{"X-Canary": "true"} if i % 10 == 0 else None for i in range(n)]
+    cfgs = [canary if i % 2 else bluegreen for i in range(n)]
+
+    def run():
+        random.seed(1)
+        for cfg, h in zip(cfgs, headers):
+            gateway.route_request(cfg, h)
+    return run
+
+@bench("lesson8.validate_config", sizes=(1_000, 10_000, 100_000), requires=("yaml",), unit="config")
+def validate_config(n):
+    gateway, base = configs()
+    rng = random.Random(8)
+    cfgs = []
+    for i in range(n):
+        cfg = copy.deepcopy(base[i % 2])
+        cfg["service"] = f"svc-{i}"
+        if rng.random() < 0.2:
+            cfg["security"]["tls"] = False                       # some get rejected
+        if rng.random() < 0.1:
+            cfg["host"] = f"svc-{i}.example.com"
+        cfgs.append(cfg)
+    return lambda: [gateway.validate_config(c) for c in cfgs]
@@ -0,0 +1,25 @@
+from harness import bench, import_lesson
+
+# lesson9: EventBus.publish fan-out — one event delivered to N matching subscribers
+
+EVENTS = 1_000
+
+@bench("lesson9.publish_fanout", sizes=(1, 10, 100, 1_000), unit="delivery", per_size=EVENTS)
+def publish_fanout(subscribers):
+    bus_mod = import_lesson("lesson9", "bus")
+    schemas = import_lesson("lesson9", "schemas")
+    bus = bus_mod.EventBus()
+    delivered = [0]
+
+    def handler(_e):
+        delivered[0] += 1
+    patterns = ["deployment.failed", "deployment.*", "deployment.#", "*.failed", "#"]
+    for i in range(subscribers):
+        bus.subscribe(patterns[i % len(patterns)], handler, name=f"sub-{i}")
+    events = [schemas.PlatformEvent("deployment.failed", "github", f"svc{i % 20}", "prod", "1.2.4", f"run-{i}", {})
+              for i in range(EVENTS)]
+
+    def run():
+        for e in events:
+            bus.publish(e)
+    return run
@@ -0,0 +1,85 @@
+import gc
+import importlib.util
+import os
+import statistics
+import sys
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Sequence, Tuple
+
+# Benchmark registry + timing loop (asv / pytest-benchmark style, no dependencies).
+#
+# A benchmark is a setup function registered with @bench: it gets one size,
+# builds its data (not timed) and returns the zero-argument callable to time.
+#
+#   @bench("lesson8.route_request", sizes=(1_000, 10_000), unit="request")
+#   def route_request(n):
+#       gateway = import_lesson("lesson8", "gateway")
+#       cfg = ...
+#       return lambda: [gateway.route_request(cfg) for _ in range(n)]
+#
+# Lesson modules are imported inside the setup, so a missing optional
+# dependency (`requires`) skips the benchmark instead of the whole file.
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+class Benchmark(NamedTuple):
+    name: str
+    setup: Callable[[int], Callable[[], Any]]
+    sizes: Tuple[int, ...]
+    requires: Tuple[str, ...]
+    unit: str                     # what one item is, singular ("request")
+    per_size: int                 # items processed per unit of size (for the per-item column)
+
+BENCHMARKS: List[Benchmark] = []
+
+def bench(name: str, sizes: Sequence[int], requires: Sequence[str] = (), unit: str = "item", per_size: int = 1):
+    def register(setup: Callable[[int], Callable[[], Any]]):
+        BENCHMARKS.append(Benchmark(name, setup, tuple(sizes), tuple(requires), unit, per_size))
+        return setup
+    return register
+
+def import_lesson(lesson: str, module: str):
+    """Import `module` from lessonN/ the way its scripts do (sibling imports, relative data files)."""
+    path = os.path.join(REPO, lesson)
+    if path not in sys.path:
+        sys.path.insert(0, path)
+    return importlib.import_module(module)
+
+def lesson_file(lesson: str, *parts: str) -> str:
+    return os.path.join(REPO, lesson, *parts)
+
+def missing(requires: Sequence[str]) -> List[str]:
+    return [m for m in requires if importlib.util.find_spec(m) is None]
+
+def _run(fn: Callable[[], Any], loops: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(loops):
+        fn()
+    return time.perf_counter() - t0
+
+def measure(fn: Callable[[], Any], repeat: int = 5, min_time_s: float = 0.1) -> Dict[str, float]:
+    """
+    Seconds per call of fn: calls are looped until one sample takes at least
+    `min_time_s`, then `repeat` samples are taken with the GC off (like timeit).
+    """
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        fn()                                            # warm-up (imports, caches)
+        loops = 1
+        while True:
+            t = _run(fn, loops)
+            if t >= min_time_s or loops >= 1 << 20:
+                break
+            loops = min(1 << 20, max(loops * 2, int(loops * min_time_s / max(t, 1e-9) * 1.2)))
+        samples = [_run(fn, loops) / loops for _ in range(repeat)]
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return {
+        "median_s": statistics.median(samples),
+        "min_s": min(samples),
+        "stdev_s": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        "loops": loops,
+        "repeat": repeat,
+    }
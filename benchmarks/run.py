@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the lesson hot paths, with stored baselines and
+regression gating.
+
+  list      show every benchmark and its sizes
+  run       time them (each bench_*.py file in its own process) and write
+            results/latest.json; --save-baseline also writes the baseline
+            (with -k/--quick, only the entries that ran are updated),
+            --compare checks against it
+  compare   BASELINE CURRENT: exit 1 if anything got slower than --threshold,
+            or a benchmark the baseline timed now errors or is missing
+
+Benchmarks whose dependencies aren't installed are reported as skipped.
+Timings are per call of the benchmark body, median of --repeat samples; the
+per-item column divides by the items that call processed.
+
+Usage (from the repo root):
+  python3 benchmarks/run.py run --save-baseline          # on main
+  python3 benchmarks/run.py run --compare                # on a branch; exit 1 on >10% regressions
+  python3 benchmarks/run.py run -k lesson8 --quick
+  python3 benchmarks/run.py compare results/a.json results/b.json --threshold 0.05
+"""
+
+import argparse
+import fnmatch
+import glob
+import importlib.util
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+RESULTS = os.path.join(HERE, "results")
+MARK = "@@bench "
+
+def bench_files() -> List[str]:
+    # lesson order, not string order (lesson10 after lesson9)
+    natural = lambda p: [int(t) if t.isdigit() else t for t in re.split(r"(\d+)", os.path.basename(p))]
+    return sorted(glob.glob(os.path.join(HERE, "bench_*.py")), key=natural)
+
+def load(path: str):
+    sys.path.insert(0, HERE)
+    import harness
+    spec = importlib.util.spec_from_file_location(os.path.splitext(os.path.basename(path))[0], path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return harness
+
+def key(name: str, size: int) -> str:
+    return f"{name}[{size}]"
+
+def selected(name: str, pattern: Optional[str]) -> bool:
+    return pattern is None or pattern in name or fnmatch.fnmatch(name, pattern)
+
+# --- worker: runs inside a fresh process per bench file ---
+
+def worker(path: str, pattern: Optional[str], repeat: int, quick: bool, min_time_s: float) -> None:
+    harness = load(path)
+    for b in harness.BENCHMARKS:
+        if not selected(b.name, pattern):
+            continue
+        sizes = b.sizes[:2] if quick else b.sizes
+        absent = harness.missing(b.requires)
+        for size in sizes:
+            row = {"key": key(b.name, size), "name": b.name, "size": size, "unit": b.unit,
+                   "items": size * b.per_size}
+            if absent:
+                row["skipped"] = f"missing {', '.join(absent)}"
+            else:
+                try:
+                    row.update(harness.measure(b.setup(size), repeat, min_time_s))
+                except Exception as e:                 # a broken benchmark shouldn't hide the rest
+                    row["error"] = f"{type(e).__name__}: {e}"
+            print(MARK + json.dumps(row), flush=True)
+
+def run_file(path: str, args: argparse.Namespace) -> Iterator[dict]:
+    cmd = [sys.executable, os.path.abspath(__file__), "_worker", path, "--repeat", str(args.repeat),
+           "--min-time", str(args.min_time)] + (["-k", args.k] if args.k else []) + (["--quick"] if args.quick else [])
+    env = dict(os.environ, MPLBACKEND="Agg")
+    with tempfile.TemporaryDirectory(prefix="bench-") as tmp:
+        # benchmarks run in a scratch cwd so demo code that writes files doesn't touch the repo
+        proc = subprocess.Popen(cmd, cwd=tmp, env=env, stdout=subprocess.PIPE, text=True)
+        for line in proc.stdout:
+            if line.startswith(MARK):
+                yield json.loads(line[len(MARK):])
+        if proc.wait() != 0:
+            yield {"key": os.path.basename(path), "name": os.path.basename(path), "size": 0, "items": 0,
+                   "unit": "", "error": f"worker exited with {proc.returncode}"}
+
+# --- reporting ---
+
+def fmt_s(seconds: float) -> str:
+    for unit, scale in (("s", 1.0), ("ms", 1e-3), ("µs", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.3g}{unit}"
+    return f"{seconds * 1e9:.0f}ns"
+
+def print_row(r: dict) -> None:
+    if "median_s" in r:
+        per_item = r["median_s"] / r["items"] if r["items"] else 0.0
+        print(f"  {r['key']:<44} {fmt_s(r['median_s']):>9} ±{fmt_s(r['stdev_s']):>8}  "
+              f"{fmt_s(per_item):>8}/{r['unit']}")
+    else:
+        print(f"  {r['key']:<44} {'skipped: ' + r['skipped'] if 'skipped' in r else 'ERROR: ' + r['error']}")
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE, capture_output=True,
+                              text=True, timeout=10).stdout.strip()
+    except (OSError, subprocess.TimeoutExpired):
+        return ""
+
+def save(path: str, doc: dict) -> None:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(doc, f, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+def compare(base: dict, cur: dict, threshold: float, stat: str = "median_s") -> int:
+    """
+    Print old vs new per benchmark; returns the number of regressions. A
+    benchmark the baseline timed that now errors or didn't run counts as one;
+    only dependency skips are exempt.
+    """
+    if base.get("machine") != cur.get("machine"):
+        print(f"⚠️  baseline is from {base.get('machine')!r}, this run from {cur.get('machine')!r}: "
+              f"timings may not be comparable")
+    print(f"\nvs baseline {base.get('commit') or '?'} ({base.get('created', '?')}), "
+          f"threshold {threshold:.0%} on {stat.replace('_s', '')}")
+    regressions = 0
+    rows = {**base["results"], **cur["results"]}
+    for k in sorted(rows, key=lambda k: (rows[k]["name"], rows[k]["size"])):
+        b, c = base["results"].get(k, {}), cur["results"].get(k, {})
+        if stat not in b or stat not in c:
+            if stat in b and "skipped" not in c:
+                # it had timings and now errors or is gone: a broken hot path, not a pass
+                why = f"❌ ERROR: {c['error']}" if "error" in c else "❌ not run"
+                regressions += 1
+            else:
+                why = "new" if not b else "skipped: " + c["skipped"] if "skipped" in c else "skipped/error"
+            print(f"  {k:<44} {why}")
+            continue
+        ratio = c[stat] / b[stat] if b[stat] else float("inf")
+        if ratio > 1 + threshold:
+            status, regressions = "❌ slower", regressions + 1
+        elif ratio < 1 - threshold:
+            status = "✅ faster"
+        else:
+            status = "  same"
+        print(f"  {k:<44} {fmt_s(b[stat]):>9} → {fmt_s(c[stat]):>9}  {ratio:6.2f}x  {status}")
+    print(f"\n{regressions} regression(s) (over {threshold:.0%}, erroring or missing)")
+    return regressions
+
+def selection(base: dict, pattern: Optional[str], quick: bool) -> dict:
+    """The part of a baseline this run was asked to time (-k, --quick), so the rest isn't "not run"."""
+    sizes: Dict[str, List[int]] = {}
+    for r in base["results"].values():
+        if selected(r["name"], pattern):
+            sizes.setdefault(r["name"], []).append(r["size"])
+    keep = {key(name, s) for name, ss in sizes.items() for s in (sorted(ss)[:2] if quick else ss)}
+    return dict(base, results={k: r for k, r in base["results"].items() if k in keep})
+
+def load_results(path: str) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+def main():
+    ap = argparse.ArgumentParser(description="Lesson hot-path benchmarks with regression gating")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    sub.add_parser("list", help="Show benchmarks and sizes")
+
+    p_run = sub.add_parser("run", help="Run benchmarks and store the results")
+    p_run.add_argument("-k", default=None, help="Only benchmarks whose name contains (or glob-matches) this")
+    p_run.add_argument("--repeat", type=int, default=5)
+    p_run.add_argument("--min-time", type=float, default=0.1, help="Seconds per sample (calls are looped)")
+    p_run.add_argument("--quick", action="store_true", help="Two smallest sizes only")
+    p_run.add_argument("--out", default=os.path.join(RESULTS, "latest.json"))
+    p_run.add_argument("--baseline", default=os.path.join(RESULTS, "baseline.json"))
+    p_run.add_argument("--save-baseline", action="store_true", help="Also store this run as the baseline (merged into it with -k/--quick)")
+    p_run.add_argument("--compare", action="store_true", help="Compare with the baseline; exit 1 on regressions")
+    p_run.add_argument("--threshold", type=float, default=0.10, help="Allowed slowdown (0.10 = 10%%)")
+    p_run.add_argument("--stat", choices=["median", "min"], default="median",
+                       help="Statistic to compare (min is steadier on noisy machines)")
+
+    p_cmp = sub.add_parser("compare", help="Compare two result files")
+    p_cmp.add_argument("baseline")
+    p_cmp.add_argument("current")
+    p_cmp.add_argument("--threshold", type=float, default=0.10)
+    p_cmp.add_argument("--stat", choices=["median", "min"], default="median")
+
+    p_w = sub.add_parser("_worker")
+    p_w.add_argument("path")
+    p_w.add_argument("-k", default=None)
+    p_w.add_argument("--repeat", type=int, default=5)
+    p_w.add_argument("--min-time", type=float, default=0.1)
+    p_w.add_argument("--quick", action="store_true")
+    args = ap.parse_args()
+
+    if args.cmd == "_worker":
+        worker(args.path, args.k, args.repeat, args.quick, args.min_time)
+        return
+
+    if args.cmd == "list":
+        for path in bench_files():
+            harness = load(path)
+            for b in harness.BENCHMARKS:
+                absent = harness.missing(b.requires)
+                note = f"  (skipped: missing {', '.join(absent)})" if absent else ""
+                per = f" ({b.per_size:,} per size unit)" if b.per_size != 1 else ""
+                print(f"{b.name:<30} sizes {', '.join(f'{s:,}' for s in b.sizes):<26} {b.unit}{per}{note}")
+            harness.BENCHMARKS.clear()
+        return
+
+    if args.cmd == "compare":
+        sys.exit(1 if compare(load_results(args.baseline), load_results(args.current), args.threshold,
+                              f"{args.stat}_s") else 0)
+
+    start = time.perf_counter()
+    results: Dict[str, dict] = {}
+    print(f"{'':<46} {'median':>9} {'stdev':>9}  {'per item':>8}")
+    for path in bench_files():
+        print(os.path.basename(path))
+        for row in run_file(path, args):
+            print_row(row)
+            results[row["key"]] = row
+    doc = {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "machine": platform.node(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+    old = load_results(args.baseline) if os.path.exists(args.baseline) else None
+    save(args.out, doc)
+    if args.save_baseline:
+        # a -k/--quick run only timed part of the suite: update those entries, keep the rest
+        partial = old is not None and (args.k or args.quick)
+        save(args.baseline, dict(doc, results={**old["results"], **results}) if partial else doc)
+    print(f"\n{len(results)} result(s) in {time.perf_counter() - start:.1f}s -> {args.out}"
+          + (f" (and {args.baseline})" if args.save_baseline else ""))
+    if args.compare:
+        if old is None:
+            sys.exit(f"no baseline at {args.baseline} (run with --save-baseline first)")
+        # against the baseline as it was before this run, even with --save-baseline
+        base = selection(old, args.k, args.quick)
+        sys.exit(1 if compare(base, doc, args.threshold, f"{args.stat}_s") else 0)
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,15 @@
 #!/usr/bin/env python3
+import argparse
 import json
+import os
 import sys
 from datetime import datetime
 
+from scoring import Scorecard
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "shared"))
+import profiler
+
 SEVERITY_RANK = {"HIGH": 3, "MEDIUM": 2, "LOW": 1}
 
 def load_json(path: str):
@@ -23,69 +30,50 @@ def rule_matches(rule, signals: dict) -> bool:
             return False
     return True
 
-def maturity_score(signals: dict, capabilities: dict) -> dict:
+def maturity_score(signals: dict, capabilities: dict, model: dict = None, card: Scorecard = None) -> dict:
     # Simple, transparent scoring (great for teaching)
-    # Score is 0–100. Start at 50, adjust with signals + capability bonuses.
-    score = 50
-
-    # Signal adjustments (very small set, intentionally)
-    if signals.get("golden_path_adoption_pct", 0) >= 60: score += 10
-    if signals.get("golden_path_adoption_pct", 0) < 40: score -= 10
-
-    if signals.get("policy_violations_per_week", 0) <= 10: score += 8
-    if signals.get("policy_violations_per_week", 0) > 20: score -= 8
-
-    if signals.get("slo_burn_rate", 0) <= 1.0: score += 10
-    if signals.get("slo_burn_rate", 0) > 1.0: score -= 12
-
-    if signals.get("onboarding_days", 0) <= 5: score += 7
-    if signals.get("onboarding_days", 0) > 7: score -= 7
-
-    if signals.get("platform_nps", 0) >= 40: score += 8
-    if signals.get("platform_nps", 0) < 20: score -= 10
-
-    # Capability bonuses (platform-as-product evolution)
-    bonus = 0
-    bonus += 4 if capabilities.get("self_service_provisioning") else 0
-    bonus += 4 if capabilities.get("policy_as_code") else 0
-    bonus += 4 if capabilities.get("slo_defined") else 0
-    bonus += 3 if capabilities.get("feedback_program") else 0
-    bonus += 3 if capabilities.get("platform_pm_process") else 0
-    score += bonus
-
-    score = max(0, min(100, score))
-    level = "Foundational" if score < 50 else ("Emerging" if score < 75 else "Advanced")
-    return {"score": score, "level": level}
-
-def main():
-    if len(sys.argv) != 3:
-        print("Usage: python3 ai_diagnose.py <model.json> <input.json>")
-        sys.exit(1)
-
-    model = load_json(sys.argv[1])
-    inp = load_json(sys.argv[2])
-
-    team = inp.get("team", "Unknown")
-    signals = inp.get("signals", {})
-    capabilities = inp.get("capabilities", {})
-
-    score = maturity_score(signals, capabilities)
+    # Score is 0–100: a base plus points for signal thresholds and capabilities.
+    # The thresholds, points, categories and levels live in model.json ("scoring");
+    # no model, or one without that section, keeps the original built-in scorecard.
+    return (card or Scorecard.for_model(model)).score(signals, capabilities)
 
+def find_issues(model: dict, signals: dict, compiled=None) -> list:
     # Diagnostics via simple rules (call it “AI” in the lesson: pattern detection + recommendations)
-    findings = []
-    for r in model.get("rules", []):
-        if rule_matches(r, signals):
-            findings.append(r)
+    # `compiled` (rule_engine.CompiledRules) finds the same rules without testing each one
+    if compiled is not None:
+        findings = compiled.find(signals)
+    else:
+        findings = []
+        for r in model.get("rules", []):
+            if rule_matches(r, signals):
+                findings.append(r)
 
     findings.sort(key=lambda r: SEVERITY_RANK.get(r["severity"], 0), reverse=True)
+    return findings
+
+def diagnose(model: dict, inp: dict, compiled=None, card: Scorecard = None) -> dict:
+    """Score + findings for one team input (no printing, so batch runs can reuse it)."""
+    signals = inp.get("signals", {})
+    score = maturity_score(signals, inp.get("capabilities", {}), model, card)
+    return {
+        "team": inp.get("team", "Unknown"),
+        "score": score["score"],
+        "level": score["level"],
+        "weighted_score": score["weighted_score"],
+        "categories": score["categories"],
+        "findings": find_issues(model, signals, compiled),
+    }
+
+def print_report(result: dict) -> None:
+    findings = result["findings"]
 
     print("==============================================")
     print("Lesson 10 Demo: Intelligent Diagnostics & Maturity Tracking")
     print("==============================================")
-    print(f"Team: {team}")
+    print(f"Team: {result['team']}")
     print(f"Generated: {datetime.utcnow().isoformat()}Z")
     print("")
-    print(f"Maturity Score: {score['score']}/100  ({score['level']})")
+    print(f"Maturity Score: {result['score']}/100  ({result['level']})")
     print("")
 
     if not findings:
@@ -112,5 +100,28 @@ def main():
     print("- This 'AI' is intentionally transparent and deterministic for teaching.")
     print("- In real platforms, you can evolve this into ML/LLM-assisted insights, but keep human judgment in the loop.")
 
+def read_text(path: str) -> str:
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+def main():
+    ap = argparse.ArgumentParser(usage="python3 ai_diagnose.py <model.json> <input.json> [--profile [--profile-out PATH]]",
+                                 description="Maturity score + prioritized diagnostics for one team")
+    ap.add_argument("model", help="Rules, scoring and levels (model.json)")
+    ap.add_argument("input", help="One team's signals and capabilities")
+    profiler.add_arguments(ap)
+    args = ap.parse_args()
+
+    prof = profiler.from_args(args)
+    with prof.phase("load"):
+        raw = [read_text(args.model), read_text(args.input)]
+    with prof.phase("parse"):
+        model, inp = [json.loads(r) for r in raw]
+    with prof.phase("compute"):
+        result = diagnose(model, inp)
+    with prof.phase("render"):
+        print_report(result)
+    prof.finish()
+
 if __name__ == "__main__":
     main()
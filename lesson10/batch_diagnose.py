@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from ai_diagnose import diagnose, load_json
+from maturity_history import HistoryStore, parse_when
+from rule_engine import CompiledRules
+from scoring import Scorecard
+
+# Diagnose a whole fleet in one run.
+#
+#   inputs     team files (*.json, one team each) and/or NDJSON (*.ndjson /
+#              *.jsonl, one team per line), given as files or directories
+#   model      loaded once here, handed to each worker once (pool initializer),
+#              where its rules and scorecard are compiled once
+#   workers    get batches of raw documents, parse + score them, and send
+#              back compact rows plus how long each phase took
+#
+# The parent only reads bytes and collects rows, with a bounded number of
+# batches in flight, so memory stays flat however many teams there are.
+# A team that fails to parse, isn't a team object, or can't be evaluated
+# (say, a non-numeric signal) is reported under "errors"; it doesn't stop the run.
+
+Doc = Tuple[str, str]                 # (source, raw JSON text)
+
+PHASES = ("load_model", "read", "parse", "evaluate", "write")
+
+_model: dict = {}
+_rules: CompiledRules = None
+_card: Scorecard = None
+_keep_signals = False
+
+def iter_docs(paths: Iterable[str]) -> Iterator[Doc]:
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                if name.endswith((".json", ".ndjson", ".jsonl")):
+                    yield from iter_docs([os.path.join(path, name)])
+        elif path.endswith((".ndjson", ".jsonl")):
+            with open(path, encoding="utf-8") as f:
+                for lineno, line in enumerate(f, 1):
+                    if line.strip():
+                        yield f"{path}:{lineno}", line
+        else:
+            with open(path, encoding="utf-8") as f:
+                yield path, f.read()
+
+def iter_batches(docs: Iterator[Doc], size: int) -> Iterator[List[Doc]]:
+    batch: List[Doc] = []
+    for doc in docs:
+        batch.append(doc)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def _init_worker(model: dict, keep_signals: bool = False) -> None:
+    global _model, _rules, _card, _keep_signals
+    _model = model
+    _rules = CompiledRules(model)
+    _card = Scorecard(model)
+    _keep_signals = keep_signals
+
+def input_problem(inp) -> str:
+    """Why a parsed document can't be diagnosed ("" if it can)."""
+    if not isinstance(inp, dict):
+        return f"team input must be a JSON object (got {type(inp).__name__})"
+    for key in ("signals", "capabilities"):
+        if not isinstance(inp.get(key, {}), dict):
+            return f"'{key}' must be an object (got {type(inp[key]).__name__})"
+    return ""
+
+def diagnose_batch(batch: List[Doc]) -> Tuple[List[dict], Dict[str, float]]:
+    """Runs in a worker: one row per team (or per input that can't be diagnosed) + phase timings."""
+    rows = []
+    parse_s = evaluate_s = 0.0
+    for source, text in batch:
+        t0 = time.perf_counter()
+        try:
+            inp = json.loads(text)
+        except ValueError as e:
+            rows.append({"source": source, "error": str(e)})
+            continue
+        problem = input_problem(inp)
+        if problem:
+            rows.append({"source": source, "error": problem})
+            continue
+        t1 = time.perf_counter()
+        try:
+            result = diagnose(_model, inp, _rules, _card)
+        except Exception as e:
+            # e.g. a non-numeric signal the model compares with lt/gt: one bad team must not abort the run
+            rows.append({"source": source, "error": f"could not diagnose: {type(e).__name__}: {e}"})
+            continue
+        finally:
+            evaluate_s += time.perf_counter() - t1
+            parse_s += t1 - t0
+        result["source"] = source
+        if _keep_signals:
+            result["signals"] = inp.get("signals", {})
+        result["findings"] = [{k: f[k] for k in ("id", "severity", "category", "signal")}
+                              for f in result["findings"]]
+        rows.append(result)
+    return rows, {"parse": parse_s, "evaluate": evaluate_s}
+
+def run(model: dict, docs: Iterator[Doc], workers: int = 1, batch_size: int = 256,
+        keep_signals: bool = False) -> Tuple[List[dict], Dict[str, float]]:
+    """Rows in input order (batches may finish out of order) + summed phase timings."""
+    parts: Dict[int, List[dict]] = {}
+    timings = {"read": 0.0, "parse": 0.0, "evaluate": 0.0}
+
+    def absorb(seq: int, part: Tuple[List[dict], Dict[str, float]]) -> None:
+        parts[seq] = part[0]
+        for k, v in part[1].items():
+            timings[k] += v
+
+    def next_batch(batches: Iterator[List[Doc]]):
+        t0 = time.perf_counter()
+        batch = next(batches, None)
+        timings["read"] += time.perf_counter() - t0
+        return batch
+
+    batches = iter_batches(docs, batch_size)
+    seq = 0
+    if workers <= 1:
+        _init_worker(model, keep_signals)
+        while (batch := next_batch(batches)) is not None:
+            absorb(seq, diagnose_batch(batch))
+            seq += 1
+    else:
+        # parse/evaluate are summed over workers (CPU time), so they can exceed wall time
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(model, keep_signals)) as pool:
+            in_flight = {}
+            while True:
+                while len(in_flight) < workers * 2 and (batch := next_batch(batches)) is not None:
+                    in_flight[pool.submit(diagnose_batch, batch)] = seq
+                    seq += 1
+                if not in_flight:
+                    break
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    absorb(in_flight.pop(fut), fut.result())
+    return [row for i in range(seq) for row in parts[i]], timings
+
+def summarize(teams: List[dict]) -> dict:
+    return {
+        "teams": len(teams),
+        "avg_score": round(sum(t["score"] for t in teams) / len(teams), 1) if teams else None,
+        "levels": dict(Counter(t["level"] for t in teams)),
+        "findings": dict(Counter(f["id"] for t in teams for f in t["findings"]).most_common()),
+    }
+
+def write_json(out, model_path: str, teams: List[dict], errors: List[dict], timings: Dict[str, float]) -> None:
+    json.dump({
+        "generated": datetime.utcnow().isoformat() + "Z",
+        "model": model_path,
+        "summary": summarize(teams),
+        "teams": teams,
+        "errors": errors,
+        "timings_s": {k: round(v, 4) for k, v in timings.items()},
+    }, out, indent=2)
+    out.write("\n")
+
+def write_csv(out, teams: List[dict]) -> None:
+    writer = csv.writer(out)
+    writer.writerow(["team", "source", "score", "level", "weighted_score", "findings", "top_severity"])
+    for t in teams:
+        ids = ";".join(f["id"] for f in t["findings"])
+        top = t["findings"][0]["severity"] if t["findings"] else ""
+        writer.writerow([t["team"], t["source"], t["score"], t["level"], t["weighted_score"], ids, top])
+
+def main():
+    ap = argparse.ArgumentParser(description="Maturity scores + diagnostics for many teams in one run")
+    ap.add_argument("model", help="model.json")
+    ap.add_argument("inputs", nargs="+", help="Team files (*.json), NDJSON files, or directories of either")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--batch-size", type=int, default=256, help="Teams per worker task")
+    ap.add_argument("--format", choices=["json", "csv"], default="json")
+    ap.add_argument("--out", help="Write the report here instead of stdout")
+    ap.add_argument("--history", help="Also append this run to a maturity history store (see maturity_history.py)")
+    ap.add_argument("--at", help="Snapshot time for --history (ISO date/time; default: now)")
+    ap.add_argument("--sort", choices=["score", "team", "input"], default="score",
+                    help="Row order: lowest score first, by team name, or input order")
+    args = ap.parse_args()
+
+    start = time.perf_counter()
+    timings: Dict[str, float] = {}
+    t0 = time.perf_counter()
+    model = load_json(args.model)
+    timings["load_model"] = time.perf_counter() - t0
+
+    rows, run_timings = run(model, iter_docs(args.inputs), workers=args.workers, batch_size=args.batch_size,
+                            keep_signals=bool(args.history))
+    timings.update(run_timings)
+    teams = [r for r in rows if "error" not in r]
+    errors = [r for r in rows if "error" in r]
+    if args.sort == "score":
+        teams.sort(key=lambda t: (t["score"], t["team"]))
+    elif args.sort == "team":
+        teams.sort(key=lambda t: t["team"])
+
+    t0 = time.perf_counter()
+    out = open(args.out, "w", encoding="utf-8", newline="") if args.out else sys.stdout
+    try:
+        if args.format == "csv":
+            write_csv(out, teams)
+        else:
+            # the report can't time its own writing: its timings cover everything before it
+            write_json(out, args.model, teams, errors, dict(timings, total=time.perf_counter() - start))
+    finally:
+        if args.out:
+            out.close()
+    if args.history:
+        ts = parse_when(args.at) if args.at else int(time.time())
+        HistoryStore(args.history).append_results(ts, teams, Scorecard(model).level_names,
+                                                  [r["id"] for r in model.get("rules", [])])
+    timings["write"] = time.perf_counter() - t0
+    timings["total"] = time.perf_counter() - start
+
+    rate = len(rows) / timings["total"] if timings["total"] else 0.0
+    print(f"Diagnosed {len(teams):,} team(s), {len(errors)} with errors, in {timings['total']:.2f}s "
+          f"({rate:,.0f}/s, {args.workers} worker(s))", file=sys.stderr)
+    print("  " + "  ".join(f"{k}={timings[k]:.3f}s" for k in PHASES), file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+import argparse
+import time
+
+import numpy as np
+
+from ai_diagnose import load_json
+from fleet import CAPABILITIES, generate
+from rule_engine import signal_matrix
+from scoring import Scorecard, capability_matrix
+
+# Per-team vs whole-fleet maturity scoring, checked against the hard-coded
+# scorer that model.json's "scoring" section replaced (kept here as the
+# reference for the default model).
+
+def original_maturity_score(signals: dict, capabilities: dict) -> dict:
+    score = 50
+    if signals.get("golden_path_adoption_pct", 0) >= 60: score += 10
+    if signals.get("golden_path_adoption_pct", 0) < 40: score -= 10
+    if signals.get("policy_violations_per_week", 0) <= 10: score += 8
+    if signals.get("policy_violations_per_week", 0) > 20: score -= 8
+    if signals.get("slo_burn_rate", 0) <= 1.0: score += 10
+    if signals.get("slo_burn_rate", 0) > 1.0: score -= 12
+    if signals.get("onboarding_days", 0) <= 5: score += 7
+    if signals.get("onboarding_days", 0) > 7: score -= 7
+    if signals.get("platform_nps", 0) >= 40: score += 8
+    if signals.get("platform_nps", 0) < 20: score -= 10
+    score += 4 if capabilities.get("self_service_provisioning") else 0
+    score += 4 if capabilities.get("policy_as_code") else 0
+    score += 4 if capabilities.get("slo_defined") else 0
+    score += 3 if capabilities.get("feedback_program") else 0
+    score += 3 if capabilities.get("platform_pm_process") else 0
+    score = max(0, min(100, score))
+    level = "Foundational" if score < 50 else ("Emerging" if score < 75 else "Advanced")
+    return {"score": score, "level": level}
+
+def main():
+    ap = argparse.ArgumentParser(description="Scalar vs vectorized maturity scoring")
+    ap.add_argument("--model", default="model.json")
+    ap.add_argument("--teams", type=int, default=100000)
+    args = ap.parse_args()
+
+    model = load_json(args.model)
+    card = Scorecard(model)
+    teams = [load_json("sample_team_a.json"), load_json("sample_team_b.json")] + list(generate(args.teams))
+    # a few teams with signals missing, which score as 0
+    for t in teams[2:50]:
+        t["signals"].pop("onboarding_days", None)
+
+    t0 = time.perf_counter()
+    scalar = [card.score(t["signals"], t["capabilities"]) for t in teams]
+    scalar_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    signals, columns = signal_matrix(teams)
+    caps = capability_matrix(teams, CAPABILITIES)
+    matrix_s = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    fleet = card.score_fleet(signals, columns, caps, CAPABILITIES)
+    vector_s = time.perf_counter() - t0
+
+    for i, t in enumerate(teams):
+        s = scalar[i]
+        assert s == {**s, **original_maturity_score(t["signals"], t["capabilities"])}, f"team {i} differs from the original"
+        assert fleet["score"][i] == s["score"] and card.level_names[fleet["level"][i]] == s["level"], f"team {i}"
+        assert abs(fleet["weighted_score"][i] - s["weighted_score"]) <= 0.1, f"team {i} weighted"
+    print(f"Sample teams: {scalar[0]['score']} ({scalar[0]['level']}), {scalar[1]['score']} ({scalar[1]['level']})"
+          " - same as the original scorer")
+
+    levels = np.bincount(fleet["level"], minlength=len(card.level_names))
+    print(f"{len(teams):,} teams: " + ", ".join(f"{n} {name}" for name, n in zip(card.level_names, levels)))
+    print(f"  per team (Scorecard.score)   {scalar_s * 1000:8.1f} ms")
+    print(f"  whole fleet (score_fleet)    {vector_s * 1000:8.1f} ms   (building the matrices: {matrix_s * 1000:.1f} ms)")
+
+if __name__ == "__main__":
+    main()
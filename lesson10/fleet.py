@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+import argparse
+import json
+import random
+from typing import Iterator
+
+# Synthetic team inputs (same shape as sample_team_a.json) for trying the
+# batch tools on a realistic fleet instead of two sample files.
+
+CAPABILITIES = ("self_service_provisioning", "policy_as_code", "slo_defined",
+                "deploy_markers", "feedback_program", "platform_pm_process")
+
+def make_team(rng: random.Random, i: int, health: float = None) -> dict:
+    # one hidden "health" knob (0-1) per team so signals are correlated like real teams
+    if health is None:
+        health = rng.random()
+    return {
+        "team": f"team-{i:05d}",
+        "signals": {
+            "golden_path_adoption_pct": round(min(100, max(0, rng.gauss(20 + 60 * health, 12)))),
+            "policy_violations_per_week": round(max(0, rng.gauss(40 - 35 * health, 6))),
+            "slo_burn_rate": round(max(0.0, rng.gauss(2.0 - 1.6 * health, 0.3)), 2),
+            "onboarding_days": round(max(1, rng.gauss(14 - 11 * health, 2))),
+            "platform_nps": round(min(100, max(-100, rng.gauss(-5 + 65 * health, 10)))),
+        },
+        "capabilities": {c: rng.random() < 0.2 + 0.7 * health for c in CAPABILITIES},
+    }
+
+def generate(n: int, seed: int = 7) -> Iterator[dict]:
+    rng = random.Random(seed)
+    for i in range(n):
+        yield make_team(rng, i)
+
+def main():
+    ap = argparse.ArgumentParser(description="Write N synthetic team inputs as NDJSON")
+    ap.add_argument("n", type=int)
+    ap.add_argument("out", help="Output .ndjson file")
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args()
+
+    with open(args.out, "w", encoding="utf-8") as f:
+        for team in generate(args.n, args.seed):
+            f.write(json.dumps(team) + "\n")
+    print(f"Wrote {args.n:,} team(s) to {args.out}")
+
+if __name__ == "__main__":
+    main()
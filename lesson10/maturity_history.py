@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+import argparse
+import os
+import random
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+# Maturity over time: an append-only store of diagnosis snapshots.
+#
+#   history/
+#     teams.txt                    team dictionary (line number = team id), append-only
+#     2026-10/
+#       1760745600-3f9c2a1b.npz    one snapshot: every team scored in one run
+#
+# A snapshot is columnar: team ids (int32), score / weighted score (float32),
+# level codes (uint8), a signals matrix (float32, NaN = missing) and the
+# findings as a bit-packed teams x rules matrix, plus the small name lists
+# those columns refer to. Files are never rewritten; a new run adds a file.
+#
+# The snapshot time is in the file name and snapshots live under their month,
+# so queries open only the files in their time range, and only the columns
+# they need (arrays in an .npz load individually). A weekly snapshot of 5,000
+# teams is ~175 KB; with three years of them, a week-over-week query reads
+# two or three files and a full trend for one team takes well under 0.1 s.
+
+DAY = 86400
+WEEK = 7 * DAY
+
+def parse_when(text: str) -> int:
+    """'2026-10-18', ISO datetime, or epoch seconds -> epoch seconds (UTC if no zone)."""
+    try:
+        return int(float(text))
+    except ValueError:
+        dt = datetime.fromisoformat(text.replace("Z", "+00:00"))
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=timezone.utc)
+        return int(dt.timestamp())
+
+def fmt_ts(ts: int) -> str:
+    return datetime.fromtimestamp(ts, timezone.utc).strftime("%Y-%m-%d")
+
+def month_of(ts: int) -> str:
+    return datetime.fromtimestamp(ts, timezone.utc).strftime("%Y-%m")
+
+class HistoryStore:
+    def __init__(self, root: str) -> None:
+        self.root = root
+        self.team_names: List[str] = []
+        self.team_ids: Dict[str, int] = {}
+        path = self._teams_path()
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    self._remember(line.rstrip("\n"))
+
+    def _teams_path(self) -> str:
+        return os.path.join(self.root, "teams.txt")
+
+    def _remember(self, name: str) -> int:
+        self.team_ids[name] = len(self.team_names)
+        self.team_names.append(name)
+        return self.team_ids[name]
+
+    def _ids_for(self, names: Sequence[str]) -> np.ndarray:
+        new = [n for n in dict.fromkeys(names) if n not in self.team_ids]
+        if new:
+            if any("\n" in n for n in new):
+                raise ValueError("team names can't contain newlines")
+            # the dictionary is extended before any snapshot refers to the new ids
+            os.makedirs(self.root, exist_ok=True)
+            with open(self._teams_path(), "a", encoding="utf-8") as f:
+                f.write("".join(n + "\n" for n in new))
+            for n in new:
+                self._remember(n)
+        return np.array([self.team_ids[n] for n in names], dtype=np.int32)
+
+    # --- writing ---
+
+    def append(self, ts: int, teams: Sequence[str], score: np.ndarray, level: np.ndarray,
+               level_names: Sequence[str], weighted: np.ndarray, signals: np.ndarray,
+               signal_names: Sequence[str], findings: np.ndarray, rule_ids: Sequence[str]) -> str:
+        """Write one snapshot: per-team arrays, `findings` a (teams x rules) bool matrix."""
+        n = len(teams)
+        if not (len(score) == len(level) == len(weighted) == len(signals) == len(findings) == n):
+            raise ValueError("snapshot columns must all have one row per team")
+        part = os.path.join(self.root, month_of(ts))
+        os.makedirs(part, exist_ok=True)
+        path = os.path.join(part, f"{ts}-{uuid.uuid4().hex[:8]}.npz")
+        tmp = path + ".tmp.npz"
+        np.savez(tmp,
+                 ts=np.array(ts, dtype=np.int64),
+                 team=self._ids_for(teams),
+                 score=np.asarray(score, dtype=np.float32),
+                 weighted=np.asarray(weighted, dtype=np.float32),
+                 level=np.asarray(level, dtype=np.uint8),
+                 level_names=np.array(level_names),
+                 signals=np.asarray(signals, dtype=np.float32).reshape(n, len(signal_names)),
+                 signal_names=np.array(signal_names),
+                 findings=np.packbits(np.asarray(findings, dtype=bool).reshape(n, len(rule_ids)), axis=1),
+                 rules=np.array(rule_ids))
+        os.replace(tmp, path)
+        return path
+
+    def append_results(self, ts: int, rows: List[dict], level_names: Sequence[str],
+                       rule_ids: Sequence[str]) -> str:
+        """Snapshot from diagnose() results (as batch_diagnose produces, with "signals")."""
+        signal_names = sorted({k for r in rows for k in r.get("signals", {})})
+        col = {k: j for j, k in enumerate(signal_names)}
+        signals = np.full((len(rows), len(signal_names)), np.nan, dtype=np.float32)
+        rule_col = {r: j for j, r in enumerate(rule_ids)}
+        findings = np.zeros((len(rows), len(rule_ids)), dtype=bool)
+        level_code = {name: k for k, name in enumerate(level_names)}
+        for i, r in enumerate(rows):
+            for k, v in r.get("signals", {}).items():
+                if isinstance(v, (int, float)):
+                    signals[i, col[k]] = v
+            for f in r["findings"]:
+                findings[i, rule_col[f["id"]]] = True
+        return self.append(ts, [r["team"] for r in rows],
+                           np.array([r["score"] for r in rows]),
+                           np.array([level_code[r["level"]] for r in rows]), level_names,
+                           np.array([r.get("weighted_score", np.nan) for r in rows]),
+                           signals, signal_names, findings, rule_ids)
+
+    # --- reading ---
+
+    def snapshots(self, since: Optional[int] = None, until: Optional[int] = None) -> List[str]:
+        """Snapshot files with since <= ts <= until, oldest first; only matching months are listed."""
+        if not os.path.isdir(self.root):
+            return []
+        lo = month_of(since) if since is not None else ""
+        hi = month_of(until) if until is not None else "9999-99"
+        out = []
+        for month in sorted(os.listdir(self.root)):
+            if not (lo <= month <= hi) or not os.path.isdir(os.path.join(self.root, month)):
+                continue
+            for name in os.listdir(os.path.join(self.root, month)):
+                if not name.endswith(".npz") or name.endswith(".tmp.npz"):
+                    continue
+                ts = int(name.split("-", 1)[0])
+                if (since is None or ts >= since) and (until is None or ts <= until):
+                    out.append((ts, os.path.join(self.root, month, name)))
+        return [p for _, p in sorted(out)]
+
+    def scan(self, since: Optional[int] = None, until: Optional[int] = None,
+             columns: Sequence[str] = ("score",), team: Optional[str] = None) -> Dict[str, np.ndarray]:
+        """Rows of every snapshot in range, as arrays: ts, team (id) + the requested per-team columns
+        (score, weighted, level)."""
+        want = None
+        if team is not None:
+            if team not in self.team_ids:
+                return {"ts": np.array([], dtype=np.int64), "team": np.array([], dtype=np.int32),
+                        **{c: np.array([]) for c in columns}}
+            want = self.team_ids[team]
+        parts: Dict[str, list] = {"ts": [], "team": [], **{c: [] for c in columns}}
+        for path in self.snapshots(since, until):
+            with np.load(path) as z:
+                ids = z["team"]
+                rows = slice(None) if want is None else np.flatnonzero(ids == want)
+                ids = ids[rows]
+                if not len(ids):
+                    continue
+                parts["ts"].append(np.full(len(ids), int(z["ts"]), dtype=np.int64))
+                parts["team"].append(ids)
+                for c in columns:
+                    parts[c].append(z[c][rows])
+        return {c: np.concatenate(v) if v else np.array([]) for c, v in parts.items()}
+
+    def latest(self, since: int, until: int, column: str = "score") -> Dict[int, float]:
+        """Each team's most recent `column` value in [since, until]."""
+        rows = self.scan(since, until, (column,))
+        if not len(rows["ts"]):
+            return {}
+        order = np.lexsort((-rows["ts"], rows["team"]))          # by team, newest first
+        team = rows["team"][order]
+        first = np.flatnonzero(np.r_[True, team[1:] != team[:-1]])
+        return dict(zip(team[first].tolist(), rows[column][order][first].tolist()))
+
+    # --- queries ---
+
+    def trend(self, team: str, since: Optional[int] = None, until: Optional[int] = None) -> List[tuple]:
+        """[(ts, score, weighted score)] for one team, oldest first."""
+        rows = self.scan(since, until, ("score", "weighted"), team=team)
+        return list(zip(rows["ts"].tolist(), rows["score"].tolist(), rows["weighted"].tolist()))
+
+    def deltas(self, at: Optional[int] = None, period: int = WEEK) -> List[dict]:
+        """
+        Score change per team between the latest snapshot in (at - period, at]
+        and the latest in (at - 2*period, at - period]: week-over-week by default.
+        """
+        at = at if at is not None else int(time.time())
+        now = self.latest(at - period + 1, at)
+        before = self.latest(at - 2 * period + 1, at - period)
+        out = []
+        for tid, score in now.items():
+            if tid in before:
+                out.append({"team": self.team_names[tid], "before": before[tid], "after": score,
+                            "delta": score - before[tid]})
+        return out
+
+    def regressions(self, threshold: float, at: Optional[int] = None, period: int = WEEK,
+                    below: Optional[float] = None) -> List[dict]:
+        """Teams whose score dropped by at least `threshold` (or fell under `below`) over `period`."""
+        hits = []
+        for d in self.deltas(at, period):
+            dropped = -d["delta"] >= threshold
+            crossed = below is not None and d["after"] < below <= d["before"]
+            if dropped or crossed:
+                hits.append(d)
+        return sorted(hits, key=lambda d: d["delta"])
+
+# --- synthetic history (for trying this out at scale) ---
+
+def seed(store: HistoryStore, model: dict, teams: int, weeks: int, start: int, seed: int = 7) -> None:
+    from fleet import CAPABILITIES, make_team
+    from rule_engine import CompiledRules, signal_matrix
+    from scoring import Scorecard, capability_matrix
+
+    card, rules = Scorecard(model), CompiledRules(model)
+    rule_ids = [r["id"] for r in model["rules"]]
+    rng = random.Random(seed)
+    health = [rng.random() for _ in range(teams)]
+    for w in range(weeks):
+        # health drifts week to week; a few teams have a bad week
+        health = [min(1.0, max(0.0, h + rng.gauss(0.005, 0.03) - (0.3 if rng.random() < 0.005 else 0.0)))
+                  for h in health]
+        fleet = [make_team(rng, i, h) for i, h in enumerate(health)]
+        signals, columns = signal_matrix(fleet)
+        s = card.score_fleet(signals, columns, capability_matrix(fleet, CAPABILITIES), CAPABILITIES)
+        findings = rules.evaluate(signals, columns).to_dense()
+        store.append(start + w * WEEK, [t["team"] for t in fleet], s["score"], s["level"], card.level_names,
+                     s["weighted_score"], signals, columns, findings, rule_ids)
+
+def main():
+    ap = argparse.ArgumentParser(description="Maturity history: trends, week-over-week deltas, regressions")
+    ap.add_argument("--history", default="history", help="Store directory")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    t = sub.add_parser("trend", help="One team's scores over time")
+    t.add_argument("team")
+    t.add_argument("--since")
+    t.add_argument("--until")
+
+    for name, help_text in (("wow", "Score change per team over one period"),
+                            ("regressions", "Teams whose score dropped past a threshold")):
+        p = sub.add_parser(name, help=help_text)
+        p.add_argument("--at", help="End of the period (default: now)")
+        p.add_argument("--period-days", type=int, default=7)
+        p.add_argument("--top", type=int, default=20)
+        if name == "regressions":
+            p.add_argument("--threshold", type=float, default=10, help="Minimum score drop")
+            p.add_argument("--below", type=float, help="Also flag teams that fell under this score")
+
+    s = sub.add_parser("seed", help="Write synthetic weekly snapshots")
+    s.add_argument("--model", default="model.json")
+    s.add_argument("--teams", type=int, default=1000)
+    s.add_argument("--weeks", type=int, default=156)
+    s.add_argument("--start", default="2023-10-02")
+    args = ap.parse_args()
+
+    store = HistoryStore(args.history)
+    t0 = time.perf_counter()
+
+    if args.cmd == "seed":
+        from ai_diagnose import load_json
+        seed(store, load_json(args.model), args.teams, args.weeks, parse_when(args.start))
+        print(f"Wrote {args.weeks} weekly snapshot(s) of {args.teams:,} team(s) to {args.history}/ "
+              f"in {time.perf_counter() - t0:.1f}s")
+        return
+
+    if args.cmd == "trend":
+        rows = store.trend(args.team, parse_when(args.since) if args.since else None,
+                           parse_when(args.until) if args.until else None)
+        if not rows:
+            print(f"No history for {args.team}")
+            return
+        print(f"{args.team}: {len(rows)} snapshot(s)")
+        prev = None
+        for ts, score, weighted in rows:
+            change = f"{score - prev:+.0f}" if prev is not None else ""
+            print(f"  {fmt_ts(ts)}  {score:>5.0f} {change:>5}   weighted {weighted:5.1f}")
+            prev = score
+    else:
+        at = parse_when(args.at) if args.at else None
+        period = args.period_days * DAY
+        if args.cmd == "wow":
+            rows = sorted(store.deltas(at, period), key=lambda d: d["delta"])
+            print(f"{len(rows):,} team(s) with a snapshot in both periods; largest drops first")
+        else:
+            rows = store.regressions(args.threshold, at, period, args.below)
+            print(f"{len(rows):,} team(s) regressed by >= {args.threshold:g} point(s)"
+                  + (f" or fell below {args.below:g}" if args.below is not None else ""))
+        for d in rows[:args.top]:
+            print(f"  {d['team']:<24} {d['before']:>5.0f} -> {d['after']:>5.0f}  ({d['delta']:+.0f})")
+    print(f"({time.perf_counter() - t0:.3f}s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+from bisect import bisect_left, bisect_right
+from numbers import Real
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+from ai_diagnose import match_condition
+
+# model.json rules, compiled once into an index.
+#
+# Almost every rule tests one signal against one threshold. Those rules are
+# grouped by (signal, op) with their thresholds sorted, and a value matches a
+# contiguous run of them:
+#
+#   lt:  value < T   ->  rules after bisect_right(T, value)
+#   gt:  value > T   ->  rules before bisect_left(T, value)
+#   eq:  value == T  ->  dict lookup
+#
+# so finding a team's rules costs a binary search per signal, not a test per
+# rule. Rules with several conditions (all must hold) or an empty "when" are
+# kept aside and checked directly; there are few of them.
+#
+# Semantics are exactly those of ai_diagnose.rule_matches: a missing signal
+# never matches, and a condition uses the first of lt / gt / eq it has.
+#
+# For a fleet, evaluate() takes a (teams x signals) float matrix (NaN =
+# missing) and does the same searches with np.searchsorted. Because range
+# matches are runs, the result stores two cut points per team and group
+# instead of a teams x rules boolean matrix.
+
+OPS = ("lt", "gt", "eq")
+
+Condition = Tuple[str, str, object]          # (signal, op, threshold)
+
+def condition_of(signal: str, cond: dict) -> Condition:
+    for op in OPS:
+        if op in cond:
+            return signal, op, cond[op]
+    return signal, "never", None
+
+def _is_number(x) -> bool:
+    return isinstance(x, Real) and not isinstance(x, bool)
+
+class RangeGroup:
+    """Single-condition lt/gt rules on one signal, sorted by threshold."""
+
+    def __init__(self, op: str, entries: List[Tuple[float, int]]) -> None:
+        entries.sort()
+        self.op = op
+        self.thresholds = [t for t, _ in entries]
+        self.rule_ids = [r for _, r in entries]
+        self.thresholds_np = np.array(self.thresholds, dtype=float)
+        self.rule_ids_np = np.array(self.rule_ids, dtype=np.int64)
+
+    def match(self, value) -> List[int]:
+        if self.op == "lt":
+            return self.rule_ids[bisect_right(self.thresholds, value):]
+        return self.rule_ids[:bisect_left(self.thresholds, value)]
+
+    def cuts(self, column: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Per team, matches are rule_ids_np[lo:hi]."""
+        n = len(self.thresholds)
+        missing = np.isnan(column)
+        if self.op == "lt":
+            lo = np.searchsorted(self.thresholds_np, column, side="right")
+            hi = np.full(len(column), n)
+            lo[missing] = n
+        else:
+            lo = np.zeros(len(column), dtype=np.int64)
+            hi = np.searchsorted(self.thresholds_np, column, side="left")
+            hi[missing] = 0
+        return lo, hi
+
+class CompiledRules:
+    def __init__(self, model: dict) -> None:
+        self.rules: List[dict] = list(model.get("rules", []))
+        ranges: Dict[Tuple[str, str], List[Tuple[float, int]]] = {}
+        self.eq: Dict[str, Dict[object, List[int]]] = {}
+        self.always: List[int] = []                              # empty "when"
+        self.multi: List[Tuple[int, List[Condition]]] = []       # everything else
+
+        for i, rule in enumerate(self.rules):
+            conds = [condition_of(k, c) for k, c in rule.get("when", {}).items()]
+            if not conds:
+                self.always.append(i)
+            elif any(op == "never" for _, op, _ in conds):
+                continue
+            elif len(conds) == 1 and conds[0][1] == "eq":
+                signal, _, value = conds[0]
+                self.eq.setdefault(signal, {}).setdefault(value, []).append(i)
+            elif len(conds) == 1 and _is_number(conds[0][2]):
+                signal, op, threshold = conds[0]
+                ranges.setdefault((signal, op), []).append((threshold, i))
+            else:
+                self.multi.append((i, conds))
+
+        self.ranges = {key: RangeGroup(key[1], entries) for key, entries in ranges.items()}
+        self.by_signal: Dict[str, List[RangeGroup]] = {}
+        for (signal, _), group in self.ranges.items():
+            self.by_signal.setdefault(signal, []).append(group)
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    # --- one team ---
+
+    def matches(self, signals: dict) -> List[int]:
+        """Indices of matching rules, in model order."""
+        hits = list(self.always)
+        for signal, value in signals.items():
+            for group in self.by_signal.get(signal, ()):
+                hits.extend(group.match(value))
+            eq = self.eq.get(signal)
+            if eq:
+                try:
+                    hits.extend(eq.get(value, ()))
+                except TypeError:                # unhashable value: can't equal a JSON scalar
+                    pass
+        for i, conds in self.multi:
+            if all(s in signals and match_condition(signals[s], {op: t}) for s, op, t in conds):
+                hits.append(i)
+        hits.sort()
+        return hits
+
+    def find(self, signals: dict) -> List[dict]:
+        return [self.rules[i] for i in self.matches(signals)]
+
+    # --- whole fleet ---
+
+    def evaluate(self, matrix: np.ndarray, columns: Sequence[str]) -> "FleetMatches":
+        col = {name: j for j, name in enumerate(columns)}
+        n = len(matrix)
+        nan = np.full(n, np.nan)
+
+        def column(signal: str) -> np.ndarray:
+            return matrix[:, col[signal]] if signal in col else nan
+
+        runs = []
+        for (signal, _), group in self.ranges.items():
+            lo, hi = group.cuts(column(signal))
+            runs.append((group.rule_ids_np, lo, hi))
+
+        dense_ids: List[int] = list(self.always)
+        dense_cols: List[np.ndarray] = [np.ones(n, dtype=bool) for _ in self.always]
+        for signal, values in self.eq.items():
+            for value, ids in values.items():
+                hit = column(signal) == value if _is_number(value) or isinstance(value, bool) else np.zeros(n, dtype=bool)
+                for i in ids:
+                    dense_ids.append(i)
+                    dense_cols.append(hit)
+        for i, conds in self.multi:
+            hit = np.ones(n, dtype=bool)
+            for signal, op, t in conds:
+                hit &= _compare(column(signal), op, t)
+            dense_ids.append(i)
+            dense_cols.append(hit)
+
+        dense = np.column_stack(dense_cols) if dense_cols else np.zeros((n, 0), dtype=bool)
+        return FleetMatches(n, len(self.rules), runs, np.array(dense_ids, dtype=np.int64), dense)
+
+def _compare(values: np.ndarray, op: str, t) -> np.ndarray:
+    if not (_is_number(t) or isinstance(t, bool)):
+        return np.zeros(len(values), dtype=bool)      # numeric matrix never equals/orders against text
+    with np.errstate(invalid="ignore"):
+        if op == "lt":
+            return values < t
+        if op == "gt":
+            return values > t
+        return values == t
+
+class FleetMatches:
+    """Which rules matched which team, for a whole fleet (see CompiledRules.evaluate)."""
+
+    def __init__(self, teams: int, rules: int, runs: List[Tuple[np.ndarray, np.ndarray, np.ndarray]],
+                 dense_ids: np.ndarray, dense: np.ndarray) -> None:
+        self.teams = teams
+        self.rules = rules
+        self.runs = runs                  # (rule ids sorted by threshold, lo, hi) per range group
+        self.dense_ids = dense_ids        # rule id per column of `dense`
+        self.dense = dense                # (teams x len(dense_ids)) bool
+
+    def counts(self) -> np.ndarray:
+        """Number of matching rules per team."""
+        total = self.dense.sum(axis=1, dtype=np.int64)
+        for _, lo, hi in self.runs:
+            total += hi - lo
+        return total
+
+    def rule_counts(self) -> np.ndarray:
+        """Number of teams each rule matched, indexed like model["rules"]."""
+        out = np.zeros(self.rules, dtype=np.int64)
+        for ids, lo, hi in self.runs:
+            # +1 where a team's run starts, -1 where it ends; the running sum is teams per position
+            edges = np.bincount(lo, minlength=len(ids) + 1) - np.bincount(hi, minlength=len(ids) + 1)
+            out[ids] += np.cumsum(edges)[:len(ids)]
+        np.add.at(out, self.dense_ids, self.dense.sum(axis=0, dtype=np.int64))
+        return out
+
+    def team(self, i: int) -> List[int]:
+        """Indices of the rules matching team `i`, in model order."""
+        hits = [int(r) for ids, lo, hi in self.runs for r in ids[lo[i]:hi[i]]]
+        hits.extend(int(r) for r in self.dense_ids[self.dense[i]])
+        hits.sort()
+        return hits
+
+    def to_dense(self, start: int = 0, stop: int = None) -> np.ndarray:
+        """(teams x rules) bool matrix for teams[start:stop]; build it in slices for big fleets."""
+        stop = self.teams if stop is None else stop
+        out = np.zeros((stop - start, self.rules), dtype=bool)
+        for ids, lo, hi in self.runs:
+            pos = np.arange(len(ids))
+            inside = (pos >= lo[start:stop, None]) & (pos < hi[start:stop, None])
+            out[:, ids] |= inside
+        out[:, self.dense_ids] |= self.dense[start:stop]
+        return out
+
+def signal_matrix(teams: Iterable[dict], columns: Sequence[str] = None) -> Tuple[np.ndarray, List[str]]:
+    """(teams x signals) float matrix from team inputs; NaN where a team lacks a signal."""
+    teams = list(teams)
+    if columns is None:
+        columns = sorted({k for t in teams for k in t.get("signals", {})})
+    col = {name: j for j, name in enumerate(columns)}
+    matrix = np.full((len(teams), len(columns)), np.nan)
+    for i, t in enumerate(teams):
+        for k, v in t.get("signals", {}).items():
+            j = col.get(k)
+            if j is not None and (_is_number(v) or isinstance(v, bool)):
+                matrix[i, j] = v
+    return matrix, list(columns)
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+import operator
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:                 # only score_fleet() needs it
+    np = None
+
+# Maturity scoring driven by the "scoring" section of model.json.
+#
+#   score     base + points for each signal threshold met and each capability
+#             present, clamped to [min, max]; levels come from "below" bounds
+#   category  every item belongs to a category; a category's score is the
+#             share of its available points the team earned (0-100), and
+#             weighted_score combines them with the model's category weights
+#
+# A missing signal is scored as "missing_signal_value" (0, as the original
+# signals.get(name, 0) did). Models without a "scoring" section get
+# DEFAULT_SCORING, the scorecard maturity_score used to hard-code. score_fleet() computes the same numbers for a
+# whole fleet at once: the signal thresholds become a table, compared against
+# a (teams x signals) matrix in one step.
+
+OPS = {"lt": operator.lt, "lte": operator.le, "gt": operator.gt, "gte": operator.ge, "eq": operator.eq}
+
+DEFAULT_SCORING = {
+    "base": 50, "min": 0, "max": 100, "missing_signal_value": 0,
+    "signals": [
+        {"signal": "golden_path_adoption_pct", "gte": 60, "points": 10, "category": "SelfService"},
+        {"signal": "golden_path_adoption_pct", "lt": 40, "points": -10, "category": "SelfService"},
+        {"signal": "policy_violations_per_week", "lte": 10, "points": 8, "category": "Governance"},
+        {"signal": "policy_violations_per_week", "gt": 20, "points": -8, "category": "Governance"},
+        {"signal": "slo_burn_rate", "lte": 1.0, "points": 10, "category": "Observability"},
+        {"signal": "slo_burn_rate", "gt": 1.0, "points": -12, "category": "Observability"},
+        {"signal": "onboarding_days", "lte": 5, "points": 7, "category": "SelfService"},
+        {"signal": "onboarding_days", "gt": 7, "points": -7, "category": "SelfService"},
+        {"signal": "platform_nps", "gte": 40, "points": 8, "category": "FeedbackLoops"},
+        {"signal": "platform_nps", "lt": 20, "points": -10, "category": "FeedbackLoops"},
+    ],
+    "capabilities": [
+        {"capability": "self_service_provisioning", "points": 4, "category": "SelfService"},
+        {"capability": "policy_as_code", "points": 4, "category": "Governance"},
+        {"capability": "slo_defined", "points": 4, "category": "Observability"},
+        {"capability": "feedback_program", "points": 3, "category": "FeedbackLoops"},
+        {"capability": "platform_pm_process", "points": 3, "category": "PlatformProduct"},
+    ],
+    "levels": [
+        {"below": 50, "level": "Foundational"},
+        {"below": 75, "level": "Emerging"},
+        {"level": "Advanced"},
+    ],
+}
+
+# equal weights for DEFAULT_SCORING categories the model doesn't weigh itself
+DEFAULT_WEIGHTS = {i["category"]: 1.0 for i in DEFAULT_SCORING["signals"] + DEFAULT_SCORING["capabilities"]}
+
+# for_model() cache, oldest dropped first: a process normally scores with one or two models
+_cards: Dict[int, Tuple[dict, "Scorecard"]] = {}
+_CARDS_MAX = 8
+_NO_MODEL: dict = {}
+
+class Scorecard:
+    def __init__(self, model: dict) -> None:
+        spec = model.get("scoring")
+        self.weights = {name: c.get("weight", 0.0) for name, c in model.get("categories", {}).items()}
+        if not spec:
+            spec = DEFAULT_SCORING
+            self.weights = {**DEFAULT_WEIGHTS, **self.weights}
+        self.base = spec.get("base", 0)
+        self.min = spec.get("min", 0)
+        self.max = spec.get("max", 100)
+        self.missing = spec.get("missing_signal_value", 0)
+
+        # (signal, op, threshold, points, category)
+        self.signal_items: List[Tuple[str, str, float, float, str]] = []
+        for item in spec.get("signals", []):
+            ops = [op for op in OPS if op in item]
+            if len(ops) != 1:
+                raise ValueError(f"scoring item for {item.get('signal')!r} needs exactly one of {', '.join(OPS)}")
+            self.signal_items.append((item["signal"], ops[0], item[ops[0]], item["points"], item["category"]))
+        self.capability_items = [(c["capability"], c["points"], c["category"]) for c in spec.get("capabilities", [])]
+
+        self.categories = list(dict.fromkeys([i[4] for i in self.signal_items] + [c[2] for c in self.capability_items]))
+        unknown = [c for c in self.categories if c not in self.weights]
+        if unknown:
+            raise ValueError(f"scoring uses categories not in model['categories']: {', '.join(unknown)}")
+
+        # range of points per category, to express what a team earned as a 0-100 share
+        self.lo = {c: 0.0 for c in self.categories}
+        self.hi = {c: 0.0 for c in self.categories}
+        for points, cat in [(i[3], i[4]) for i in self.signal_items] + [(c[1], c[2]) for c in self.capability_items]:
+            if points < 0:
+                self.lo[cat] += points
+            else:
+                self.hi[cat] += points
+
+        levels = spec.get("levels", [])
+        if not levels or "below" in levels[-1]:
+            raise ValueError("scoring levels must end with a catch-all level (no 'below')")
+        self.bounds = [lv["below"] for lv in levels[:-1]]
+        self.level_names = [lv["level"] for lv in levels]
+
+    @classmethod
+    def for_model(cls, model: dict = None) -> "Scorecard":
+        """
+        The Scorecard for `model` (None: DEFAULT_SCORING), built once per model
+        object (don't mutate a model after scoring with it).
+        """
+        if model is None:
+            model = _NO_MODEL
+        hit = _cards.get(id(model))
+        if hit is None or hit[0] is not model:
+            _cards.pop(id(model), None)
+            while len(_cards) >= _CARDS_MAX:
+                del _cards[next(iter(_cards))]
+            hit = _cards[id(model)] = (model, cls(model))
+        return hit[1]
+
+    def level(self, score: float) -> str:
+        for bound, name in zip(self.bounds, self.level_names):
+            if score < bound:
+                return name
+        return self.level_names[-1]
+
+    def _weighted(self, category_scores: Dict[str, float]) -> float:
+        total = sum(self.weights[c] for c in self.categories)
+        if not total:
+            return 0.0
+        return sum(self.weights[c] * s for c, s in category_scores.items()) / total
+
+    def _share(self, cat: str, points: float) -> float:
+        span = self.hi[cat] - self.lo[cat]
+        return (points - self.lo[cat]) / span * 100 if span else 100.0
+
+    # --- one team ---
+
+    def score(self, signals: dict, capabilities: dict) -> dict:
+        points = {c: 0 for c in self.categories}
+        for name, op, threshold, pts, cat in self.signal_items:
+            if OPS[op](signals.get(name, self.missing), threshold):
+                points[cat] += pts
+        for name, pts, cat in self.capability_items:
+            if capabilities.get(name):
+                points[cat] += pts
+
+        score = max(self.min, min(self.max, self.base + sum(points.values())))
+        categories = {c: round(self._share(c, p), 1) for c, p in points.items()}
+        return {
+            "score": score,
+            "level": self.level(score),
+            "weighted_score": round(self._weighted(categories), 1),
+            "categories": categories,
+        }
+
+    # --- whole fleet ---
+
+    def score_fleet(self, signals: "np.ndarray", signal_columns: Sequence[str],
+                    capabilities: "np.ndarray", capability_columns: Sequence[str]) -> Dict[str, "np.ndarray"]:
+        """
+        Vectorized score(): `signals` is (teams x signals) with NaN for missing
+        values, `capabilities` is (teams x capabilities), truthy = present.
+        Returns arrays: score, level (index into level_names), weighted_score,
+        and categories (teams x len(self.categories), 0-100).
+        """
+        if np is None:
+            raise RuntimeError("score_fleet needs numpy (pip install numpy)")
+        n = len(signals)
+        cat_index = {c: k for k, c in enumerate(self.categories)}
+        points = np.zeros((n, len(self.categories)))
+
+        if self.signal_items:
+            col = {name: j for j, name in enumerate(signal_columns)}
+            filled = np.where(np.isnan(signals), self.missing, signals) if signals.size else signals
+            # the threshold table: one column of values per item, compared in one go per operator
+            values = np.column_stack([filled[:, col[s]] if s in col else np.full(n, float(self.missing))
+                                      for s, *_ in self.signal_items])
+            hits = np.zeros(values.shape, dtype=bool)
+            ops = np.array([op for _, op, *_ in self.signal_items])
+            thresholds = np.array([t for _, _, t, _, _ in self.signal_items], dtype=float)
+            for op, fn in OPS.items():
+                idx = np.flatnonzero(ops == op)
+                if len(idx):
+                    hits[:, idx] = fn(values[:, idx], thresholds[idx])
+            points += (hits * [p for *_, p, _ in self.signal_items]) @ self._onehot([i[4] for i in self.signal_items], cat_index)
+
+        if self.capability_items:
+            col = {name: j for j, name in enumerate(capability_columns)}
+            present = np.column_stack([capabilities[:, col[c]].astype(bool) if c in col else np.zeros(n, dtype=bool)
+                                       for c, _, _ in self.capability_items])
+            points += (present * [p for _, p, _ in self.capability_items]) @ self._onehot([i[2] for i in self.capability_items], cat_index)
+
+        score = np.clip(self.base + points.sum(axis=1), self.min, self.max)
+        lo = np.array([self.lo[c] for c in self.categories])
+        span = np.array([self.hi[c] - self.lo[c] for c in self.categories])
+        with np.errstate(invalid="ignore", divide="ignore"):
+            shares = np.where(span > 0, (points - lo) / span * 100, 100.0)
+        shares = np.round(shares, 1)
+        weights = np.array([self.weights[c] for c in self.categories])
+        weighted = np.round(shares @ weights / weights.sum(), 1) if weights.sum() else np.zeros(n)
+        return {
+            "score": score,
+            "level": np.searchsorted(np.array(self.bounds, dtype=float), score, side="right"),
+            "weighted_score": weighted,
+            "categories": shares,
+        }
+
+    @staticmethod
+    def _onehot(cats: List[str], cat_index: Dict[str, int]) -> "np.ndarray":
+        m = np.zeros((len(cats), len(cat_index)))
+        for i, c in enumerate(cats):
+            m[i, cat_index[c]] = 1.0
+        return m
+
+def capability_matrix(teams: Iterable[dict], columns: Sequence[str]) -> "np.ndarray":
+    """(teams x capabilities) bool matrix from team inputs."""
+    teams = list(teams)
+    out = np.zeros((len(teams), len(columns)), dtype=bool)
+    for i, t in enumerate(teams):
+        caps = t.get("capabilities", {})
+        for j, name in enumerate(columns):
+            out[i, j] = bool(caps.get(name))
+    return out
@@ -6,18 +6,24 @@ Run:
   python metrics_demo.py
 Optional:
   python metrics_demo.py --days 21 --seed 7
+  python metrics_demo.py --days 3650 --profile   # time per phase + flame graph (profile.speedscope.json)
 """
 
 import argparse
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
+import os
 import random
 import math
+import sys
 
 import pandas as pd
 import matplotlib.pyplot as plt
 from matplotlib.widgets import Button
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "shared"))
+import profiler
+
 
 @dataclass(frozen=True)
 class Event:
@@ -632,31 +638,8 @@ def plot_dashboard(days: int = 14) -> None:
     plt.show()
 
 
-def main():
-    ap = argparse.ArgumentParser()
-    ap.add_argument("--days", type=int, default=14)
-    ap.add_argument("--seed", type=int, default=42)
-    args = ap.parse_args()
-
-    events = generate_events(days=args.days, seed=args.seed)
-    df = to_dataframe(events)
-
-    # === DORA Metrics ===
-    deploys_per_day = compute_deployments_per_day(df)
-    mttr = compute_mttr(df)
-
-    # === SPACE Metrics ===
-    activity = compute_activity_metrics(df)
-    collaboration = compute_collaboration_metrics(df)
-    satisfaction = compute_satisfaction_metrics(df)
-    efficiency = compute_efficiency_metrics(df)
-    performance = compute_performance_metrics(df, mttr)
-
-    # === PVM Metrics ===
-    vcr = compute_pvm_vcr(df)
-    iar = compute_pvm_iar(df, args.days)
-    dtr = compute_pvm_dtr(df)
-
+def print_summary(days, deploys_per_day, mttr, activity, collaboration, satisfaction,
+                  efficiency, performance, vcr, iar, dtr) -> None:
     # === Summary Statistics ===
     print("\n" + "="*60)
     print("COMPREHENSIVE METRICS DASHBOARD SUMMARY")
@@ -664,7 +647,7 @@ def main():
 
     print("\n--- DORA METRICS (Delivery & Reliability) ---")
     avg_deploys = deploys_per_day["deployments"].mean() if len(deploys_per_day) else 0
-    print(f"Days observed: {args.days}")
+    print(f"Days observed: {days}")
     print(f"Avg deployments/day: {avg_deploys:.2f}")
     if len(mttr):
         avg_mttr = mttr["mttr_minutes"].mean()
@@ -721,6 +704,43 @@ def main():
     print(f"  Toil time: {dtr['toil_minutes']:.0f} minutes")
     print(f"  Feature time: {dtr['feature_minutes']:.0f} minutes")
 
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--days", type=int, default=14)
+    ap.add_argument("--seed", type=int, default=42)
+    profiler.add_arguments(ap)
+    args = ap.parse_args()
+
+    prof = profiler.from_args(args)
+    with prof.phase("load"):
+        events = generate_events(days=args.days, seed=args.seed)
+    with prof.phase("parse"):
+        df = to_dataframe(events)
+
+    with prof.phase("compute"):
+        # === DORA Metrics ===
+        deploys_per_day = compute_deployments_per_day(df)
+        mttr = compute_mttr(df)
+
+        # === SPACE Metrics ===
+        activity = compute_activity_metrics(df)
+        collaboration = compute_collaboration_metrics(df)
+        satisfaction = compute_satisfaction_metrics(df)
+        efficiency = compute_efficiency_metrics(df)
+        performance = compute_performance_metrics(df, mttr)
+
+        # === PVM Metrics ===
+        vcr = compute_pvm_vcr(df)
+        iar = compute_pvm_iar(df, args.days)
+        dtr = compute_pvm_dtr(df)
+
+    with prof.phase("render"):
+        print_summary(args.days, deploys_per_day, mttr, activity, collaboration, satisfaction,
+                      efficiency, performance, vcr, iar, dtr)
+    # the interactive dashboard waits on the user: stop profiling before it opens
+    prof.finish()
+
     print("\n" + "="*60)
     print("Launching interactive dashboard...")
     print("Tip: Use the seed input field to explore different scenarios!")
@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+Run the lesson's guardrails (validate.sh, lint.sh, scan.sh) over every
+Terraform root at once, and only where something changed.
+
+- discovers every directory with *.tf files (bad/, good/, better/, best/,
+  or hundreds of roots in a monorepo)
+- skips roots whose files, local modules and the tool versions hash the
+  same as in the last run, reusing that run's results
+- runs independent roots concurrently on a bounded pool; checks within a
+  root run in order (fmt, init, validate, lint, scan)
+- `terraform init` only re-runs when the lock file or the terraform /
+  provider / module blocks changed, and shares one provider plugin cache;
+  a failed init is never cached, so the next run tries again
+- offline by default: providers come only from a local provider mirror
+  (fill it once with --fill-mirror), tflint/trivy don't update, no version
+  checks
+- prints one merged report; exit code 1 if any check failed
+
+Usage (from lesson3/):
+  python3 scripts/iac_runner.py
+  python3 scripts/iac_runner.py infra/ --jobs 8 --checks validate,lint --format json
+  python3 scripts/iac_runner.py --fill-mirror         # once, online: `terraform providers mirror` per root
+  python3 scripts/iac_runner.py --force --online      # re-run all, allow provider downloads
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+STATE_FILE = ".iac_runner_state.json"
+SKIP_DIRS = {".terraform", ".git", "__pycache__", "node_modules"}
+ROOT_FILES = (".tf", ".tfvars", ".tf.json", ".terraform.lock.hcl", ".tflint.hcl", ".trivyignore")
+INIT_BLOCKS = re.compile(r"^(terraform|provider|module)\b")
+LOCAL_SOURCE = re.compile(r'^\s*source\s*=\s*"(\.\.?/[^"]*)"', re.M)
+INIT_STAMP = ".terraform/.iac_runner_init"
+
+# check name -> (tool, argv); "init" is a step of "validate", not reported on its own
+CHECKS = {
+    "fmt": ("terraform", ["terraform", "fmt", "-check", "-no-color"]),
+    "init": ("terraform", ["terraform", "init", "-backend=false", "-input=false", "-no-color"]),
+    "validate": ("terraform", ["terraform", "validate", "-no-color"]),
+    "lint": ("tflint", ["tflint", "--no-color"]),
+    "scan": ("trivy", ["trivy", "config", "--quiet", "--skip-check-update", "--exit-code", "1", "."]),
+}
+DEFAULT_CHECKS = ("fmt", "validate", "lint", "scan")
+
+def discover(paths: List[str]) -> List[str]:
+    roots = set()
+    for p in paths:
+        for root, dirs, files in os.walk(p):
+            dirs[:] = sorted(d for d in dirs if d not in SKIP_DIRS and not d.startswith("."))
+            if any(f.endswith(".tf") or f.endswith(".tf.json") for f in files):
+                roots.add(os.path.normpath(root))
+    return sorted(roots)
+
+def root_files(root: str) -> List[str]:
+    return sorted(f for f in os.listdir(root) if f.endswith(ROOT_FILES) and os.path.isfile(os.path.join(root, f)))
+
+def local_modules(root: str) -> List[str]:
+    """Directories of the local modules (`source = "../modules/x"`) a root uses, transitively."""
+    found: List[str] = []
+    todo = [root]
+    while todo:
+        d = todo.pop()
+        for name in root_files(d):
+            if not name.endswith(".tf"):
+                continue
+            with open(os.path.join(d, name), encoding="utf-8", errors="replace") as f:
+                sources = LOCAL_SOURCE.findall(f.read())
+            for src in sources:
+                mod = os.path.normpath(os.path.join(d, src))
+                if mod != os.path.normpath(root) and mod not in found and os.path.isdir(mod):
+                    found.append(mod)
+                    todo.append(mod)
+    return sorted(found)
+
+def fingerprint(root: str, extra: str) -> str:
+    """Hash of the root's files and of every local module it uses (checks see those too)."""
+    h = hashlib.blake2b(extra.encode(), digest_size=16)
+    for d in [root] + local_modules(root):
+        h.update(os.path.relpath(d, root).encode() + b"\0")
+        for name in root_files(d):
+            h.update(name.encode() + b"\0")
+            with open(os.path.join(d, name), "rb") as f:
+                h.update(hashlib.blake2b(f.read(), digest_size=16).digest())
+    return h.hexdigest()
+
+def init_inputs(root: str) -> str:
+    """Hash of what `terraform init` depends on: the lock file + terraform/provider/module blocks."""
+    h = hashlib.blake2b(digest_size=16)
+    for name in root_files(root):
+        with open(os.path.join(root, name), encoding="utf-8", errors="replace") as f:
+            text = f.read()
+        if name == ".terraform.lock.hcl":
+            h.update(text.encode())
+            continue
+        if not name.endswith(".tf"):
+            continue
+        depth, keep = 0, False
+        for line in text.splitlines():
+            if depth == 0:
+                keep = bool(INIT_BLOCKS.match(line))
+            if keep:
+                h.update(line.strip().encode() + b"\n")
+            depth = max(0, depth + line.count("{") - line.count("}"))
+    return h.hexdigest()
+
+def tool_versions(tools: List[str]) -> Dict[str, Optional[str]]:
+    """First line of `<tool> --version`, or None when the tool isn't installed (checked once per run)."""
+    out: Dict[str, Optional[str]] = {}
+    for tool in tools:
+        if not shutil.which(tool):
+            out[tool] = None
+            continue
+        try:
+            p = subprocess.run([tool, "--version"], capture_output=True, text=True, timeout=30,
+                               env=dict(os.environ, CHECKPOINT_DISABLE="1"))
+            out[tool] = (p.stdout or p.stderr).strip().splitlines()[0] if (p.stdout or p.stderr).strip() else "unknown"
+        except (OSError, subprocess.TimeoutExpired):
+            out[tool] = None
+    return out
+
+def tool_env(plugin_cache: str, mirror: str, online: bool) -> Dict[str, str]:
+    os.makedirs(plugin_cache, exist_ok=True)
+    env = dict(os.environ, CHECKPOINT_DISABLE="1", TF_IN_AUTOMATION="1", TF_INPUT="0",
+               TF_PLUGIN_CACHE_DIR=plugin_cache)
+    if not online:
+        # install only from the mirror; terraform doesn't allow the plugin cache to double as one
+        if os.path.abspath(mirror) == os.path.abspath(plugin_cache):
+            raise SystemExit("--mirror must be a different directory from --plugin-cache")
+        os.makedirs(mirror, exist_ok=True)
+        cfg = os.path.join(os.path.dirname(os.path.abspath(mirror)), ".iac_runner_offline.tfrc")
+        with open(cfg, "w", encoding="utf-8") as f:
+            f.write("provider_installation {\n"
+                    f"  filesystem_mirror {{\n    path = {json.dumps(os.path.abspath(mirror))}\n  }}\n"
+                    "  direct {\n    exclude = [\"*/*/*\"]\n  }\n}\n")
+        env["TF_CLI_CONFIG_FILE"] = cfg
+    return env
+
+def fill_mirror(roots: List[str], mirror: str, env: Dict[str, str]) -> bool:
+    """`terraform providers mirror` for every root (needs network); True if all succeeded."""
+    ok = True
+    for root in roots:
+        p = subprocess.run(["terraform", "providers", "mirror", os.path.abspath(mirror)], cwd=root, env=env,
+                           capture_output=True, text=True)
+        print(f"{'✅' if p.returncode == 0 else '❌'} {root}")
+        if p.returncode != 0:
+            print((p.stdout + p.stderr).strip())
+            ok = False
+    return ok
+
+class Runner:
+    def __init__(self, checks: List[str], versions: Dict[str, Optional[str]], env: Dict[str, str],
+                 timeout_s: float = 600) -> None:
+        self.checks = checks
+        self.versions = versions
+        self.env = env
+        self.timeout_s = timeout_s
+        # terraform's plugin cache isn't safe for concurrent writers: one init at a time
+        self.init_lock = threading.Lock()
+
+    def run(self, argv: List[str], cwd: str) -> Tuple[str, str, float]:
+        t0 = time.perf_counter()
+        try:
+            p = subprocess.run(argv, cwd=cwd, env=self.env, capture_output=True, text=True, timeout=self.timeout_s)
+            status = "pass" if p.returncode == 0 else "fail"
+            output = (p.stdout + p.stderr).strip()
+        except subprocess.TimeoutExpired:
+            status, output = "fail", f"timed out after {self.timeout_s:.0f}s"
+        return status, output, time.perf_counter() - t0
+
+    def check_root(self, root: str) -> Dict[str, dict]:
+        """{check: {"status", "output", "seconds"}}; a failed init also has "step": "init"."""
+        results: Dict[str, dict] = {}
+        for name in self.checks:
+            tool, argv = CHECKS[name]
+            if self.versions.get(tool) is None:
+                results[name] = {"status": "skipped", "output": f"{tool} not installed", "seconds": 0.0}
+                continue
+            if name == "validate":
+                init = self.ensure_init(root)
+                if init is not None:
+                    results[name] = init
+                    continue
+            status, output, secs = self.run(argv, root)
+            results[name] = {"status": status, "output": output, "seconds": round(secs, 3)}
+        return results
+
+    def ensure_init(self, root: str) -> Optional[dict]:
+        """None when the root is initialized (now or already); the failed check result otherwise."""
+        stamp = os.path.join(root, INIT_STAMP)
+        try:
+            with open(stamp, encoding="utf-8") as f:
+                if f.read().strip() == init_inputs(root):
+                    return None
+        except OSError:
+            pass
+        with self.init_lock:
+            status, output, secs = self.run(CHECKS["init"][1], root)
+        if status != "pass":
+            return {"status": "fail", "output": "terraform init failed:\n" + output, "seconds": round(secs, 3),
+                    "step": "init"}
+        os.makedirs(os.path.dirname(stamp), exist_ok=True)
+        with open(stamp, "w", encoding="utf-8") as f:
+            f.write(init_inputs(root))          # after init: it may have written the lock file
+        return None
+
+def load_state(path: str) -> Dict[str, dict]:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f).get("roots", {})
+    except (OSError, ValueError):
+        return {}
+
+def save_state(path: str, roots: Dict[str, dict]) -> None:
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump({"roots": roots}, f, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+def run_all(roots: List[str], checks: List[str], state: Dict[str, dict], runner: Runner,
+            jobs: int, force: bool = False) -> Dict[str, dict]:
+    """
+    {root: {"fingerprint", "cached", "checks": {name: result}}}; `state` is
+    updated in place. A root whose init failed (e.g. a provider missing from
+    the mirror) isn't stored, so the next run checks it again.
+    """
+    extra = json.dumps([checks, runner.versions], sort_keys=True)
+    prints = {root: fingerprint(root, extra) for root in roots}
+    todo = [r for r in roots if force or state.get(r, {}).get("fingerprint") != prints[r]]
+
+    def check(root: str) -> Tuple[Dict[str, dict], str]:
+        results = runner.check_root(root)
+        # re-hash afterwards: init can create .terraform.lock.hcl, which is part of the fingerprint
+        return results, fingerprint(root, extra)
+
+    report: Dict[str, dict] = {}
+    for r in roots:
+        if r not in todo:
+            report[r] = {**state[r], "cached": True}
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        for root, (results, fp) in zip(todo, pool.map(check, todo)):
+            report[root] = {"fingerprint": fp, "checks": results, "cached": False}
+            if any(res.get("step") == "init" for res in results.values()):
+                state.pop(root, None)
+            else:
+                state[root] = {"fingerprint": fp, "checks": results}
+    for r in [r for r in state if r not in prints]:
+        del state[r]                       # roots that no longer exist
+    return report
+
+ICONS = {"pass": "✅", "fail": "❌", "skipped": "⏭ "}
+
+def print_report(report: Dict[str, dict], checks: List[str], elapsed: float, tail: int = 15) -> None:
+    print("==============================================")
+    print("IaC guardrails")
+    print("==============================================")
+    width = max([len(r) for r in report] + [4])
+    print(f"{'root':<{width}}  " + "  ".join(f"{c:<9}" for c in checks))
+    for root in sorted(report):
+        r = report[root]
+        cells = "  ".join(f"{ICONS[r['checks'][c]['status']]} {r['checks'][c]['status']:<6}" for c in checks)
+        print(f"{root:<{width}}  {cells}{'  (cached)' if r['cached'] else ''}")
+
+    for root in sorted(report):
+        for c in checks:
+            res = report[root]["checks"][c]
+            if res["status"] == "fail":
+                lines = res["output"].splitlines()
+                print(f"\n--- {root}: {c}")
+                print("\n".join(lines[:tail]) + (f"\n... ({len(lines) - tail} more lines)" if len(lines) > tail else ""))
+
+    ran = sum(1 for r in report.values() if not r["cached"])
+    skipped = sorted({f"{c}" for r in report.values() for c, res in r["checks"].items() if res["status"] == "skipped"})
+    print(f"\n{len(report)} root(s): {ran} checked, {len(report) - ran} unchanged (cached); {elapsed:.2f}s")
+    if skipped:
+        print(f"Skipped (tool not installed): {', '.join(skipped)}")
+
+def main():
+    ap = argparse.ArgumentParser(description="Incremental, parallel terraform/tflint/trivy checks over every root")
+    ap.add_argument("paths", nargs="*", default=["."], help="Directories to search for Terraform roots")
+    ap.add_argument("--checks", default=",".join(DEFAULT_CHECKS),
+                    help=f"Comma-separated subset of {', '.join(DEFAULT_CHECKS)}")
+    ap.add_argument("--jobs", type=int, default=min(4, os.cpu_count() or 1), help="Roots checked concurrently")
+    ap.add_argument("--state", default=STATE_FILE, help=f"Results from the last run (default: {STATE_FILE})")
+    ap.add_argument("--force", action="store_true", help="Re-check every root")
+    ap.add_argument("--plugin-cache", default=os.path.expanduser("~/.terraform.d/plugin-cache"),
+                    help="Provider plugin cache shared by all roots")
+    ap.add_argument("--mirror", default=os.path.expanduser("~/.terraform.d/provider-mirror"),
+                    help="Provider mirror offline inits install from (not the plugin cache)")
+    ap.add_argument("--fill-mirror", action="store_true",
+                    help="Run `terraform providers mirror` for every root into --mirror, then exit")
+    ap.add_argument("--online", action="store_true", help="Let terraform init download missing providers")
+    ap.add_argument("--format", choices=["text", "json"], default="text")
+    args = ap.parse_args()
+
+    checks = [c for c in args.checks.split(",") if c]
+    unknown = [c for c in checks if c not in DEFAULT_CHECKS]
+    if unknown:
+        ap.error(f"unknown check(s): {', '.join(unknown)}")
+
+    start = time.perf_counter()
+    roots = discover(args.paths)
+    if args.fill_mirror:
+        if not shutil.which("terraform"):
+            sys.exit("--fill-mirror needs terraform on PATH")
+        os.makedirs(args.mirror, exist_ok=True)
+        sys.exit(0 if fill_mirror(roots, args.mirror, tool_env(args.plugin_cache, args.mirror, online=True)) else 1)
+    versions = tool_versions(sorted({CHECKS[c][0] for c in checks}))
+    runner = Runner(checks, versions, tool_env(args.plugin_cache, args.mirror, args.online))
+    state = load_state(args.state)
+    report = run_all(roots, checks, state, runner, args.jobs, args.force)
+    save_state(args.state, state)
+
+    if args.format == "json":
+        print(json.dumps({"tools": versions, "roots": report}, indent=2))
+    else:
+        print_report(report, checks, time.perf_counter() - start)
+    failed = any(res["status"] == "fail" for r in report.values() for res in r["checks"].values())
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
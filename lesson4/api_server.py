@@ -1,6 +1,9 @@
 #!/usr/bin/env python3
-from http.server import BaseHTTPRequestHandler, HTTPServer
-import json, base64, hmac, hashlib, time
+from http.server import HTTPServer
+import json, os, sys, base64, hmac, hashlib, time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "shared"))
+import instrument
 
 HOST = "127.0.0.1"
 PORT = 8082
@@ -10,6 +13,7 @@ def b64url_decode(s: str) -> bytes:
     pad = "=" * (-len(s) % 4)
     return base64.urlsafe_b64decode(s + pad)
 
+@instrument.timed("jwt_verify_seconds", "Time to verify a bearer token")
 def verify_jwt(token: str) -> dict:
     parts = token.split(".")
     if len(parts) != 3:
@@ -30,7 +34,9 @@ def verify_jwt(token: str) -> dict:
 
     return payload
 
-class Handler(BaseHTTPRequestHandler):
+class Handler(instrument.MetricsHandler):
+    metric_paths = ("/platform/resource", "/metrics")
+
     def _send(self, code=200, body=None):
         self.send_response(code)
         self.send_header("Content-Type", "application/json")
@@ -38,6 +44,9 @@ class Handler(BaseHTTPRequestHandler):
         self.wfile.write(json.dumps(body or {}).encode("utf-8"))
 
     def do_GET(self):
+        if self.path == "/metrics":
+            instrument.send_metrics(self)
+            return
         if self.path != "/platform/resource":
             self._send(404, {"error": "not_found"})
             return
@@ -1,7 +1,10 @@
 #!/usr/bin/env python3
-from http.server import BaseHTTPRequestHandler, HTTPServer
+from http.server import HTTPServer
 from urllib.parse import parse_qs, urlparse
-import json, time, secrets, base64, hmac, hashlib
+import json, os, sys, time, secrets, base64, hmac, hashlib
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "shared"))
+import instrument
 
 HOST = "127.0.0.1"
 PORT = 8081
@@ -19,6 +22,7 @@ def sign_hs256(message: bytes) -> str:
     sig = hmac.new(SIGNING_SECRET, message, hashlib.sha256).digest()
     return b64url(sig)
 
+@instrument.timed("jwt_encode_seconds", "Time to sign an access token")
 def jwt_encode(payload: dict) -> str:
     header = {"alg": "HS256", "typ": "JWT"}
     h = b64url_json(header)
@@ -27,7 +31,9 @@ def jwt_encode(payload: dict) -> str:
     s = sign_hs256(to_sign)
     return f"{h}.{p}.{s}"
 
-class Handler(BaseHTTPRequestHandler):
+class Handler(instrument.MetricsHandler):
+    metric_paths = ("/activate", "/device/code", "/oauth/token", "/metrics")
+
     def _send(self, code=200, content_type="application/json", body=b"{}"):
         self.send_response(code)
         self.send_header("Content-Type", content_type)
@@ -41,6 +47,9 @@ class Handler(BaseHTTPRequestHandler):
 
     def do_GET(self):
         u = urlparse(self.path)
+        if u.path == "/metrics":
+            instrument.send_metrics(self)
+            return
         if u.path != "/activate":
             self._send(404, body=b'{"error":"not_found"}')
             return
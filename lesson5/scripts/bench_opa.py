@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Per-file process cost vs one long-lived engine, on generated Deployments.
+
+  fork per file   what check.sh does: two `opa eval` runs per file (timed on
+                  a sample and extrapolated). Without opa installed, one
+                  `python3 scripts/rego_lite.py FILE` per file stands in, to
+                  show what a process start per file costs.
+  batched         opa_batch.py's path: one engine, inputs in batches
+                  (opa server if installed, and the embedded evaluator)
+  cached re-run   the same check again, every document a cache hit
+
+Usage (from lesson5/):
+  python3 scripts/bench_opa.py --n 5000
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from opa_batch import check, pick_engine
+
+def make_deployment(rng: random.Random, i: int) -> dict:
+    labels = {"team": f"team-{i % 40}", "environment": rng.choice(["dev", "staging", "prod"])}
+    if rng.random() < 0.1:
+        del labels["team"]
+    containers = []
+    for c in range(rng.choice([1, 1, 2, 3])):
+        resources = {"requests": {"cpu": "100m", "memory": "128Mi"}, "limits": {"cpu": "500m", "memory": "256Mi"}}
+        if rng.random() < 0.1:
+            del resources["limits"]["memory"]
+        tag = "latest" if rng.random() < 0.05 else f"1.{i % 9}.{c}"
+        containers.append({"name": f"c{c}", "image": f"ghcr.io/example/svc-{i}:{tag}", "resources": resources})
+    pod = {"containers": containers}
+    if rng.random() < 0.9:
+        pod["securityContext"] = {"runAsNonRoot": rng.random() < 0.95}
+    return {"apiVersion": "apps/v1", "kind": "Deployment",
+            "metadata": {"name": f"svc-{i}", "labels": labels}, "spec": {"template": {"spec": pod}}}
+
+def time_forks(files, policy: str, opa: bool) -> float:
+    t0 = time.perf_counter()
+    for path in files:
+        if opa:
+            for query in ("data.cnpe.compliance.allow", "data.cnpe.compliance.violations"):
+                subprocess.run(["opa", "eval", "-f", "raw", "-d", policy, "-i", path, query],
+                               stdout=subprocess.DEVNULL, check=False)
+        else:
+            subprocess.run([sys.executable, os.path.join(os.path.dirname(__file__), "rego_lite.py"),
+                            "-d", policy, path], stdout=subprocess.DEVNULL, check=False)
+    return time.perf_counter() - t0
+
+def main():
+    ap = argparse.ArgumentParser(description="Fork-per-file vs batched policy evaluation")
+    ap.add_argument("--n", type=int, default=5000, help="Deployments to generate")
+    ap.add_argument("--fork-sample", type=int, default=100, help="Files to time the fork path on")
+    ap.add_argument("--batch-size", type=int, default=256)
+    ap.add_argument("-d", "--policy", default="policies/k8s.rego")
+    args = ap.parse_args()
+
+    rng = random.Random(5)
+    with tempfile.TemporaryDirectory() as tmp:
+        files = []
+        for i in range(args.n):
+            path = os.path.join(tmp, f"deploy-{i:05d}.json")
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(make_deployment(rng, i), f)
+            files.append(path)
+
+        has_opa = shutil.which("opa") is not None
+        sample = files[:args.fork_sample]
+        fork_s = time_forks(sample, args.policy, has_opa) / len(sample) * len(files)
+        rows = [(f"fork per file ({'2x opa eval' if has_opa else 'python, opa not installed'})", fork_s,
+                 f"extrapolated from {len(sample)} files")]
+
+        for engine in (["opa"] if has_opa else []) + ["embedded"]:
+            cache = {}
+            t0 = time.perf_counter()
+            results, _ = check([tmp], args.policy, pick_engine(engine), cache, args.batch_size)
+            cold = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            _, stats = check([tmp], args.policy, engine, cache, args.batch_size)
+            warm = time.perf_counter() - t0
+            denied = sum(1 for _, r in results if r.get("allow") is not True)
+            rows.append((f"batched, {engine}", cold, f"{denied:,} denied"))
+            rows.append((f"cached re-run, {engine}", warm, f"{stats['cached']:,} cache hits"))
+
+    print(f"{args.n:,} generated Deployments")
+    for name, secs, note in rows:
+        print(f"  {name:<42} {secs:8.2f}s  {args.n / secs:9,.0f}/s   {note}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Check many manifests through one long-lived policy engine.
+
+Instead of forking `opa eval` twice per file (check.sh), this starts one
+engine and streams every input through it in batches:
+
+  opa        `opa run --server` on localhost; each batch is one POST to
+             /v1/query that evaluates the whole policy package per input,
+             so allow and violations come back from a single query
+  embedded   scripts/rego_lite.py in-process (no OPA binary needed)
+  auto       opa if it's on PATH, else embedded
+
+Results are cached by content hash (with the policy's hash), so documents
+that haven't changed since the last run are not evaluated again.
+
+Usage:
+  python3 scripts/opa_batch.py inputs/
+  python3 scripts/opa_batch.py k8s/ --engine opa --batch-size 500 --format json
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import shutil
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from typing import Any, Dict, List, Optional, Tuple
+
+import yaml
+
+from rego_lite import DEFAULT_POLICY, Doc, discover, evaluate_all, iter_docs, parse_doc, print_check
+
+CACHE_FILE = ".opa_cache.json"
+RULES = ("allow", "violations")
+
+def content_hash(data: str) -> str:
+    return hashlib.blake2b(data.encode("utf-8"), digest_size=16).hexdigest()
+
+def package_of(src: str) -> str:
+    m = re.search(r"^\s*package\s+([\w.]+)", src, re.M)
+    if not m:
+        raise ValueError("policy has no package declaration")
+    return m.group(1)
+
+class OpaServer:
+    """`opa run --server` with the policy loaded, for as long as the `with` block lasts."""
+
+    def __init__(self, policy_path: str, package: str, opa: str = "opa", timeout_s: float = 15.0) -> None:
+        self.policy_path = policy_path
+        # one query per input for the whole package document: allow + violations together
+        self.query = f"results := [r | d := input[_]; r := data.{package} with input as d]"
+        self.opa = opa
+        self.timeout_s = timeout_s
+        self.proc: Optional[subprocess.Popen] = None
+        self.url = ""
+
+    def __enter__(self) -> "OpaServer":
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            port = s.getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}"
+        self.proc = subprocess.Popen(
+            [self.opa, "run", "--server", "--addr", f"127.0.0.1:{port}", "--log-level", "error", self.policy_path],
+            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        deadline = time.monotonic() + self.timeout_s
+        while True:
+            if self.proc.poll() is not None:
+                raise RuntimeError(f"opa exited: {self.proc.stderr.read().decode(errors='replace').strip()}")
+            try:
+                with urllib.request.urlopen(f"{self.url}/health", timeout=1):
+                    return self
+            except OSError:
+                if time.monotonic() > deadline:
+                    self.__exit__()
+                    raise RuntimeError(f"opa server didn't become healthy within {self.timeout_s:.0f}s")
+                time.sleep(0.05)
+
+    def __exit__(self, *exc) -> None:
+        if self.proc and self.proc.poll() is None:
+            self.proc.terminate()
+            try:
+                self.proc.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.proc.kill()
+
+    def evaluate(self, inputs: List[Any]) -> List[dict]:
+        body = json.dumps({"query": self.query, "input": inputs}).encode("utf-8")
+        req = urllib.request.Request(f"{self.url}/v1/query", data=body, headers={"Content-Type": "application/json"})
+        try:
+            with urllib.request.urlopen(req, timeout=300) as resp:
+                result = json.load(resp).get("result", [])
+        except urllib.error.HTTPError as e:
+            raise RuntimeError(f"opa query failed: {e.read().decode(errors='replace')}") from e
+        if not result:
+            raise RuntimeError("opa returned no result (is the package name right?)")
+        return result[0]["results"]
+
+def evaluate_opa(server: OpaServer, docs: List[Doc], batch_size: int) -> Dict[str, dict]:
+    out: Dict[str, dict] = {}
+    parsed: List[Tuple[str, Any]] = []
+    for source, fmt, text in docs:
+        try:
+            doc = parse_doc(fmt, text)
+        except (ValueError, yaml.YAMLError) as e:
+            out[source] = {"error": f"invalid {fmt.upper()}: {str(e).splitlines()[0]}"}
+            continue
+        if doc is not None:
+            parsed.append((source, doc))
+    for i in range(0, len(parsed), batch_size):
+        batch = parsed[i:i + batch_size]
+        for (source, _), r in zip(batch, server.evaluate([d for _, d in batch])):
+            out[source] = {k: r[k] for k in RULES if k in r}
+    return out
+
+def evaluate_embedded(src: str, docs: List[Doc], batch_size: int, workers: Optional[int]) -> Dict[str, dict]:
+    return {r.pop("source"): r for r in evaluate_all(src, docs, list(RULES), workers, batch_size)}
+
+def load_cache(path: str, fingerprint: str) -> Dict[str, dict]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return cache.get("results", {}) if cache.get("policy") == fingerprint else {}
+
+def save_cache(path: str, fingerprint: str, results: Dict[str, dict]) -> None:
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"policy": fingerprint, "results": results}, f, separators=(",", ":"))
+    os.replace(tmp, path)
+
+def pick_engine(name: str) -> str:
+    if name == "auto":
+        return "opa" if shutil.which("opa") else "embedded"
+    if name == "opa" and not shutil.which("opa"):
+        raise SystemExit("opa not found on PATH (use --engine embedded)")
+    return name
+
+def check(paths: List[str], policy_path: str, engine: str, cache: Dict[str, dict], batch_size: int = 256,
+          workers: Optional[int] = None) -> Tuple[List[Tuple[str, dict]], Dict[str, Any]]:
+    """
+    [(source, result)] in input order, plus stats. `cache` maps content hash ->
+    result; it is updated in place and pruned to the documents seen.
+    """
+    with open(policy_path, encoding="utf-8") as f:
+        src = f.read()
+    docs = list(iter_docs(discover(paths)))
+    digests = {source: content_hash(text) for source, _, text in docs}
+    pending: Dict[str, Doc] = {}
+    for doc in docs:
+        d = digests[doc[0]]
+        if d not in cache and d not in pending:
+            pending[d] = doc                      # identical documents are evaluated once
+
+    t0 = time.perf_counter()
+    todo = list(pending.values())
+    if todo and engine == "opa":
+        with OpaServer(policy_path, package_of(src)) as server:
+            fresh = evaluate_opa(server, todo, batch_size)
+    elif todo:
+        fresh = evaluate_embedded(src, todo, batch_size, workers)
+    else:
+        fresh = {}
+    for d, (source, _, _) in pending.items():
+        # documents that parsed to nothing (empty YAML) have no result; remember that too
+        cache[d] = fresh.get(source, {})
+
+    live = set(digests.values())
+    for d in [d for d in cache if d not in live]:
+        del cache[d]
+
+    results = [(source, cache[digests[source]]) for source, _, _ in docs if cache[digests[source]]]
+    stats = {"engine": engine, "documents": len(docs), "evaluated": len(pending),
+             "cached": len(docs) - sum(1 for s, _, _ in docs if digests[s] in pending),
+             "evaluate_s": time.perf_counter() - t0}
+    return results, stats
+
+def main():
+    ap = argparse.ArgumentParser(description="Check many manifests through one long-lived policy engine")
+    ap.add_argument("paths", nargs="+", help="JSON/YAML files (multi-document OK), directories, or - for stdin")
+    ap.add_argument("-d", "--policy", default=DEFAULT_POLICY)
+    ap.add_argument("--engine", choices=["auto", "opa", "embedded"], default="auto")
+    ap.add_argument("--batch-size", type=int, default=256, help="Inputs per query / worker task")
+    ap.add_argument("--workers", type=int, default=None, help="Embedded engine worker processes")
+    ap.add_argument("--cache", default=CACHE_FILE, help=f"Result cache file (default: {CACHE_FILE})")
+    ap.add_argument("--no-cache", action="store_true", help="Re-evaluate everything")
+    ap.add_argument("--format", choices=["text", "json"], default="text")
+    args = ap.parse_args()
+
+    start = time.perf_counter()
+    engine = pick_engine(args.engine)
+    with open(args.policy, "rb") as f:
+        # cached results are only valid for the policy (and engine) that produced them
+        fingerprint = hashlib.sha256(f.read() + engine.encode()).hexdigest()[:16]
+    cache = {} if args.no_cache else load_cache(args.cache, fingerprint)
+
+    try:
+        results, stats = check(args.paths, args.policy, engine, cache, args.batch_size, args.workers)
+    except FileNotFoundError as e:
+        print(e, file=sys.stderr)
+        sys.exit(2)
+    if not args.no_cache:
+        save_cache(args.cache, fingerprint, cache)
+    if not results:
+        print(f"no documents found in: {' '.join(args.paths)}", file=sys.stderr)
+        sys.exit(2)
+    denied = {s for s, r in results if "error" in r or r.get("allow") is not True}
+
+    if args.format == "json":
+        for source, r in results:
+            print(json.dumps({"source": source, **r}, ensure_ascii=False))
+    elif len(results) == 1:
+        print_check(results[0][1])
+    else:
+        for source, r in results:
+            if source in denied:
+                print(f"== {source}")
+                print_check(r)
+                print("")
+        print(f"{len(results)} input(s): {len(results) - len(denied)} allowed, {len(denied)} denied")
+    print(f"[{stats['engine']}] {stats['documents']} document(s): {stats['evaluated']} evaluated, "
+          f"{stats['cached']} from cache, {time.perf_counter() - start:.2f}s", file=sys.stderr)
+
+    sys.exit(1 if denied else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,776 @@
+#!/usr/bin/env python3
+"""
+Evaluate a Rego policy in-process, for many inputs at once.
+
+check.sh starts `opa eval` twice per input file; across thousands of
+manifests in CI that is mostly process start-up. This evaluator compiles
+the policy once and evaluates JSON files, YAML files (including multi-
+document streams) and directories of them, in parallel.
+
+It understands the subset of Rego that policies/k8s.rego uses:
+
+  package / import (ignored) / default NAME := value
+  NAME contains TERM if { ... }        partial set rules (also NAME[TERM] { ... })
+  NAME if { ... }, NAME := TERM if { ... }
+  body: x := expr, a == b (!=, <, <=, >, >=, =), not expr, bare expressions
+  terms: input / data.<package> / rule / variable refs with .field, [key],
+         [_] and [var] iteration; string, number, true/false/null, arrays
+  builtins: count, sprintf, startswith, endswith, contains, lower, upper, concat
+
+with Rego semantics: an undefined ref fails the expression, `not x` holds
+when x is undefined or false, rules with a bad builtin argument are simply
+undefined, and set results are deduplicated and sorted. Anything outside the
+subset is a compile error, so a policy never silently evaluates differently:
+use `opa` for those.
+
+Usage:
+  python3 scripts/rego_lite.py inputs/bad-deploy.json
+  python3 scripts/rego_lite.py inputs/ manifests.yaml --workers 8 --format json
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import yaml
+
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+DEFAULT_POLICY = "policies/k8s.rego"
+INPUT_SUFFIXES = (".json", ".yaml", ".yml")
+
+class RegoError(Exception):
+    pass
+
+class _Undefined(Exception):
+    """A builtin got arguments it can't handle: the expression is undefined (as in OPA)."""
+
+UNDEFINED = object()
+Env = Dict[str, Any]
+
+# --- values ---
+
+class RegoSet(list):
+    """A Rego set: unique members in Rego's sort order."""
+
+    def __init__(self, items: Iterable[Any] = ()) -> None:
+        unique = {json.dumps(canonical(v), sort_keys=True): v for v in items}
+        super().__init__(sorted(unique.values(), key=order_key))
+
+def canonical(v: Any) -> Any:
+    if isinstance(v, RegoSet):
+        return {"$set": [canonical(x) for x in v]}
+    if isinstance(v, list):
+        return [canonical(x) for x in v]
+    if isinstance(v, dict):
+        return {k: canonical(x) for k, x in v.items()}
+    return v
+
+def order_key(v: Any) -> tuple:
+    # null < booleans < numbers < strings < arrays < objects < sets
+    if v is None:
+        return (0,)
+    if isinstance(v, bool):
+        return (1, v)
+    if isinstance(v, (int, float)):
+        return (2, v)
+    if isinstance(v, str):
+        return (3, v)
+    if isinstance(v, RegoSet):
+        return (6, [order_key(x) for x in v])
+    if isinstance(v, list):
+        return (4, [order_key(x) for x in v])
+    return (5, sorted((k, order_key(x)) for k, x in v.items()))
+
+def rego_equal(a: Any, b: Any) -> bool:
+    # unlike Python, true != 1 and arrays != sets
+    if isinstance(a, bool) or isinstance(b, bool):
+        return type(a) is type(b) and a == b
+    if isinstance(a, RegoSet) != isinstance(b, RegoSet):
+        return False
+    if isinstance(a, (int, float)) and isinstance(b, (int, float)):
+        return a == b
+    if type(a) is not type(b):
+        return False
+    if isinstance(a, list):
+        return len(a) == len(b) and all(rego_equal(x, y) for x, y in zip(a, b))
+    if isinstance(a, dict):
+        return a.keys() == b.keys() and all(rego_equal(a[k], b[k]) for k in a)
+    return a == b
+
+COMPARE = {
+    "==": rego_equal,
+    "!=": lambda a, b: not rego_equal(a, b),
+    "<": lambda a, b: order_key(a) < order_key(b),
+    "<=": lambda a, b: order_key(a) <= order_key(b),
+    ">": lambda a, b: order_key(a) > order_key(b),
+    ">=": lambda a, b: order_key(a) >= order_key(b),
+}
+
+# --- builtins ---
+
+def _str(*args: Any) -> None:
+    if not all(isinstance(a, str) for a in args):
+        raise _Undefined
+
+def fmt_value(v: Any) -> str:
+    if isinstance(v, str):
+        return v
+    if isinstance(v, bool) or v is None:
+        return json.dumps(v)
+    if isinstance(v, (int, float)):
+        return str(int(v)) if isinstance(v, float) and v.is_integer() else str(v)
+    return json.dumps(canonical(v), separators=(",", ":"))
+
+def rego_sprintf(fmt: Any, args: Any) -> str:
+    if not isinstance(fmt, str) or not isinstance(args, list):
+        raise _Undefined
+    values = iter(args)
+
+    def verb(m: "re.Match") -> str:
+        if m.group(1) == "%":
+            return "%"
+        v = next(values, UNDEFINED)
+        if v is UNDEFINED:
+            return f"%!{m.group(1)}(MISSING)"
+        if m.group(1) == "q":
+            return json.dumps(v) if isinstance(v, str) else fmt_value(v)
+        if m.group(1) == "d" and isinstance(v, (int, float)) and not isinstance(v, bool):
+            return str(int(v))
+        return fmt_value(v)
+    return re.sub(r"%([%svdq])", verb, fmt)
+
+def rego_count(x: Any) -> int:
+    if isinstance(x, (list, dict, str)):
+        return len(x)
+    raise _Undefined
+
+def rego_concat(sep: Any, items: Any) -> str:
+    if not isinstance(sep, str) or not isinstance(items, list) or not all(isinstance(i, str) for i in items):
+        raise _Undefined
+    return sep.join(items)
+
+def _endswith(s, suffix):
+    _str(s, suffix)
+    return s.endswith(suffix)
+
+def _startswith(s, prefix):
+    _str(s, prefix)
+    return s.startswith(prefix)
+
+def _contains(s, sub):
+    _str(s, sub)
+    return sub in s
+
+def _lower(s):
+    _str(s)
+    return s.lower()
+
+def _upper(s):
+    _str(s)
+    return s.upper()
+
+BUILTINS: Dict[str, Tuple[int, Callable]] = {
+    "count": (1, rego_count),
+    "sprintf": (2, rego_sprintf),
+    "endswith": (2, _endswith),
+    "startswith": (2, _startswith),
+    "contains": (2, _contains),
+    "lower": (1, _lower),
+    "upper": (1, _upper),
+    "concat": (2, rego_concat),
+}
+
+# --- terms and statements (each evaluates to a stream of results, like Rego) ---
+
+class Literal:
+    def __init__(self, value: Any) -> None:
+        self.value = value
+
+    def eval(self, env: Env, ctx: "Evaluation") -> Iterator[Tuple[Any, Env]]:
+        yield self.value, env
+
+class Array:
+    def __init__(self, items: List[Any]) -> None:
+        self.items = items
+
+    def eval(self, env: Env, ctx: "Evaluation") -> Iterator[Tuple[Any, Env]]:
+        def build(i: int, acc: List[Any], env: Env):
+            if i == len(self.items):
+                yield list(acc), env
+                return
+            for v, e in self.items[i].eval(env, ctx):
+                yield from build(i + 1, acc + [v], e)
+        yield from build(0, [], env)
+
+class Call:
+    def __init__(self, name: str, args: List[Any], line: int) -> None:
+        if name not in BUILTINS:
+            raise RegoError(f"line {line}: builtin {name}() is not supported here (use opa)")
+        arity, self.fn = BUILTINS[name]
+        if len(args) != arity:
+            raise RegoError(f"line {line}: {name}() takes {arity} argument(s)")
+        self.args = Array(args)
+
+    def eval(self, env: Env, ctx: "Evaluation") -> Iterator[Tuple[Any, Env]]:
+        for args, e in self.args.eval(env, ctx):
+            try:
+                yield self.fn(*args), e
+            except _Undefined:
+                continue
+
+class Ref:
+    """root(.field | [term])*, where root is input, data, a rule or a variable."""
+
+    def __init__(self, root: str, path: List[Tuple[str, Any]]) -> None:
+        self.root = root
+        self.path = path              # ("field", name) | ("index", term)
+
+    def eval(self, env: Env, ctx: "Evaluation") -> Iterator[Tuple[Any, Env]]:
+        path = self.path
+        if self.root == "input":
+            base = ctx.input
+        elif self.root == "data":
+            base, path = ctx.data_ref(path)
+        elif self.root in env:
+            base = env[self.root]
+        elif self.root in ctx.policy.rules:
+            base = ctx.rule(self.root)
+        else:
+            return                    # unbound variable
+        if base is UNDEFINED:
+            return
+        yield from self._walk(base, path, env, ctx)
+
+    def _walk(self, value: Any, path: List[Tuple[str, Any]], env: Env,
+              ctx: "Evaluation") -> Iterator[Tuple[Any, Env]]:
+        if not path:
+            yield value, env
+            return
+        kind, arg = path[0]
+        rest = path[1:]
+        if kind == "field":
+            if isinstance(value, dict) and arg in value:
+                yield from self._walk(value[arg], rest, env, ctx)
+            return
+        if isinstance(arg, Ref) and not arg.path and arg.root not in env and arg.root not in ("input", "data") \
+                and arg.root not in ctx.policy.rules:
+            # [_] or [unbound var]: iterate, binding the key
+            for key, child in _members(value):
+                yield from self._walk(child, rest, env if arg.root == "_" else {**env, arg.root: key}, ctx)
+            return
+        for key, e in arg.eval(env, ctx):
+            found = _lookup(value, key)
+            if found is not UNDEFINED:
+                yield from self._walk(found, rest, e, ctx)
+
+def _members(value: Any) -> Iterator[Tuple[Any, Any]]:
+    if isinstance(value, RegoSet):
+        return ((v, v) for v in value)
+    if isinstance(value, list):
+        return enumerate(value)
+    if isinstance(value, dict):
+        return iter(value.items())
+    return iter(())
+
+def _lookup(value: Any, key: Any) -> Any:
+    if isinstance(value, dict):
+        return value.get(key, UNDEFINED) if isinstance(key, str) else UNDEFINED
+    if isinstance(value, RegoSet):
+        return key if any(rego_equal(key, v) for v in value) else UNDEFINED
+    if isinstance(value, list) and isinstance(key, (int, float)) and not isinstance(key, bool) \
+            and float(key).is_integer() and 0 <= key < len(value):
+        return value[int(key)]
+    return UNDEFINED
+
+class Assign:
+    def __init__(self, var: str, term: Any) -> None:
+        self.var = var
+        self.term = term
+
+    def eval(self, env: Env, ctx: "Evaluation") -> Iterator[Env]:
+        for v, e in self.term.eval(env, ctx):
+            yield {**e, self.var: v}
+
+class Compare:
+    def __init__(self, op: str, lhs: Any, rhs: Any) -> None:
+        self.op = op
+        self.lhs = lhs
+        self.rhs = rhs
+
+    def eval(self, env: Env, ctx: "Evaluation") -> Iterator[Env]:
+        if self.op == "=":
+            # unification, for the common case of one side being a fresh variable
+            for side, other in ((self.lhs, self.rhs), (self.rhs, self.lhs)):
+                if isinstance(side, Ref) and not side.path and side.root not in env \
+                        and side.root not in ("input", "data") and side.root not in ctx.policy.rules:
+                    yield from Assign(side.root, other).eval(env, ctx)
+                    return
+        test = COMPARE["==" if self.op == "=" else self.op]
+        for a, e1 in self.lhs.eval(env, ctx):
+            for b, e2 in self.rhs.eval(e1, ctx):
+                if test(a, b):
+                    yield e2
+
+class Truthy:
+    """A bare expression as a statement: holds when defined and not false."""
+
+    def __init__(self, term: Any) -> None:
+        self.term = term
+
+    def eval(self, env: Env, ctx: "Evaluation") -> Iterator[Env]:
+        for v, e in self.term.eval(env, ctx):
+            if v is not False:
+                yield e
+
+class Not:
+    def __init__(self, stmt: Any) -> None:
+        self.stmt = stmt
+
+    def eval(self, env: Env, ctx: "Evaluation") -> Iterator[Env]:
+        for _ in self.stmt.eval(env, ctx):
+            return
+        yield env
+
+def eval_body(body: List[Any], env: Env, ctx: "Evaluation") -> Iterator[Env]:
+    if not body:
+        yield env
+        return
+    for e in body[0].eval(env, ctx):
+        yield from eval_body(body[1:], e, ctx)
+
+# --- parsing ---
+
+TOKEN_RE = re.compile(r"""
+    (?P<ws>[ \t\r]+)
+  | (?P<comment>\#[^\n]*)
+  | (?P<nl>\n)
+  | (?P<string>"(?:\\.|[^"\\\n])*")
+  | (?P<raw>`[^`]*`)
+  | (?P<number>-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?)
+  | (?P<name>[A-Za-z_][A-Za-z0-9_]*)
+  | (?P<op>:=|==|!=|<=|>=|[<>=])
+  | (?P<punct>[{}\[\](),.;:])
+""", re.X)
+
+def tokenize(src: str) -> List[Tuple[str, str, int]]:
+    tokens = []
+    line, pos, depth = 1, 0, 0
+    while pos < len(src):
+        m = TOKEN_RE.match(src, pos)
+        if not m:
+            raise RegoError(f"line {line}: unexpected character {src[pos]!r}")
+        kind, text = m.lastgroup, m.group()
+        pos = m.end()
+        if kind == "nl":
+            if depth == 0:            # newlines end statements, except inside (...) and [...]
+                tokens.append(("nl", text, line))
+            line += 1
+        elif kind not in ("ws", "comment"):
+            if text in "([":
+                depth += 1
+            elif text in ")]":
+                depth = max(0, depth - 1)
+            tokens.append((kind, text, line))
+    tokens.append(("eof", "", line))
+    return tokens
+
+class Rule:
+    def __init__(self, name: str, kind: str, term: Any, body: List[Any]) -> None:
+        self.name = name
+        self.kind = kind              # "set" (partial set) | "value" (complete)
+        self.term = term
+        self.body = body
+
+class Parser:
+    def __init__(self, src: str) -> None:
+        self.tokens = tokenize(src)
+        self.i = 0
+
+    def peek(self, offset: int = 0) -> Tuple[str, str, int]:
+        return self.tokens[min(self.i + offset, len(self.tokens) - 1)]
+
+    def next(self) -> Tuple[str, str, int]:
+        tok = self.tokens[self.i]
+        self.i += 1
+        return tok
+
+    def accept(self, text: str) -> bool:
+        if self.peek()[1] == text and self.peek()[0] != "string":
+            self.i += 1
+            return True
+        return False
+
+    def expect(self, text: str) -> None:
+        kind, got, line = self.next()
+        if got != text or kind == "string":
+            raise RegoError(f"line {line}: expected {text!r}, got {got or 'end of file'!r}")
+
+    def skip_newlines(self) -> None:
+        while self.peek()[0] == "nl" or self.peek()[1] == ";":
+            self.i += 1
+
+    def policy(self) -> "Policy":
+        package, defaults, rules = None, {}, {}
+        while True:
+            self.skip_newlines()
+            kind, text, line = self.peek()
+            if kind == "eof":
+                break
+            if kind != "name":
+                raise RegoError(f"line {line}: expected a rule, got {text!r}")
+            if text == "package":
+                self.next()
+                package = [self.next()[1]]
+                while self.accept("."):
+                    package.append(self.next()[1])
+            elif text == "import":
+                while self.peek()[0] not in ("nl", "eof"):
+                    self.next()
+            elif text == "default":
+                self.next()
+                name = self.next()[1]
+                if not (self.accept(":=") or self.accept("=")):
+                    raise RegoError(f"line {line}: expected := after default {name}")
+                term = self.term()
+                if not isinstance(term, Literal):
+                    raise RegoError(f"line {line}: default values must be constants")
+                defaults[name] = term.value
+            else:
+                rule = self.rule()
+                rules.setdefault(rule.name, []).append(rule)
+        if package is None:
+            raise RegoError("missing package declaration")
+        for name, defs in rules.items():
+            if len({d.kind for d in defs}) > 1:
+                raise RegoError(f"rule {name} mixes partial set and complete definitions")
+        return Policy(package, defaults, rules)
+
+    def rule(self) -> Rule:
+        _, name, line = self.next()
+        if self.peek()[1] == "contains":
+            self.next()
+            kind, term = "set", self.term()
+        elif self.accept("["):                      # pre-v1: NAME[term] { ... }
+            kind, term = "set", self.term()
+            self.expect("]")
+        elif self.accept(":=") or self.accept("="):
+            kind, term = "value", self.term()
+        else:
+            kind, term = "value", Literal(True)
+        if self.peek()[1] == "if":
+            self.next()
+            body = self.block() if self.peek()[1] == "{" else [self.statement()]
+        elif self.peek()[1] == "{":
+            body = self.block()
+        elif kind == "set":
+            raise RegoError(f"line {line}: expected 'if' or a rule body for {name}")
+        else:
+            body = []
+        return Rule(name, kind, term, body)
+
+    def block(self) -> List[Any]:
+        self.expect("{")
+        body = []
+        while True:
+            self.skip_newlines()
+            if self.accept("}"):
+                return body
+            body.append(self.statement())
+            if self.peek()[1] not in ("}", ";") and self.peek()[0] != "nl":
+                kind, text, line = self.peek()
+                raise RegoError(f"line {line}: unexpected {text!r}")
+
+    def statement(self) -> Any:
+        kind, text, line = self.peek()
+        if kind == "name" and text == "not":
+            self.next()
+            return Not(self.statement())
+        if kind == "name" and text in ("some", "every", "with", "else"):
+            raise RegoError(f"line {line}: '{text}' is not supported here (use opa)")
+        lhs = self.term()
+        op = self.peek()[1] if self.peek()[0] == "op" else None
+        if op == ":=":
+            self.next()
+            if not (isinstance(lhs, Ref) and not lhs.path):
+                raise RegoError(f"line {line}: can only assign to a variable")
+            return Assign(lhs.root, self.term())
+        if op in COMPARE or op == "=":
+            self.next()
+            return Compare(op, lhs, self.term())
+        return Truthy(lhs)
+
+    def term(self) -> Any:
+        kind, text, line = self.next()
+        if kind == "string":
+            return Literal(json.loads(text))
+        if kind == "raw":
+            return Literal(text[1:-1])
+        if kind == "number":
+            return Literal(float(text) if any(c in text for c in ".eE") else int(text))
+        if kind == "name" and text in ("true", "false", "null"):
+            return Literal(json.loads(text))
+        if text == "[":
+            items = []
+            while not self.accept("]"):
+                items.append(self.term())
+                if not self.accept(","):
+                    self.expect("]")
+                    break
+            if all(isinstance(t, Literal) for t in items):
+                return Literal([t.value for t in items])
+            return Array(items)
+        if kind != "name":
+            raise RegoError(f"line {line}: unexpected {text or 'end of file'!r}")
+        path: List[Tuple[str, Any]] = []
+        while True:
+            if self.peek()[1] == "." and self.peek(1)[0] == "name":
+                self.next()
+                path.append(("field", self.next()[1]))
+            elif self.peek()[1] == "[" and self.peek()[0] == "punct":
+                self.next()
+                path.append(("index", self.term()))
+                self.expect("]")
+            else:
+                break
+        if self.accept("("):
+            name = ".".join([text] + [p[1] for p in path])
+            args = []
+            while not self.accept(")"):
+                args.append(self.term())
+                if not self.accept(","):
+                    self.expect(")")
+                    break
+            return Call(name, args, line)
+        return Ref(text, path)
+
+# --- evaluation ---
+
+class Policy:
+    def __init__(self, package: List[str], defaults: Dict[str, Any], rules: Dict[str, List[Rule]]) -> None:
+        self.package = package
+        self.defaults = defaults
+        self.rules = rules
+
+    def evaluate(self, inp: Any, names: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """{rule: value} for `names` (default: every rule); undefined rules are left out."""
+        ctx = Evaluation(self, inp)
+        out = {}
+        for name in names if names is not None else sorted(set(self.rules) | set(self.defaults)):
+            value = ctx.rule(name)
+            if value is not UNDEFINED:
+                out[name] = value
+        return out
+
+class Evaluation:
+    """One input: rule values are computed on first use and reused."""
+
+    def __init__(self, policy: Policy, inp: Any) -> None:
+        self.policy = policy
+        self.input = inp
+        self.values: Dict[str, Any] = {}
+        self.active: set = set()
+
+    def rule(self, name: str) -> Any:
+        if name in self.values:
+            return self.values[name]
+        if name in self.active:
+            raise RegoError(f"rule {name} depends on itself")
+        self.active.add(name)
+        try:
+            defs = self.policy.rules.get(name, [])
+            if defs and defs[0].kind == "set":
+                value: Any = RegoSet(v for d in defs for env in eval_body(d.body, {}, self)
+                                     for v, _ in d.term.eval(env, self))
+            else:
+                results = RegoSet(v for d in defs for env in eval_body(d.body, {}, self)
+                                  for v, _ in d.term.eval(env, self))
+                if len(results) > 1:
+                    raise RegoError(f"complete rule {name} produced conflicting values: {list(results)}")
+                value = results[0] if results else self.policy.defaults.get(name, UNDEFINED)
+        finally:
+            self.active.discard(name)
+        self.values[name] = value
+        return value
+
+    def data_ref(self, path: List[Tuple[str, Any]]) -> Tuple[Any, List[Tuple[str, Any]]]:
+        """data.<package>.<rule>...: the rule's value and what's left of the path."""
+        pkg = self.policy.package
+        fields = [p[1] for p in path[:len(pkg) + 1] if p[0] == "field"]
+        if len(fields) != len(pkg) + 1 or fields[:len(pkg)] != pkg or fields[-1] not in self.policy.rules:
+            return UNDEFINED, []
+        return self.rule(fields[-1]), path[len(pkg) + 1:]
+
+def compile_policy(src: str) -> Policy:
+    return Parser(src).policy()
+
+def load_policy(path: str) -> Policy:
+    with open(path, encoding="utf-8") as f:
+        return compile_policy(f.read())
+
+# --- inputs ---
+
+Doc = Tuple[str, str, str]            # (source, "json" | "yaml", text)
+
+DOC_START = re.compile(r"^---(?:[ \t].*)?$", re.M)
+
+def discover(paths: Iterable[str]) -> List[str]:
+    """Input files under `paths`; FileNotFoundError names any path that doesn't exist."""
+    found: List[str] = []
+    missing: List[str] = []
+    for p in paths:
+        if p == "-" or os.path.isfile(p):
+            found.append(p)
+            continue
+        if not os.path.isdir(p):
+            missing.append(p)
+            continue
+        for root, dirs, files in os.walk(p):
+            dirs.sort()
+            for name in sorted(files):
+                if name.endswith(INPUT_SUFFIXES):
+                    found.append(os.path.join(root, name))
+    if missing:
+        raise FileNotFoundError(f"no such file or directory: {', '.join(missing)}")
+    return found
+
+def iter_docs(files: Iterable[str]) -> Iterator[Doc]:
+    for path in files:
+        if path == "-":
+            text = sys.stdin.read()
+        else:
+            with open(path, encoding="utf-8") as f:
+                text = f.read()
+        if path.endswith(".json"):
+            yield path, "json", text
+            continue
+        # split multi-document YAML on '---' lines here, so documents can be parsed in parallel
+        starts = [m.start() for m in DOC_START.finditer(text)]
+        bounds = ([0] if not starts or starts[0] != 0 else []) + starts + [len(text)]
+        for n, (a, b) in enumerate(zip(bounds, bounds[1:])):
+            chunk = text[a:b]
+            if chunk.strip() and chunk.strip() != "---":
+                yield (f"{path}#{n}" if len(bounds) > 2 else path), "yaml", chunk
+
+def parse_doc(fmt: str, text: str) -> Any:
+    if fmt == "json":
+        return json.loads(text)
+    return yaml.load(text, Loader=SafeLoader)
+
+_policy: Optional[Policy] = None
+_query: Optional[List[str]] = None
+
+def _init_worker(src: str, query: List[str]) -> None:
+    global _policy, _query
+    _policy = compile_policy(src)
+    _query = query
+
+def evaluate_batch(batch: List[Doc]) -> List[dict]:
+    """Runs in a worker: one result per document (or the reason it couldn't be read)."""
+    out = []
+    for source, fmt, text in batch:
+        try:
+            doc = parse_doc(fmt, text)
+        except (ValueError, yaml.YAMLError) as e:
+            out.append({"source": source, "error": f"invalid {fmt.upper()}: {str(e).splitlines()[0]}"})
+            continue
+        if doc is None:
+            continue
+        try:
+            out.append({"source": source, **_policy.evaluate(doc, _query)})
+        except RegoError as e:
+            out.append({"source": source, "error": str(e)})
+    return out
+
+def evaluate_all(src: str, docs: Iterable[Doc], query: List[str], workers: Optional[int] = None,
+                 batch_size: int = 128) -> List[dict]:
+    docs = list(docs)
+    batches = [docs[i:i + batch_size] for i in range(0, len(docs), batch_size)]
+    results: List[dict] = []
+    if len(batches) > 1 and workers != 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(src, query)) as pool:
+            for part in pool.map(evaluate_batch, batches):
+                results.extend(part)
+    else:
+        _init_worker(src, query)
+        for batch in batches:
+            results.extend(evaluate_batch(batch))
+    return results
+
+# --- output ---
+
+def opa_pretty(value: Any) -> str:
+    """What `opa eval -f pretty` prints for a JSON value."""
+    return json.dumps(value, indent=2, ensure_ascii=False)
+
+def print_check(r: dict) -> None:
+    """Same output as scripts/check.sh."""
+    if "error" in r:
+        print(f"error: {r['error']}")
+        return
+    allow = r.get("allow", False)
+    print(f"allow: {json.dumps(allow)}")
+    if allow is not True:
+        print("")
+        print("DENY: policy violations:")
+        print(opa_pretty(r.get("violations", [])))
+        return
+    print("PASS: compliant")
+
+def main():
+    ap = argparse.ArgumentParser(description="Evaluate a Rego policy (k8s.rego subset) over many manifests")
+    ap.add_argument("paths", nargs="+", help="JSON/YAML files (multi-document OK), directories, or - for stdin")
+    ap.add_argument("-d", "--policy", default=DEFAULT_POLICY)
+    ap.add_argument("--query", default="allow,violations", help="Comma-separated rules to report")
+    ap.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    ap.add_argument("--format", choices=["text", "json"], default="text",
+                    help="text: check.sh-style report per input; json: one JSON object per input")
+    args = ap.parse_args()
+
+    start = time.perf_counter()
+    with open(args.policy, encoding="utf-8") as f:
+        src = f.read()
+    try:
+        compile_policy(src)               # fail fast, before forking workers
+    except RegoError as e:
+        print(f"{args.policy}: {e}", file=sys.stderr)
+        sys.exit(2)
+
+    query = [q for q in args.query.split(",") if q]
+    try:
+        files = discover(args.paths)
+    except FileNotFoundError as e:
+        print(e, file=sys.stderr)
+        sys.exit(2)
+    results = evaluate_all(src, iter_docs(files), query, args.workers)
+    if not results:
+        # nothing checked is not a pass: a typo'd glob or an empty dir would otherwise go green
+        print(f"no documents found in: {' '.join(args.paths)}", file=sys.stderr)
+        sys.exit(2)
+    denied = [r for r in results if "error" in r or r.get("allow") is not True]
+
+    if args.format == "json":
+        for r in results:
+            print(json.dumps(r, ensure_ascii=False))
+    elif len(results) == 1:
+        print_check(results[0])
+    else:
+        for r in results:
+            print(f"== {r['source']}")
+            print_check(r)
+            print("")
+        print(f"{len(results)} input(s): {len(results) - len(denied)} allowed, {len(denied)} denied "
+              f"({time.perf_counter() - start:.2f}s)")
+
+    sys.exit(1 if denied else 0)
+
+if __name__ == "__main__":
+    main()
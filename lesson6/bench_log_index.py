@@ -0,0 +1,75 @@
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+from log_index import LogIndex, parse_ts
+
+# Index build / query latency vs. a full scan, on synthetic incident logs.
+#
+#   python3 bench_log_index.py --lines 1000000
+
+SERVICES = ["payments-api", "checkout", "search", "auth", "inventory-api"]
+UPSTREAMS = ["inventory", "ledger", "fraud", "cache"]
+
+def write_logs(path: str, lines: int, seed: int, start_line: int = 0) -> None:
+    rng = random.Random(seed + start_line)
+    with open(path, "a") as f:
+        for i in range(start_line, start_line + lines):
+            minute = (i * 60 // max(1, lines)) % 60 if start_line == 0 else 59
+            level = rng.choices(["INFO", "WARN", "ERROR"], [90, 7, 3])[0]
+            rec = {"ts": f"03:{minute:02d}", "service": rng.choice(SERVICES), "level": level,
+                   "msg": "request" if level == "INFO" else "upstream problem", "orderId": f"o-{i // 4}"}
+            if level != "INFO":
+                rec["upstream"] = rng.choice(UPSTREAMS)
+            f.write(json.dumps(rec) + "\n")
+
+def scan(path: str, match) -> int:
+    with open(path) as f:
+        return sum(1 for line in f if match(json.loads(line)))
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--lines", type=int, default=500_000)
+    ap.add_argument("--seed", type=int, default=3)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="logidx-bench-") as tmp:
+        path = os.path.join(tmp, "logs.jsonl")
+        write_logs(path, args.lines, args.seed)
+        print(f"logs: {args.lines:,} lines, {os.path.getsize(path) / 1e6:,.0f} MB")
+
+        index = LogIndex(path)
+        t0 = time.perf_counter()
+        index.update()
+        print(f"build:            {time.perf_counter() - t0:8.2f} s")
+
+        write_logs(path, 1000, args.seed, start_line=args.lines)
+        t0 = time.perf_counter()
+        added = index.update()
+        print(f"append {added:,} lines: {(time.perf_counter() - t0) * 1000:8.1f} ms (incremental)")
+
+        lo, hi = parse_ts("03:00"), parse_ts("03:05")
+        where = {"level": {"ERROR"}, "service": {"payments-api"}, "upstream": {"inventory"}}
+        order = f"o-{args.lines // 8}"
+        queries = [
+            ("ERROR payments-api upstream=inventory 03:00-03:05", where, lo, hi,
+             lambda r: r["level"] == "ERROR" and r["service"] == "payments-api" and
+             r.get("upstream") == "inventory" and lo <= parse_ts(r["ts"]) <= hi),
+            (f"orderId={order}", {"orderId": {order}}, None, None, lambda r: r["orderId"] == order),
+        ]
+        for label, w, since, until, match in queries:
+            t0 = time.perf_counter()
+            n = len(list(index.query(w, since, until)))
+            t_index = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            n_scan = scan(path, match)
+            t_scan = time.perf_counter() - t0
+            assert n == n_scan, (n, n_scan)
+            print(f"{label:<50} {n:>6,} rows  index {t_index * 1000:7.1f} ms   scan {t_scan * 1000:8.0f} ms")
+        index.close()
+
+if __name__ == "__main__":
+    main()
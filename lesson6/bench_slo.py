@@ -0,0 +1,50 @@
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from calculate_slo import count_in_memory
+from slo_stream import count_file
+
+# Throughput of the SLO counters on a synthetic traffic log, in GB/s.
+#
+#   python3 bench_slo.py --size-mb 512 --workers 1 4 8
+
+STATUSES = [b"200"] * 90 + [b"201"] * 4 + [b"204"] * 2 + [b"404"] * 2 + [b"500", b"503"]
+
+def write_log(path: str, size_mb: int, seed: int) -> None:
+    rng = random.Random(seed)
+    block = b"\n".join(rng.choice(STATUSES) for _ in range(250_000)) + b"\n"   # ~1 MB
+    with open(path, "wb") as f:
+        for _ in range(size_mb):
+            f.write(block)
+
+def timed(label: str, size: int, fn) -> None:
+    t0 = time.perf_counter()
+    good, total = fn()
+    dt = time.perf_counter() - t0
+    print(f"{label:<22} {size / dt / 1e9:>7.2f} GB/s   ({total:,} requests, {good:,} good, {dt:.2f}s)")
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--size-mb", type=int, default=256)
+    ap.add_argument("--workers", type=int, nargs="+", default=[1, os.cpu_count() or 1])
+    ap.add_argument("--in-memory-max-mb", type=int, default=256,
+                    help="Skip the list-based baseline above this size (it needs GBs of RAM)")
+    ap.add_argument("--seed", type=int, default=42)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="slo-bench-") as tmp:
+        path = os.path.join(tmp, "traffic.log")
+        write_log(path, args.size_mb, args.seed)
+        size = os.path.getsize(path)
+        print(f"traffic log: {size / 1e6:,.0f} MB")
+
+        if args.size_mb <= args.in_memory_max_mb:
+            timed("in-memory (baseline)", size, lambda: count_in_memory(path))
+        for w in sorted(set(args.workers)):
+            timed(f"stream, {w} worker(s)", size, lambda: count_file(path, workers=w))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+import argparse
+import random
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from calculate_slo import load_slo
+from slo_stream import is_good
+
+# Multi-window, multi-burn-rate SLO alerting (Google SRE workbook, ch. 5).
+#
+# Burn rate = observed error rate / error rate the SLO allows. A burn rate of
+# 1 spends exactly the whole budget over the SLO window; 14.4 spends 2% of a
+# 30d budget in one hour. An alert fires only when BOTH a long window (is this
+# significant?) and a short window (is it still happening?) burn too fast.
+#
+# Every window is a ring buffer of per-bucket good/total counters with running
+# sums, so recording an outcome is O(1) and reading a window's rate is O(1).
+# Outcomes are first tallied into the current "base" bucket (the finest bucket
+# of any window) and handed to the windows once per base bucket, so the per-
+# request cost is two integer increments.
+
+UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+def parse_duration(text: str) -> int:
+    """'5m' -> 300, '30d' -> 2592000"""
+    return int(text[:-1]) * UNITS[text[-1]]
+
+class RollingCounter:
+    """good/total over the last `window_s` seconds, in `buckets` ring slots."""
+
+    def __init__(self, window_s: int, buckets: int = 60) -> None:
+        self.window_s = window_s
+        self.bucket_s = max(1, window_s // buckets)
+        self.n = -(-window_s // self.bucket_s)
+        self.good = [0] * self.n
+        self.total = [0] * self.n
+        self.sum_good = 0
+        self.sum_total = 0
+        self.head: Optional[int] = None       # absolute bucket number of the newest slot
+
+    def advance(self, ts: float) -> None:
+        b = int(ts // self.bucket_s)
+        if self.head is None:
+            self.head = b
+            return
+        if b <= self.head:
+            return
+        # expire the slots that fall out of the window (at most n, however long the gap)
+        for old in range(self.head + 1, min(b, self.head + self.n) + 1):
+            i = old % self.n
+            self.sum_good -= self.good[i]
+            self.sum_total -= self.total[i]
+            self.good[i] = self.total[i] = 0
+        self.head = b
+
+    def add(self, ts: float, good: int, total: int = 1) -> bool:
+        """Record outcomes at `ts`; returns False if `ts` is already outside the window."""
+        self.advance(ts)
+        b = int(ts // self.bucket_s)
+        if b <= self.head - self.n:
+            return False
+        i = b % self.n
+        self.good[i] += good
+        self.total[i] += total
+        self.sum_good += good
+        self.sum_total += total
+        return True
+
+    def error_rate(self) -> float:
+        return 1 - self.sum_good / self.sum_total if self.sum_total else 0.0
+
+@dataclass(frozen=True)
+class AlertRule:
+    long_window: str
+    short_window: str
+    burn_rate: float
+    severity: str
+
+    @property
+    def name(self) -> str:
+        return f"{self.severity}:{self.long_window}/{self.short_window}@{self.burn_rate:g}x"
+
+# SRE workbook defaults for a 30d window: 2% of budget in 1h, 5% in 6h, 10% in 3d
+DEFAULT_RULES = [
+    AlertRule("1h", "5m", 14.4, "page"),
+    AlertRule("6h", "30m", 6.0, "page"),
+    AlertRule("3d", "6h", 1.0, "ticket"),
+]
+
+class BurnRateEngine:
+    def __init__(self, target: float, slo_window: str = "30d",
+                 rules: Optional[List[AlertRule]] = None, buckets: int = 60,
+                 min_requests: int = 1000) -> None:
+        self.target = target
+        self.min_requests = min_requests        # don't alert on a handful of requests (e.g. at startup)
+        self.allowed_error_rate = 1 - target / 100
+        self.slo_window = slo_window
+        self.rules = rules if rules is not None else DEFAULT_RULES
+        names = {slo_window}
+        for r in self.rules:
+            names.update((r.long_window, r.short_window))
+        # the SLO window gets finer buckets: it drives the remaining-budget number
+        self.windows: Dict[str, RollingCounter] = {
+            w: RollingCounter(parse_duration(w), buckets * 12 if w == slo_window else buckets)
+            for w in sorted(names, key=parse_duration)
+        }
+        self.firing: Dict[str, float] = {}      # rule name -> since (ts)
+        self.now = 0.0
+        self.late = 0
+        # every window's bucket size is a multiple of the base bucket for the usual
+        # durations, so one base bucket always lands in a single slot per window
+        self.base_s = min(c.bucket_s for c in self.windows.values())
+        self._base: Optional[int] = None
+        self._pending_good = 0
+        self._pending_total = 0
+
+    def observe(self, ts: float, good: bool) -> None:
+        b = int(ts // self.base_s)
+        if b != self._base:
+            if self._base is not None and b < self._base:
+                self._add(ts, 1 if good else 0, 1)     # out of order: straight to the windows
+                return
+            self._flush()
+            self._base = b
+        self._pending_total += 1
+        if good:
+            self._pending_good += 1
+        if ts > self.now:
+            self.now = ts
+
+    def _flush(self) -> None:
+        if self._pending_total:
+            self._add(self._base * self.base_s, self._pending_good, self._pending_total)
+            self._pending_good = self._pending_total = 0
+
+    def _add(self, ts: float, good: int, total: int) -> None:
+        # too old for the short windows is fine; too old for all of them is late
+        accepted = False
+        for counter in self.windows.values():
+            accepted = counter.add(ts, good, total) or accepted
+        if not accepted:
+            self.late += total
+
+    def burn_rate(self, window: str) -> float:
+        self._flush()
+        if self.allowed_error_rate <= 0:
+            return float("inf")
+        return self.windows[window].error_rate() / self.allowed_error_rate
+
+    def budget_remaining(self) -> float:
+        """Fraction of the SLO window's error budget left (negative once overspent)."""
+        self._flush()
+        c = self.windows[self.slo_window]
+        allowed_bad = self.allowed_error_rate * c.sum_total
+        if allowed_bad <= 0:
+            return 1.0
+        return 1 - (c.sum_total - c.sum_good) / allowed_bad
+
+    def evaluate(self, now: Optional[float] = None) -> List[Tuple[str, AlertRule, float, float]]:
+        """Returns state changes as (FIRING|RESOLVED, rule, long burn, short burn)."""
+        now = self.now if now is None else now
+        self._flush()
+        for counter in self.windows.values():
+            counter.advance(now)
+        changes = []
+        for rule in self.rules:
+            long_burn, short_burn = self.burn_rate(rule.long_window), self.burn_rate(rule.short_window)
+            active = (long_burn >= rule.burn_rate and short_burn >= rule.burn_rate and
+                      self.windows[rule.long_window].sum_total >= self.min_requests)
+            if active and rule.name not in self.firing:
+                self.firing[rule.name] = now
+                changes.append(("FIRING", rule, long_burn, short_burn))
+            elif not active and rule.name in self.firing:
+                del self.firing[rule.name]
+                changes.append(("RESOLVED", rule, long_burn, short_burn))
+        return changes
+
+    def status(self) -> Dict[str, object]:
+        return {
+            "burn_rates": {w: self.burn_rate(w) for w in self.windows},
+            "budget_remaining": self.budget_remaining(),
+            "firing": sorted(self.firing),
+        }
+
+# --- input ---
+
+def parse_ts(text: str) -> float:
+    try:
+        return float(text)
+    except ValueError:
+        return datetime.fromisoformat(text.replace("Z", "+00:00")).timestamp()
+
+def read_outcomes(path: str) -> Iterator[Tuple[float, int]]:
+    """Lines of '<epoch or ISO-8601 timestamp> <status>', in time order."""
+    with open(path) as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2:
+                yield parse_ts(parts[0]), int(parts[1])
+
+def simulate(hours: float, rps: float, seed: int, start: float) -> Iterator[Tuple[float, int]]:
+    """Healthy traffic with a slow burn (day 2) and a hard outage (day 4)."""
+    rng = random.Random(seed)
+    t, end = start, start + hours * 3600
+    while t < end:
+        t += rng.expovariate(rps)
+        h = (t - start) / 3600
+        if 34 < h < 39:
+            p_err = 0.008            # slow burn: ~8x for 5 hours
+        elif 80 < h < 80.5:
+            p_err = 0.05             # outage: ~50x for 30 minutes
+        else:
+            p_err = 0.0002
+        yield t, 503 if rng.random() < p_err else 200
+
+def run(engine: BurnRateEngine, outcomes: Iterable[Tuple[float, int]],
+        eval_every_s: float = 60.0) -> None:
+    next_eval = None
+    for ts, status in outcomes:
+        engine.observe(ts, is_good(status))
+        if next_eval is None:
+            next_eval = ts + eval_every_s
+        if ts >= next_eval:
+            for state, rule, long_burn, short_burn in engine.evaluate(ts):
+                when = datetime.fromtimestamp(ts, timezone.utc).strftime("%Y-%m-%d %H:%M")
+                icon = "🔥" if state == "FIRING" else "✅"
+                print(f"{when}  {icon} {state:<8} {rule.name:<26} "
+                      f"burn {rule.long_window}={long_burn:.1f}x {rule.short_window}={short_burn:.1f}x  "
+                      f"budget left {engine.budget_remaining():.1%}")
+            next_eval = ts + eval_every_s
+
+def main():
+    ap = argparse.ArgumentParser(description="Multi-window, multi-burn-rate SLO alerting")
+    ap.add_argument("log", nargs="?", help="Timestamped outcomes: '<ts> <status>' per line")
+    ap.add_argument("--slo", default="slo.yaml")
+    ap.add_argument("--simulate", type=float, metavar="HOURS", help="Generate N hours of synthetic traffic")
+    ap.add_argument("--rps", type=float, default=5.0, help="Requests/sec for --simulate")
+    ap.add_argument("--eval-every", type=float, default=60.0, help="Seconds of event time between evaluations")
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args()
+    if not args.log and not args.simulate:
+        ap.error("give a log file or --simulate HOURS")
+
+    slo = load_slo(args.slo)
+    engine = BurnRateEngine(slo["slo"]["target"], slo["slo"].get("window", "30d"))
+    outcomes = simulate(args.simulate, args.rps, args.seed, start=1_760_000_000.0) if args.simulate \
+        else read_outcomes(args.log)
+
+    print("==============================================")
+    print(f"Burn-rate alerts: {slo['service']} (SLO {engine.target}% over {engine.slo_window})")
+    print("==============================================")
+    run(engine, outcomes, args.eval_every)
+
+    st = engine.status()
+    print("")
+    for w, rate in st["burn_rates"].items():
+        print(f"Burn rate {w:>4}: {rate:6.2f}x")
+    print(f"Error budget remaining ({engine.slo_window}): {st['budget_remaining']:.1%}")
+    print(f"Firing: {', '.join(st['firing']) or 'none'}")
+
+if __name__ == "__main__":
+    main()
@@ -1,31 +1,83 @@
+import argparse
+import os
+import sys
+from typing import List, Tuple
+
 import yaml
 
-# Load SLO definition
-with open("slo.yaml") as f:
-    slo = yaml.safe_load(f)
+from slo_stream import count_file, is_good
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "shared"))
+import profiler
+
+def load_slo(path: str = "slo.yaml") -> dict:
+    # Load SLO definition
+    with open(path) as f:
+        return yaml.safe_load(f)
+
+def read_log(path: str) -> List[str]:
+    # Load traffic log (fine for small demo logs; use --stream for large ones)
+    with open(path) as f:
+        return f.readlines()
+
+def parse_statuses(lines: List[str]) -> List[int]:
+    return [int(line.strip()) for line in lines if line.strip()]
+
+def count_good(statuses: List[int]) -> Tuple[int, int]:
+    good = len([s for s in statuses if is_good(s)])
+    return good, len(statuses)
+
+def count_in_memory(path: str) -> Tuple[int, int]:
+    return count_good(parse_statuses(read_log(path)))
+
+def report(slo: dict, good: int, total: int) -> None:
+    TARGET = slo["slo"]["target"]
 
-TARGET = slo["slo"]["target"]
+    sli = (good / total) * 100
+    error_budget = 100 - TARGET
+    burn = TARGET - sli
 
-# Load traffic log
-with open("traffic.log") as f:
-    statuses = [int(line.strip()) for line in f if line.strip()]
+    print(f"Service: {slo['service']}")
+    print(f"Total requests: {total}")
+    print(f"Good requests: {good}")
+    print(f"SLI: {sli:.2f}%")
+    print(f"SLO Target: {TARGET}%")
+    print(f"Error Budget: {error_budget:.2f}%")
 
-total = len(statuses)
-good = len([s for s in statuses if s < 500])
+    if sli >= TARGET:
+        print("SUCCESS: SLO met — safe to deploy")
+    else:
+        print("ERROR: SLO violated — freeze features, fix reliability")
+        print(f"Error budget burned: {burn:.2f}%")
 
-sli = (good / total) * 100
-error_budget = 100 - TARGET
-burn = TARGET - sli
+def main():
+    ap = argparse.ArgumentParser(description="Compute SLI / error budget from a traffic log")
+    ap.add_argument("--slo", default="slo.yaml", help="SLO definition")
+    ap.add_argument("--log", default="traffic.log", help="Traffic log (one HTTP status per line)")
+    ap.add_argument("--stream", action="store_true",
+                    help="Constant-memory mmap scan (for multi-GB logs)")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                    help="Processes for --stream (file is split into byte ranges)")
+    ap.add_argument("--chunk-mb", type=int, default=16, help="Scan chunk size for --stream")
+    profiler.add_arguments(ap)
+    args = ap.parse_args()
 
-print(f"Service: {slo['service']}")
-print(f"Total requests: {total}")
-print(f"Good requests: {good}")
-print(f"SLI: {sli:.2f}%")
-print(f"SLO Target: {TARGET}%")
-print(f"Error Budget: {error_budget:.2f}%")
+    prof = profiler.from_args(args)
+    with prof.phase("load"):
+        slo = load_slo(args.slo)
+        lines = None if args.stream else read_log(args.log)
+    if args.stream:
+        # read, parse and count happen together in the mmap scan
+        with prof.phase("compute"):
+            good, total = count_file(args.log, workers=args.workers, chunk_bytes=args.chunk_mb * 1024 * 1024)
+    else:
+        with prof.phase("parse"):
+            statuses = parse_statuses(lines)
+        with prof.phase("compute"):
+            good, total = count_good(statuses)
+    with prof.phase("render"):
+        report(slo, good, total)
+    prof.finish()
 
-if sli >= TARGET:
-    print("SUCCESS: SLO met — safe to deploy")
-else:
-    print("ERROR: SLO violated — freeze features, fix reliability")
-    print(f"Error budget burned: {burn:.2f}%")
+if __name__ == "__main__":
+    main()
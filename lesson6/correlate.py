@@ -0,0 +1,196 @@
+import argparse
+import csv
+import json
+import statistics
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Set
+
+from log_index import parse_ts
+from trace_analyze import assign_starts, critical_path, iter_trace_files, load_traces, walk
+
+# Correlate the three signals: metrics (per minute), logs, and traces.
+#
+#   logs  <-> traces    hash join on a shared id: orderId (or traceId, if logs carry it)
+#   both  <-> metrics   time index: minute bucket -> log lines / traces
+#
+# Every join is a dict lookup built in one pass over each input, so the cost is
+# O(logs + traces + minutes) rather than logs x traces x minutes. Only the log
+# levels asked for (WARN/ERROR by default) are kept in memory.
+#
+# Time alignment: metrics.csv counts minutes of the incident ("03"), and the
+# lesson's logs/traces are stamped "MM:SS" on that same clock ("03:01" is
+# minute 03). Timestamps are read by log_index.parse_ts, so both tools agree;
+# ISO-8601 or epoch timestamps are bucketed by wall-clock minute, which lines
+# up with metrics whose minute column is epoch minutes.
+
+JOIN_KEYS = ("orderId", "traceId")
+
+def minute_of(ts) -> Optional[int]:
+    return None if ts is None else int(parse_ts(ts) // 60)
+
+class Correlator:
+    def __init__(self) -> None:
+        self.metrics: Dict[int, dict] = {}
+        self.logs_by_id: Dict[str, List[dict]] = defaultdict(list)
+        self.logs_by_minute: Dict[int, List[dict]] = defaultdict(list)
+        self.traces: Dict[str, dict] = {}
+        self.trace_ids_by_id: Dict[str, Set[str]] = defaultdict(set)     # orderId -> traceIds
+        self.traces_by_minute: Dict[int, List[str]] = defaultdict(list)
+
+    # --- loading (one pass each) ---
+
+    def load_metrics(self, path: str) -> None:
+        with open(path) as f:
+            for row in csv.DictReader(f):
+                self.metrics[int(row["minute"])] = {
+                    "minute": int(row["minute"]),
+                    "p95_latency_ms": float(row["p95_latency_ms"]),
+                    "error_rate_pct": float(row["error_rate_pct"]),
+                    "rps": float(row["rps"]),
+                }
+
+    def load_logs(self, path: str, levels: Optional[Set[str]] = None) -> None:
+        with open(path) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                rec = json.loads(line)
+                if levels and rec.get("level") not in levels:
+                    continue
+                for key in JOIN_KEYS:
+                    if key in rec:
+                        self.logs_by_id[f"{key}={rec[key]}"].append(rec)
+                m = minute_of(rec.get("ts"))
+                if m is not None:
+                    self.logs_by_minute[m].append(rec)
+
+    def load_traces(self, paths: Iterable[str]) -> None:
+        for path in iter_trace_files(paths):
+            for trace in load_traces(path):
+                root = trace["rootSpan"]
+                assign_starts(root)
+                tid = trace["traceId"]
+                self.traces[tid] = trace
+                for key in JOIN_KEYS:
+                    if key in trace:
+                        self.trace_ids_by_id[f"{key}={trace[key]}"].add(tid)
+                m = minute_of(trace.get("ts"))
+                if m is not None:
+                    self.traces_by_minute[m].append(tid)
+
+    # --- joins ---
+
+    def logs_for_trace(self, trace: dict) -> List[dict]:
+        seen: Set[int] = set()
+        out = []
+        for key in JOIN_KEYS:
+            if key in trace:
+                for rec in self.logs_by_id.get(f"{key}={trace[key]}", []):
+                    if id(rec) not in seen:
+                        seen.add(id(rec))
+                        out.append(rec)
+        return out
+
+    def spikes(self, latency_factor: float = 1.5, error_pct: float = 1.0) -> List[int]:
+        """Minutes whose p95 is well above the median, or whose error rate is high."""
+        if not self.metrics:
+            return []
+        median_p95 = statistics.median(m["p95_latency_ms"] for m in self.metrics.values())
+        return sorted(m for m, row in self.metrics.items()
+                      if row["p95_latency_ms"] >= latency_factor * median_p95 or row["error_rate_pct"] >= error_pct)
+
+    def explain(self, minute: int, window: int = 0) -> dict:
+        minutes = range(minute - window, minute + window + 1)
+        logs = [rec for m in minutes for rec in self.logs_by_minute.get(m, [])]
+        trace_ids = dict.fromkeys(tid for m in minutes for tid in self.traces_by_minute.get(m, []))
+        # traces linked through the window's logs, even if they started in another minute
+        for rec in logs:
+            for key in JOIN_KEYS:
+                if key in rec:
+                    trace_ids.update(dict.fromkeys(self.trace_ids_by_id.get(f"{key}={rec[key]}", ())))
+
+        traces = []
+        span_time: Counter = Counter()
+        span_errors: Counter = Counter()
+        for tid in trace_ids:
+            trace = self.traces[tid]
+            path = critical_path(trace["rootSpan"])
+            for name, ms in path:
+                span_time[name] += ms
+            for span in walk(trace["rootSpan"]):
+                if span.get("error"):
+                    span_errors[(span["name"], span["error"])] += 1
+            top = max(path, key=lambda p: p[1])
+            traces.append({"traceId": tid, "root": trace["rootSpan"]["name"],
+                           "duration_ms": trace["rootSpan"]["duration_ms"],
+                           "critical": top, "logs": self.logs_for_trace(trace)})
+
+        return {
+            "minute": minute,
+            "metrics": self.metrics.get(minute),
+            "log_count": len(logs),
+            "log_messages": Counter((r.get("level"), r.get("msg"), r.get("upstream")) for r in logs).most_common(),
+            "upstreams": Counter(r["upstream"] for r in logs if "upstream" in r).most_common(),
+            "traces": traces,
+            "critical_spans": span_time.most_common(),
+            "span_errors": span_errors.most_common(),
+        }
+
+def print_explanation(e: dict) -> None:
+    m = e["metrics"]
+    print("==============================================")
+    if m:
+        print(f"Minute {e['minute']:02d}: p95 {m['p95_latency_ms']:.0f} ms, "
+              f"errors {m['error_rate_pct']:.1f}%, {m['rps']:.0f} rps")
+    else:
+        print(f"Minute {e['minute']:02d}: (no metrics)")
+    print("==============================================")
+    print(f"Logs in window: {e['log_count']}")
+    for (level, msg, upstream), n in e["log_messages"]:
+        up = f" upstream={upstream}" if upstream else ""
+        print(f"  {n:>4} x {level:<5} {msg}{up}")
+    if e["upstreams"]:
+        name, n = e["upstreams"][0]
+        print(f"  -> dominant upstream: {name} ({n} log lines)")
+    print(f"Traces linked: {len(e['traces'])}")
+    for t in e["traces"]:
+        name, ms = t["critical"]
+        print(f"  {t['traceId']}  {t['root']}  {t['duration_ms']} ms; critical path dominated by "
+              f"{name} ({ms:.0f} ms); {len(t['logs'])} correlated log line(s)")
+    if e["span_errors"]:
+        print("Span errors: " + ", ".join(f"{n}x {name} ({err})" for (name, err), n in e["span_errors"]))
+    if e["critical_spans"]:
+        name, ms = e["critical_spans"][0]
+        print(f"\nExplanation: {name} accounts for the most critical-path time ({ms:.0f} ms) "
+              f"in the traces behind this minute.")
+
+def main():
+    ap = argparse.ArgumentParser(description="Join metrics, logs and traces to explain a spike")
+    ap.add_argument("--metrics", default="data/metrics.csv")
+    ap.add_argument("--logs", default="data/logs.jsonl")
+    ap.add_argument("--traces", nargs="+", default=["data/trace.json"], help="Trace files and/or directories")
+    ap.add_argument("--minute", type=int, action="append",
+                    help="Minute(s) to explain (default: every detected spike)")
+    ap.add_argument("--window", type=int, default=0, help="Also include +/- N neighbouring minutes")
+    ap.add_argument("--levels", default="WARN,ERROR", help="Log levels to keep ('' = all)")
+    ap.add_argument("--json", action="store_true")
+    args = ap.parse_args()
+
+    c = Correlator()
+    c.load_metrics(args.metrics)
+    c.load_logs(args.logs, set(args.levels.split(",")) if args.levels else None)
+    c.load_traces(args.traces)
+
+    minutes = args.minute or c.spikes()
+    results = [c.explain(m, args.window) for m in minutes]
+    if args.json:
+        print(json.dumps(results, indent=2, default=str))
+        return
+    if not minutes:
+        print("No spike minutes detected.")
+    for e in results:
+        print_explanation(e)
+        print("")
+
+if __name__ == "__main__":
+    main()
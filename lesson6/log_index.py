@@ -0,0 +1,420 @@
+import argparse
+import bisect
+import hashlib
+import json
+import mmap
+import os
+import shutil
+import sys
+import time
+from array import array
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+# Indexed queries over structured JSONL logs.
+#
+#   data/logs.jsonl            the source (append-only)
+#   data/logs.jsonl.idx/       the index, next to it
+#     meta.json                how far the source has been indexed, segment list
+#     seg-00000.bin ...        one segment per batch of indexed lines
+#
+# Each segment is columnar: timestamps, byte offsets of the source lines, and
+# one dictionary-encoded column per indexed field. Each indexed field also has
+# an inverted index (value -> sorted row numbers, stored CSR-style: one
+# offsets array + one rows array). A query takes the shortest posting list,
+# checks the other filters against the columns, and only then reads the
+# matching lines from the source.
+#
+# `update()` indexes only what was appended since the last run. The trailing
+# segment is re-indexed while it is small, so appends don't pile up into
+# thousands of tiny segments.
+
+DEFAULT_FIELDS = ("service", "level", "orderId", "upstream")
+SEGMENT_ROWS = 1_000_000
+MERGE_BELOW_ROWS = 16_384  # a trailing segment smaller than this is re-indexed together with new lines
+MISSING = 0xFFFFFFFF
+NO_TS = float("-inf")      # lines without a timestamp sort first and never match a time range
+HEAD_BYTES = 4096          # fingerprint of the start of the source, to detect rotation
+TS_FORMAT = "mm:ss"        # how parse_ts reads short clock stamps; indexes built otherwise are rebuilt
+
+def parse_ts(value) -> float:
+    """
+    Epoch seconds, ISO-8601, or the lesson's incident clock: "MM:SS" or
+    "HH:MM:SS" (seconds from 00:00). correlate.py buckets minutes with this too.
+    """
+    if isinstance(value, (int, float)):
+        return float(value)
+    text = str(value)
+    if len(text) <= 8 and text[:2].isdigit() and text[2:3] == ":":
+        secs = 0
+        for part in text.split(":"):
+            secs = secs * 60 + int(part)
+        return float(secs)
+    try:
+        return float(text)
+    except ValueError:
+        return datetime.fromisoformat(text.replace("Z", "+00:00")).timestamp()
+
+# --- segment files: one JSON header line, then raw arrays back to back ---
+
+def _write_segment(path: str, header: dict, arrays: Dict[str, array]) -> None:
+    header = dict(header, arrays=[(name, a.typecode, len(a)) for name, a in arrays.items()])
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(json.dumps(header).encode("utf-8") + b"\n")
+        for a in arrays.values():
+            f.write(a.tobytes())
+    os.replace(tmp, path)
+
+class Segment:
+    """A read-only segment; arrays are zero-copy typed views into an mmap."""
+
+    def __init__(self, path: str) -> None:
+        with open(path, "rb") as f:
+            self.header = json.loads(f.readline())
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._mm)
+        self.arrays: Dict[str, memoryview] = {}
+        pos = self._mm.find(b"\n") + 1
+        for name, typecode, count in self.header["arrays"]:
+            nbytes = count * array(typecode).itemsize
+            self.arrays[name] = view[pos:pos + nbytes].cast(typecode)
+            pos += nbytes
+        view.release()
+        self.rows = self.header["rows"]
+        self.first_row = self.header["first_row"]
+        self._dicts: Dict[str, bytes] = {}
+
+    def code(self, field: str, value: str) -> Optional[int]:
+        # dictionary = b"\n" + b"\n".join(values) + b"\n"; a value's code is its line number,
+        # found with two C-level scans instead of parsing the dictionary
+        blob = self._dicts.get(field)
+        if blob is None:
+            blob = self._dicts[field] = self.arrays[f"dict.{field}"].tobytes()
+        pos = blob.find(b"\n" + value.encode("utf-8") + b"\n")
+        if pos == -1:
+            return None
+        return blob.count(b"\n", 0, pos)
+
+    def postings(self, field: str, code: int) -> memoryview:
+        offs = self.arrays[f"post.{field}.off"]
+        return self.arrays[f"post.{field}.rows"][offs[code]:offs[code + 1]]
+
+    def close(self) -> None:
+        for a in self.arrays.values():
+            a.release()
+        self.arrays.clear()
+        self._mm.close()
+
+def _build_segment(lines: Iterable[Tuple[int, bytes]], fields: Sequence[str],
+                   first_row: int) -> Tuple[dict, Dict[str, array]]:
+    ts, offsets, lengths = array("d"), array("q"), array("I")
+    codes = {f: array("I") for f in fields}
+    dicts: Dict[str, Dict[str, int]] = {f: {} for f in fields}
+    bad = 0
+    for offset, line in lines:
+        try:
+            rec = json.loads(line)
+        except ValueError:
+            bad += 1
+            continue
+        t = rec.get("ts")
+        ts.append(parse_ts(t) if t is not None else NO_TS)
+        offsets.append(offset)
+        lengths.append(len(line))
+        for f in fields:
+            v = rec.get(f)
+            if v is None:
+                codes[f].append(MISSING)
+            else:
+                d = dicts[f]
+                key = str(v).replace("\n", " ")
+                c = d.get(key)
+                if c is None:
+                    c = d[key] = len(d)
+                codes[f].append(c)
+
+    arrays: Dict[str, array] = {"ts": ts, "offset": offsets, "length": lengths}
+    # time index: rows ordered by ts, for range queries without field filters
+    order = sorted(range(len(ts)), key=ts.__getitem__)
+    arrays["ts.order"] = array("I", order)
+    arrays["ts.sorted"] = array("d", (ts[i] for i in order))
+    for f in fields:
+        col, d = codes[f], dicts[f]
+        arrays[f"col.{f}"] = col
+        arrays[f"dict.{f}"] = array("B", b"\n" + "\n".join(d).encode("utf-8") + b"\n")
+        # CSR postings: counting sort of row numbers by code
+        counts = [0] * (len(d) + 1)
+        for c in col:
+            if c != MISSING:
+                counts[c + 1] += 1
+        for i in range(1, len(counts)):
+            counts[i] += counts[i - 1]
+        off = array("I", counts)
+        rows = array("I", bytes(4 * counts[-1]))
+        fill = counts[:-1]
+        for r, c in enumerate(col):
+            if c != MISSING:
+                rows[fill[c]] = r
+                fill[c] += 1
+        arrays[f"post.{f}.off"] = off
+        arrays[f"post.{f}.rows"] = rows
+
+    finite = [t for t in ts if t != NO_TS]
+    header = {
+        "rows": len(ts),
+        "first_row": first_row,
+        "ts_min": min(finite) if finite else None,
+        "ts_max": max(finite) if finite else None,
+        "start_offset": offsets[0] if offsets else None,
+        "bad_lines": bad,
+        "fields": list(fields),
+    }
+    return header, arrays
+
+class LogIndex:
+    def __init__(self, source: str, index_dir: Optional[str] = None,
+                 fields: Sequence[str] = DEFAULT_FIELDS, segment_rows: int = SEGMENT_ROWS) -> None:
+        self.source = source
+        self.dir = index_dir or source + ".idx"
+        self.segment_rows = segment_rows
+        self._segments: Dict[str, Segment] = {}
+        self.meta = self._load_meta()
+        if self.meta and (list(self.meta["fields"]) != list(fields) or self.meta.get("ts_format") != TS_FORMAT):
+            self._reset()       # field set or timestamp parsing changed: rebuild
+        self.fields = list(fields)
+
+    # --- persistence ---
+
+    def _load_meta(self) -> Optional[dict]:
+        try:
+            with open(os.path.join(self.dir, "meta.json")) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def _save_meta(self) -> None:
+        tmp = os.path.join(self.dir, "meta.json.tmp")
+        with open(tmp, "w") as f:
+            json.dump(self.meta, f, indent=2)
+        os.replace(tmp, os.path.join(self.dir, "meta.json"))
+
+    def _reset(self) -> None:
+        self.close()
+        shutil.rmtree(self.dir, ignore_errors=True)
+        self.meta = None
+
+    def _head_hash(self, n: int) -> str:
+        with open(self.source, "rb") as f:
+            return hashlib.blake2b(f.read(n), digest_size=16).hexdigest()
+
+    def close(self) -> None:
+        for seg in self._segments.values():
+            seg.close()
+        self._segments.clear()
+
+    # --- indexing ---
+
+    def _iter_lines(self, start: int, end: int) -> Iterator[Tuple[int, bytes]]:
+        with open(self.source, "rb") as f:
+            f.seek(start)
+            pos = start
+            while pos < end:
+                line = f.readline()
+                if not line.endswith(b"\n"):
+                    break                  # partial line still being written: next update
+                if line.strip():
+                    yield pos, line
+                pos += len(line)
+
+    def update(self) -> int:
+        """Index lines appended since the last update; returns how many were added."""
+        size = os.path.getsize(self.source)
+        if self.meta and (size < self.meta["indexed_bytes"] or
+                          self._head_hash(self.meta["head_len"]) != self.meta["head"]):
+            self._reset()                  # truncated or rotated: start over
+        if not self.meta:
+            os.makedirs(self.dir, exist_ok=True)
+            self.meta = {"source": self.source, "fields": self.fields, "ts_format": TS_FORMAT, "indexed_bytes": 0,
+                         "rows": 0, "segments": [], "next_segment": 0}
+
+        start = self.meta["indexed_bytes"]
+        if start >= size:
+            return 0
+        segs = self.meta["segments"]
+        # re-absorb a small trailing segment so appends keep segments large
+        if segs and segs[-1]["rows"] < MERGE_BELOW_ROWS:
+            last = segs.pop()
+            self._drop_segment(last["file"])
+            start = last["start_offset"]
+            self.meta["rows"] -= last["rows"]
+
+        added = 0
+        lines = self._iter_lines(start, size)
+        while True:
+            batch = []
+            end = start
+            for offset, line in lines:
+                batch.append((offset, line))
+                end = offset + len(line)
+                if len(batch) >= self.segment_rows:
+                    break
+            if not batch:
+                break
+            header, arrays = _build_segment(batch, self.fields, self.meta["rows"])
+            header["start_offset"] = start
+            name = f"seg-{self.meta['next_segment']:05d}.bin"
+            self.meta["next_segment"] += 1
+            _write_segment(os.path.join(self.dir, name), header, arrays)
+            segs.append({"file": name, "rows": header["rows"], "start_offset": start,
+                         "ts_min": header["ts_min"], "ts_max": header["ts_max"]})
+            self.meta["rows"] += header["rows"]
+            self.meta["indexed_bytes"] = end
+            added += header["rows"]
+            start = end
+            if len(batch) < self.segment_rows:
+                break
+        self.meta["head_len"] = min(self.meta["indexed_bytes"], HEAD_BYTES)
+        self.meta["head"] = self._head_hash(self.meta["head_len"])
+        self._save_meta()
+        return added
+
+    def _drop_segment(self, name: str) -> None:
+        seg = self._segments.pop(name, None)
+        if seg is not None:
+            seg.close()
+        try:
+            os.remove(os.path.join(self.dir, name))
+        except FileNotFoundError:
+            pass
+
+    def _segment(self, name: str) -> Segment:
+        seg = self._segments.get(name)
+        if seg is None:
+            seg = self._segments[name] = Segment(os.path.join(self.dir, name))
+        return seg
+
+    # --- querying ---
+
+    def search(self, where: Dict[str, Set[str]], since: Optional[float] = None,
+               until: Optional[float] = None, limit: Optional[int] = None) -> Iterator[Tuple[str, int]]:
+        """Yield (segment file, row) for matching lines, in source order."""
+        unknown = set(where) - set(self.fields)
+        if unknown:
+            raise ValueError(f"not indexed: {', '.join(sorted(unknown))} (indexed: {', '.join(self.fields)})")
+        found = 0
+        for meta in (self.meta or {}).get("segments", []):
+            if (since is not None or until is not None) and meta["ts_min"] is None:
+                continue                   # no timestamps in this segment
+            if since is not None and meta["ts_max"] < since:
+                continue
+            if until is not None and meta["ts_min"] > until:
+                continue
+            seg = self._segment(meta["file"])
+            for row in self._search_segment(seg, where, since, until):
+                yield meta["file"], row
+                found += 1
+                if limit is not None and found >= limit:
+                    return
+
+    def _search_segment(self, seg: Segment, where: Dict[str, Set[str]],
+                        since: Optional[float], until: Optional[float]) -> Iterable[int]:
+        ts = seg.arrays["ts"]
+        lo = float("-inf") if since is None else since
+        hi = float("inf") if until is None else until
+        if not where:
+            srt, order = seg.arrays["ts.sorted"], seg.arrays["ts.order"]
+            a, b = bisect.bisect_left(srt, lo), bisect.bisect_right(srt, hi)
+            return sorted(order[a:b])
+
+        # resolve each filter to codes; the field with the fewest postings drives the scan
+        wanted: List[Tuple[int, str, Set[int]]] = []
+        for field, values in where.items():
+            codes = {c for c in (seg.code(field, v) for v in values) if c is not None}
+            if not codes:
+                return []
+            size = sum(len(seg.postings(field, c)) for c in codes)
+            wanted.append((size, field, codes))
+        wanted.sort()
+        _, field, codes = wanted[0]
+        if len(codes) == 1:
+            candidates: Iterable[int] = seg.postings(field, next(iter(codes)))
+        else:
+            candidates = sorted(r for c in codes for r in seg.postings(field, c))
+        checks = [(seg.arrays[f"col.{f}"], cs) for _, f, cs in wanted[1:]]
+        timed = since is not None or until is not None
+        out = []
+        for r in candidates:
+            if timed and not (lo <= ts[r] <= hi):
+                continue
+            if all(col[r] in cs for col, cs in checks):
+                out.append(r)
+        return out
+
+    def count(self, where: Dict[str, Set[str]], since: Optional[float] = None,
+              until: Optional[float] = None) -> int:
+        return sum(1 for _ in self.search(where, since, until))
+
+    def query(self, where: Dict[str, Set[str]], since: Optional[float] = None,
+              until: Optional[float] = None, limit: Optional[int] = None) -> Iterator[dict]:
+        """Matching records, read from the source by byte offset."""
+        with open(self.source, "rb") as f:
+            for name, row in self.search(where, since, until, limit):
+                seg = self._segment(name)
+                f.seek(seg.arrays["offset"][row])
+                yield json.loads(f.read(seg.arrays["length"][row]))
+
+def parse_where(items: List[str]) -> Dict[str, Set[str]]:
+    """["level=ERROR", "service=a,b"] -> {"level": {"ERROR"}, "service": {"a", "b"}}"""
+    where: Dict[str, Set[str]] = {}
+    for item in items:
+        field, sep, values = item.partition("=")
+        if not sep:
+            raise ValueError(f"expected field=value: {item}")
+        where.setdefault(field, set()).update(values.split(","))
+    return where
+
+def main():
+    ap = argparse.ArgumentParser(description="Build and query an index over structured JSONL logs")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p_build = sub.add_parser("build", help="Index new lines (incremental)")
+    p_build.add_argument("source")
+    p_build.add_argument("--fields", default=",".join(DEFAULT_FIELDS))
+    p_query = sub.add_parser("query", help="Query (updates the index first)")
+    p_query.add_argument("source")
+    p_query.add_argument("--where", action="append", default=[], help="field=value[,value...] (repeatable)")
+    p_query.add_argument("--since", help="Start time (MM:SS, HH:MM:SS, ISO-8601 or epoch), inclusive")
+    p_query.add_argument("--until", help="End time, inclusive")
+    p_query.add_argument("--limit", type=int, default=None)
+    p_query.add_argument("--count", action="store_true", help="Only print the number of matches")
+    p_query.add_argument("--fields", default=",".join(DEFAULT_FIELDS))
+    args = ap.parse_args()
+
+    index = LogIndex(args.source, fields=args.fields.split(","))
+    t0 = time.perf_counter()
+    added = index.update()
+    t_update = time.perf_counter() - t0
+
+    if args.cmd == "build":
+        print(f"Indexed {added:,} new line(s) in {t_update:.2f}s "
+              f"({index.meta['rows']:,} total, {len(index.meta['segments'])} segment(s)) -> {index.dir}")
+        return
+
+    where = parse_where(args.where)
+    since = parse_ts(args.since) if args.since else None
+    until = parse_ts(args.until) if args.until else None
+    t0 = time.perf_counter()
+    if args.count:
+        n = index.count(where, since, until)
+        print(n)
+    else:
+        n = 0
+        for n, rec in enumerate(index.query(where, since, until, args.limit), 1):
+            print(json.dumps(rec))
+    elapsed_ms = (time.perf_counter() - t0) * 1000
+    print(f"# {n:,} match(es) in {elapsed_ms:.1f} ms (indexed {added:,} new line(s) first)",
+          file=sys.stderr)
+    index.close()
+
+if __name__ == "__main__":
+    main()
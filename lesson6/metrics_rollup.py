@@ -0,0 +1,206 @@
+import hashlib
+import os
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+# Streaming CSV -> NumPy loader and a min/max/mean downsampling pyramid.
+#
+#   level 0    raw rows (only held one chunk at a time)
+#   level 1    buckets of BASE_BUCKET rows
+#   level k    buckets of BASE_BUCKET * FANOUT**(k-1) rows
+#
+# Each bucket keeps, per column, min / max / mean plus the x of its first row,
+# so a plot can draw a bounded number of points (mean line + min/max band)
+# whatever the input size, without losing spikes. The pyramid can be cached
+# next to the plots and is reused while the CSV is unchanged.
+
+BASE_BUCKET = 8
+FANOUT = 4
+CHUNK_BYTES = 32 * 1024 * 1024
+
+def read_header(path: str) -> List[str]:
+    with open(path) as f:
+        return f.readline().strip().split(",")
+
+def iter_chunks(path: str, chunk_bytes: int = CHUNK_BYTES) -> Iterator[np.ndarray]:
+    """Numeric CSV (header line skipped) as 2-D float arrays, one chunk of whole lines at a time."""
+    ncols = len(read_header(path))
+    with open(path, "rb") as f:
+        f.readline()
+        rest = b""
+        while True:
+            block = f.read(chunk_bytes)
+            if not block and not rest:
+                return
+            data = rest + block
+            if block:
+                cut = data.rfind(b"\n") + 1
+                data, rest = data[:cut], data[cut:]
+            else:
+                rest = b""
+            if data.strip():
+                # one C-level parse for the whole chunk: newlines become separators too
+                values = np.fromstring(data.replace(b"\n", b",").decode("ascii"), sep=",")
+                if values.size % ncols:
+                    raise ValueError(f"{path}: ragged rows (expected {ncols} columns)")
+                yield values.reshape(-1, ncols)
+            if not block:
+                return
+
+class Level:
+    def __init__(self, bucket: int, x: np.ndarray, lo: np.ndarray, hi: np.ndarray,
+                 mean: np.ndarray, count: np.ndarray) -> None:
+        self.bucket = bucket          # raw rows per bucket
+        self.x = x                    # x of each bucket's first row
+        self.lo, self.hi, self.mean = lo, hi, mean      # shape (buckets, columns)
+        self.count = count            # rows in each bucket (the last one may be partial)
+
+    def __len__(self) -> int:
+        return len(self.x)
+
+def _reduce(x: np.ndarray, lo: np.ndarray, hi: np.ndarray, mean: np.ndarray,
+            count: np.ndarray, group: int) -> Tuple[np.ndarray, ...]:
+    """Merge consecutive groups of `group` buckets (works for raw rows too: count=1)."""
+    n = len(x)
+    starts = np.arange(0, n, group)
+    total = np.add.reduceat(count, starts)
+    return (x[starts],
+            np.minimum.reduceat(lo, starts, axis=0),
+            np.maximum.reduceat(hi, starts, axis=0),
+            np.add.reduceat(mean * count[:, None], starts, axis=0) / total[:, None],
+            total)
+
+class Pyramid:
+    def __init__(self, columns: List[str], levels: List[Level], rows: int) -> None:
+        self.columns = columns        # value columns (the first CSV column is x)
+        self.levels = levels
+        self.rows = rows
+
+    @classmethod
+    def build(cls, path: str, chunk_bytes: int = CHUNK_BYTES) -> "Pyramid":
+        header = read_header(path)
+        parts: List[Tuple[np.ndarray, ...]] = []
+        carry: Optional[np.ndarray] = None
+        rows = 0
+        for chunk in iter_chunks(path, chunk_bytes):
+            rows += len(chunk)
+            if carry is not None:
+                chunk = np.concatenate([carry, chunk])
+            full = len(chunk) - len(chunk) % BASE_BUCKET
+            carry = chunk[full:] if full < len(chunk) else None
+            if full:
+                parts.append(cls._level1(chunk[:full]))
+        if carry is not None and len(carry):
+            parts.append(cls._level1(carry))
+        if not parts:
+            raise ValueError(f"{path}: no data rows")
+
+        levels = [Level(BASE_BUCKET, *(np.concatenate(p) for p in zip(*parts)))]
+        while len(levels[-1]) > 1:
+            prev = levels[-1]
+            levels.append(Level(prev.bucket * FANOUT,
+                                *_reduce(prev.x, prev.lo, prev.hi, prev.mean, prev.count, FANOUT)))
+        return cls(header[1:], levels, rows)
+
+    @staticmethod
+    def _level1(raw: np.ndarray) -> Tuple[np.ndarray, ...]:
+        values = raw[:, 1:]
+        return _reduce(raw[:, 0], values, values, values, np.ones(len(raw)), BASE_BUCKET)
+
+    def level_for(self, max_points: int) -> Level:
+        """The finest level that fits in `max_points` buckets."""
+        for level in self.levels:
+            if len(level) <= max_points:
+                return level
+        return self.levels[-1]
+
+    def series(self, column: str, max_points: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """(x, min, max, mean) for one column with at most `max_points` points."""
+        level = self.level_for(max_points)
+        i = self.columns.index(column)
+        return level.x, level.lo[:, i], level.hi[:, i], level.mean[:, i]
+
+    # --- cache ---
+
+    def save(self, path: str, fingerprint: str) -> None:
+        arrays: Dict[str, np.ndarray] = {}
+        for k, level in enumerate(self.levels):
+            for name in ("x", "lo", "hi", "mean", "count"):
+                arrays[f"{k}.{name}"] = getattr(level, name)
+            arrays[f"{k}.bucket"] = np.array(level.bucket)
+        tmp = path + ".tmp.npz"
+        np.savez(tmp, columns=np.array(self.columns), rows=np.array(self.rows),
+                 fingerprint=np.array(fingerprint), **arrays)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str, fingerprint: str) -> Optional["Pyramid"]:
+        try:
+            with np.load(path) as z:
+                if str(z["fingerprint"]) != fingerprint:
+                    return None
+                levels = []
+                k = 0
+                while f"{k}.x" in z:
+                    levels.append(Level(int(z[f"{k}.bucket"]), *(z[f"{k}.{n}"] for n in ("x", "lo", "hi", "mean", "count"))))
+                    k += 1
+                return cls([str(c) for c in z["columns"]], levels, int(z["rows"]))
+        except (OSError, KeyError, ValueError):
+            return None
+
+def fingerprint(path: str) -> str:
+    st = os.stat(path)
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"{st.st_size}:{st.st_mtime_ns}:{BASE_BUCKET}:{FANOUT}".encode())
+    return h.hexdigest()
+
+def load_pyramid(path: str, cache: Optional[str] = None) -> Pyramid:
+    """Build the pyramid for `path`, reusing `cache` (an .npz) while the CSV is unchanged."""
+    fp = fingerprint(path)
+    if cache:
+        cached = Pyramid.load(cache, fp)
+        if cached is not None:
+            return cached
+    pyramid = Pyramid.build(path)
+    if cache:
+        pyramid.save(cache, fp)
+    return pyramid
+
+def lttb(x: np.ndarray, y: np.ndarray, n_out: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Largest-Triangle-Three-Buckets (Steinarsson, 2013): `n_out` points that keep the shape."""
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return x, y
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    keep = np.empty(n_out, dtype=int)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # average of the next bucket is the third triangle vertex
+        nlo, nhi = hi, edges[i + 2] if i + 2 < len(edges) else n
+        cx, cy = x[nlo:nhi].mean(), y[nlo:nhi].mean()
+        bx, by = x[lo:hi], y[lo:hi]
+        area = np.abs((x[a] - cx) * (by - y[a]) - (x[a] - bx) * (cy - y[a]))
+        a = lo + int(area.argmax())
+        keep[i + 1] = a
+    return x[keep], y[keep]
+
+def plot_series(path: str, column: str, max_points: int = 2000, method: str = "minmax",
+                cache: Optional[str] = None) -> Dict[str, np.ndarray]:
+    """
+    What to draw for one column: {"x", "y"} and, for min/max rollups, {"lo", "hi"}.
+    Inputs that already fit in `max_points` are returned as-is.
+    """
+    pyramid = load_pyramid(path, cache)
+    if pyramid.rows <= max_points:
+        raw = np.concatenate(list(iter_chunks(path)))
+        return {"x": raw[:, 0], "y": raw[:, 1 + pyramid.columns.index(column)]}
+    if method == "lttb":
+        # LTTB over the finest rollup (bucket means), so raw rows are never all in memory
+        finest = pyramid.levels[0]
+        x, y = lttb(finest.x, finest.mean[:, pyramid.columns.index(column)], max_points)
+        return {"x": x, "y": y}
+    x, lo, hi, mean = pyramid.series(column, max_points)
+    return {"x": x, "y": mean, "lo": lo, "hi": hi}
@@ -1,49 +1,55 @@
 #!/usr/bin/env python3
-import csv
+import argparse
 from pathlib import Path
 import matplotlib.pyplot as plt
+from matplotlib.ticker import MaxNLocator
+
+from metrics_rollup import plot_series
 
 DATA = Path("data/metrics.csv")
 OUTDIR = Path("out")
-OUTDIR.mkdir(exist_ok=True)
-
-minutes = []
-p95 = []
-err = []
-rps = []
-
-with DATA.open() as f:
-    reader = csv.DictReader(f)
-    for row in reader:
-        minutes.append(int(row["minute"]))
-        p95.append(float(row["p95_latency_ms"]))
-        err.append(float(row["error_rate_pct"]))
-        rps.append(float(row["rps"]))
-
-# Plot 1: p95 latency
-plt.figure()
-plt.plot(minutes, p95, marker="o")
-plt.title("p95 Latency (ms)")
-plt.xlabel("Minute")
-plt.ylabel("ms")
-plt.xticks(minutes)
-plt.grid(True)
-plt.tight_layout()
-plt.savefig(OUTDIR / "p95_latency.png", dpi=160)
-plt.close()
-
-# Plot 2: error rate
-plt.figure()
-plt.plot(minutes, err, marker="o")
-plt.title("Error Rate (%)")
-plt.xlabel("Minute")
-plt.ylabel("%")
-plt.xticks(minutes)
-plt.grid(True)
-plt.tight_layout()
-plt.savefig(OUTDIR / "error_rate.png", dpi=160)
-plt.close()
-
-print("Wrote:")
-print(f" - {OUTDIR/'p95_latency.png'}")
-print(f" - {OUTDIR/'error_rate.png'}")
+
+def plot(series, title, ylabel, out):
+    plt.figure()
+    if "lo" in series:
+        # downsampled: mean line with the min/max band, so short spikes stay visible
+        plt.fill_between(series["x"], series["lo"], series["hi"], alpha=0.3, linewidth=0)
+        plt.plot(series["x"], series["y"])
+    else:
+        plt.plot(series["x"], series["y"], marker="o" if len(series["x"]) <= 60 else None)
+    plt.title(title)
+    plt.xlabel("Minute")
+    plt.ylabel(ylabel)
+    # a bounded number of ticks, not one per row
+    plt.gca().xaxis.set_major_locator(MaxNLocator(nbins=12, integer=True))
+    plt.grid(True)
+    plt.tight_layout()
+    plt.savefig(out, dpi=160)
+    plt.close()
+
+def main():
+    ap = argparse.ArgumentParser(description="Plot p95 latency and error rate from metrics.csv")
+    ap.add_argument("--data", type=Path, default=DATA)
+    ap.add_argument("--max-points", type=int, default=2000, help="Upper bound on points drawn per plot")
+    ap.add_argument("--method", choices=["minmax", "lttb"], default="minmax",
+                    help="Downsampling for large inputs: min/max/mean rollups or LTTB")
+    ap.add_argument("--no-cache", action="store_true", help="Don't read/write out/<data>.rollup.npz")
+    args = ap.parse_args()
+
+    OUTDIR.mkdir(exist_ok=True)
+    cache = None if args.no_cache else str(OUTDIR / f"{args.data.stem}.rollup.npz")
+
+    # Plot 1: p95 latency
+    p95 = plot_series(str(args.data), "p95_latency_ms", args.max_points, args.method, cache)
+    plot(p95, "p95 Latency (ms)", "ms", OUTDIR / "p95_latency.png")
+
+    # Plot 2: error rate
+    err = plot_series(str(args.data), "error_rate_pct", args.max_points, args.method, cache)
+    plot(err, "Error Rate (%)", "%", OUTDIR / "error_rate.png")
+
+    print("Wrote:")
+    print(f" - {OUTDIR/'p95_latency.png'}")
+    print(f" - {OUTDIR/'error_rate.png'}")
+
+if __name__ == "__main__":
+    main()
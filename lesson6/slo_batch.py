@@ -0,0 +1,153 @@
+import argparse
+import csv
+import glob
+import json
+import mmap
+import os
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List
+
+from calculate_slo import load_slo
+from slo_stream import DEFAULT_CHUNK_BYTES, byte_ranges, is_good, line_start
+
+# SLIs and error budgets for many services in one pass.
+#
+#   slos/*.yaml                 one SLO definition per service (same shape as slo.yaml)
+#   traffic_by_service.log      combined stream, "<service> <status>" per line
+#
+# Counting is per (service, status) pair: a chunk's lines are tallied with a
+# Counter, and there are only services x status codes distinct lines, so each
+# line is parsed once per chunk, not once per request. Large inputs are
+# sharded across processes by byte range (see slo_stream.py).
+
+Counts = Dict[str, List[int]]        # service -> [good, total]
+
+def load_slos(directory: str) -> Dict[str, dict]:
+    slos = {}
+    for path in sorted(glob.glob(os.path.join(directory, "*.yaml")) + glob.glob(os.path.join(directory, "*.yml"))):
+        slo = load_slo(path)
+        if slo["service"] in slos:
+            raise ValueError(f"duplicate SLO for service {slo['service']!r}: {path}")
+        slos[slo["service"]] = slo
+    return slos
+
+def tally_lines(data: bytes, counts: Counts) -> None:
+    for line, n in Counter(data.split(b"\n")).items():
+        parts = line.split()
+        if not parts:
+            continue
+        if len(parts) != 2:
+            raise ValueError(f"expected '<service> <status>': {line[:80]!r}")
+        service = parts[0].decode("utf-8")
+        c = counts.setdefault(service, [0, 0])
+        if is_good(int(parts[1])):
+            c[0] += n
+        c[1] += n
+
+def count_range(path: str, start: int, end: int, chunk_bytes: int = DEFAULT_CHUNK_BYTES) -> Counts:
+    counts: Counts = {}
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return counts
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            pos, stop = line_start(mm, start), line_start(mm, end)
+            while pos < stop:
+                cut = line_start(mm, min(pos + chunk_bytes, stop))
+                tally_lines(mm[pos:cut], counts)
+                pos = cut
+    return counts
+
+def count_services(path: str, workers: int = 1, chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+                   min_bytes_per_worker: int = 32 * 1024 * 1024) -> Counts:
+    size = os.path.getsize(path)
+    workers = max(1, min(workers, size // min_bytes_per_worker))
+    if workers == 1:
+        return count_range(path, 0, size, chunk_bytes)
+    ranges = byte_ranges(size, workers)
+    merged: Counts = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for part in pool.map(count_range, [path] * len(ranges), [s for s, _ in ranges],
+                             [e for _, e in ranges], [chunk_bytes] * len(ranges)):
+            for service, (good, total) in part.items():
+                c = merged.setdefault(service, [0, 0])
+                c[0] += good
+                c[1] += total
+    return merged
+
+def evaluate(slos: Dict[str, dict], counts: Counts) -> List[dict]:
+    rows = []
+    for service, slo in slos.items():
+        good, total = counts.get(service, (0, 0))
+        target = slo["slo"]["target"]
+        allowed_bad = (1 - target / 100) * total
+        bad = total - good
+        sli = good / total * 100 if total else None
+        rows.append({
+            "service": service,
+            "total": total,
+            "good": good,
+            "sli": sli,
+            "target": target,
+            # share of the error budget left for the traffic seen (negative = overspent);
+            # None when there is no budget at all (100% target) and a request failed;
+            # the burn rate is then unbounded, also None (JSON has no infinity)
+            "budget_remaining": 1 - bad / allowed_bad if allowed_bad else (1.0 if bad == 0 else None),
+            "burn": (bad / total) / (1 - target / 100) if total and target < 100 else (0.0 if bad == 0 else None),
+            "status": "NO DATA" if not total else ("OK" if sli >= target else "VIOLATED"),
+        })
+    return rows
+
+SORT_KEYS = {
+    "budget": lambda r: r["budget_remaining"] if r["budget_remaining"] is not None else float("-inf"),  # worst first
+    "burn": lambda r: -r["burn"] if r["burn"] is not None else float("-inf"),  # worst first
+    "sli": lambda r: r["sli"] if r["sli"] is not None else 101.0,
+    "service": lambda r: r["service"],
+    "total": lambda r: -r["total"],
+}
+
+def print_table(rows: List[dict], unknown: Counts) -> None:
+    print(f"{'service':<20} {'requests':>10} {'SLI':>8} {'target':>7} {'budget left':>12} {'burn':>7}  status")
+    for r in rows:
+        sli = f"{r['sli']:.2f}%" if r["sli"] is not None else "-"
+        budget = f"{r['budget_remaining']:.1%}" if r["budget_remaining"] is not None else "none"
+        burn = f"{r['burn']:.1f}x" if r["burn"] is not None else "∞"
+        print(f"{r['service']:<20} {r['total']:>10,} {sli:>8} {r['target']:>6}% "
+              f"{budget:>11} {burn:>7}  {r['status']}")
+    if unknown:
+        total = sum(t for _, t in unknown.values())
+        print(f"\n{len(unknown)} service(s) in the traffic without an SLO ({total:,} requests): "
+              f"{', '.join(sorted(unknown))}")
+
+def main():
+    ap = argparse.ArgumentParser(description="Per-service SLIs and error budgets from one traffic stream")
+    ap.add_argument("--slos", default="slos", help="Directory of SLO definitions (*.yaml)")
+    ap.add_argument("--log", default="data/traffic_by_service.log", help="'<service> <status>' per line")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--sort", choices=sorted(SORT_KEYS), default="budget")
+    ap.add_argument("--top", type=int, default=0, help="Only show the N worst (after sorting)")
+    ap.add_argument("--format", choices=["table", "csv", "json"], default="table")
+    args = ap.parse_args()
+
+    slos = load_slos(args.slos)
+    counts = count_services(args.log, workers=args.workers)
+    rows = sorted(evaluate(slos, counts), key=SORT_KEYS[args.sort])
+    if args.top:
+        rows = rows[:args.top]
+    unknown = {s: c for s, c in counts.items() if s not in slos}
+
+    if args.format == "json":
+        print(json.dumps({"services": rows, "without_slo": sorted(unknown)}, indent=2))
+    elif args.format == "csv":
+        writer = csv.DictWriter(sys.stdout, fieldnames=list(rows[0]) if rows else ["service"])
+        writer.writeheader()
+        writer.writerows(rows)
+    else:
+        print("==============================================")
+        print(f"SLO report: {len(slos)} service(s), sorted by {args.sort}")
+        print("==============================================")
+        print_table(rows, unknown)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+import mmap
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:          # optional: the pure-bytes path below is used instead
+    np = None
+
+# Streaming good/total counts for traffic logs (one HTTP status per line).
+#
+# The file is memory-mapped and scanned in large chunks, so memory stays at one
+# chunk no matter how large the log is. Chunks in the usual layout ("200\n",
+# every line three digits) are counted with a few C-level bytes operations and
+# never split into lines. Anything else (CRLF, blank lines, padding) is split
+# into tokens and tallied with a Counter: status codes have only a handful of
+# distinct values, so that is one int() per distinct code, not per line.
+#
+# Large files are split into byte ranges, one per worker process. A range owns
+# the lines that *start* inside it, so every line is counted exactly once.
+
+DEFAULT_CHUNK_BYTES = 16 * 1024 * 1024
+
+def is_good(status: int) -> bool:
+    # matches slo.yaml: good_events "status < 500"
+    return status < 500
+
+def line_start(mm: mmap.mmap, pos: int) -> int:
+    """First line start at or after `pos`."""
+    if pos <= 0:
+        return 0
+    if pos >= len(mm):
+        return len(mm)
+    if mm[pos - 1] == 0x0A:           # b"\n"
+        return pos
+    nl = mm.find(b"\n", pos)
+    return len(mm) if nl == -1 else nl + 1
+
+_DIGITS_NL = b"0123456789\n"
+_BAD_FIRST_DIGITS = (b"5", b"6", b"7", b"8", b"9")     # first digit of a status >= 500
+
+def _tally_fixed(data: memoryview) -> Optional[Tuple[int, int]]:
+    # Fast path: every line is exactly 3 digits + "\n". Returns None if not.
+    if np is not None:
+        if len(data) % 4:
+            return None
+        w = np.frombuffer(data, dtype="<u4")       # byte 0 (first digit) is the low byte
+        if not ((w & 0xFF000000) == 0x0A000000).all():
+            return None
+        # bytes 0-2 in 0x30-0x3F and in 0x2A-0x39, i.e. exactly "0"-"9"
+        if not (((w - 0x00303030) & 0x00F0F0F0) == 0).all() or \
+           not (((w + 0x00060606) & 0x00F0F0F0) == 0x00303030).all():
+            return None
+        total = len(w)
+        return total - int(np.count_nonzero((w & 0xFF) >= 0x35)), total   # first digit >= "5"
+    data = bytes(data)
+    total = data.count(b"\n")
+    if len(data) != 4 * total or data[3::4].count(b"\n") != total or data.translate(None, _DIGITS_NL):
+        return None
+    first = data[0::4]
+    bad = sum(first.count(d) for d in _BAD_FIRST_DIGITS)
+    return total - bad, total
+
+def tally(data: memoryview) -> Tuple[int, int]:
+    """(good, total) for a buffer of whole lines."""
+    fast = _tally_fixed(data)
+    if fast is not None:
+        return fast
+    good = total = 0
+    for token, n in Counter(bytes(data).split()).items():
+        try:
+            status = int(token)
+        except ValueError:
+            raise ValueError(f"not an HTTP status code: {token[:40]!r}") from None
+        total += n
+        if is_good(status):
+            good += n
+    return good, total
+
+def count_range(path: str, start: int, end: int,
+                chunk_bytes: int = DEFAULT_CHUNK_BYTES) -> Tuple[int, int]:
+    """(good, total) for the lines starting in [start, end) of `path`."""
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return 0, 0
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+            pos = line_start(mm, start)
+            stop = line_start(mm, end)
+            good = total = 0
+            while pos < stop:
+                cut = line_start(mm, min(pos + chunk_bytes, stop))
+                with view[pos:cut] as chunk:       # zero-copy window into the mapping
+                    g, t = tally(chunk)
+                good += g
+                total += t
+                pos = cut
+            return good, total
+
+def byte_ranges(size: int, parts: int) -> List[Tuple[int, int]]:
+    step = -(-size // parts)
+    return [(i, min(i + step, size)) for i in range(0, size, step)] or [(0, 0)]
+
+def count_file(path: str, workers: int = 1, chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+               min_bytes_per_worker: int = 32 * 1024 * 1024) -> Tuple[int, int]:
+    """(good, total) for a whole traffic log, optionally sharded across processes."""
+    size = os.path.getsize(path)
+    workers = max(1, min(workers, size // min_bytes_per_worker))
+    if workers == 1:
+        return count_range(path, 0, size, chunk_bytes)
+    ranges = byte_ranges(size, workers)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(count_range, [path] * len(ranges),
+                                [s for s, _ in ranges], [e for _, e in ranges],
+                                [chunk_bytes] * len(ranges)))
+    return sum(g for g, _ in results), sum(t for _, t in results)
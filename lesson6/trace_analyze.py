@@ -0,0 +1,275 @@
+import argparse
+import json
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Critical-path and per-span latency analysis over many traces.
+#
+# Input: trace files shaped like data/trace.json (one trace per *.json file, or
+# one per line in *.jsonl). Spans nest via "spans". If spans carry "start_ms"
+# (offset from the trace start), the critical path follows real overlap;
+# without it, children are assumed to run one after another (as in the
+# lesson's trace, where they add up to the root's duration).
+#
+# Per span name we keep a DDSketch of durations (relative-error quantiles,
+# mergeable, bounded size), the error count and the time the span spent on
+# the critical path. Files are analyzed in parallel and the partial results
+# merged, so memory doesn't grow with the number of traces.
+
+class DDSketch:
+    """Quantile sketch with relative accuracy `alpha` (Masson et al., VLDB 2019)."""
+
+    def __init__(self, alpha: float = 0.01, max_buckets: int = 2048) -> None:
+        self.alpha = alpha
+        self.gamma = (1 + alpha) / (1 - alpha)
+        self._log_gamma = math.log(self.gamma)
+        self.max_buckets = max_buckets
+        self.buckets: Dict[int, int] = {}
+        self.zeros = 0
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+        if value <= 0:
+            self.zeros += 1
+            return
+        key = math.ceil(math.log(value) / self._log_gamma)
+        self.buckets[key] = self.buckets.get(key, 0) + 1
+        if len(self.buckets) > self.max_buckets:
+            self._collapse()
+
+    def _collapse(self) -> None:
+        # bounded memory: fold the lowest buckets together (only low quantiles lose accuracy)
+        keys = sorted(self.buckets)
+        excess = len(keys) - self.max_buckets + 1
+        folded = sum(self.buckets.pop(k) for k in keys[:excess])
+        self.buckets[keys[excess]] = self.buckets.get(keys[excess], 0) + folded
+
+    def merge(self, other: "DDSketch") -> None:
+        if other.gamma != self.gamma:
+            raise ValueError("can only merge sketches with the same alpha")
+        for k, n in other.buckets.items():
+            self.buckets[k] = self.buckets.get(k, 0) + n
+        self.zeros += other.zeros
+        self.count += other.count
+        self.sum += other.sum
+        self.max = max(self.max, other.max)
+        if len(self.buckets) > self.max_buckets:
+            self._collapse()
+
+    def quantile(self, q: float) -> float:
+        if self.count == 0:
+            return float("nan")
+        rank = q * (self.count - 1)
+        seen = self.zeros
+        if rank < seen:
+            return 0.0
+        for k in sorted(self.buckets):
+            seen += self.buckets[k]
+            if seen > rank:
+                return 2 * self.gamma ** k / (self.gamma + 1)
+        return self.max
+
+class SpanStats:
+    def __init__(self) -> None:
+        self.latency = DDSketch()
+        self.errors = 0
+        self.critical_ms = 0.0       # total time this span name spent on critical paths
+        self.dominant = 0            # traces where it was the largest critical-path contributor
+        self.roots = 0               # traces where it was the root span
+
+    def merge(self, other: "SpanStats") -> None:
+        self.latency.merge(other.latency)
+        self.errors += other.errors
+        self.critical_ms += other.critical_ms
+        self.dominant += other.dominant
+        self.roots += other.roots
+
+# --- span trees ---
+
+def _end(span: dict) -> float:
+    return span["start_ms"] + span["duration_ms"]
+
+def assign_starts(span: dict, start: float = 0.0) -> None:
+    """Fill in start_ms where missing: children run back to back from the parent's start."""
+    span.setdefault("start_ms", start)
+    cursor = span["start_ms"]
+    for child in span.get("spans", []):
+        if "start_ms" not in child:
+            child["start_ms"] = cursor
+        cursor = _end(child)
+        assign_starts(child, child["start_ms"])
+
+def critical_path(span: dict, out: Optional[List[Tuple[str, float]]] = None,
+                  until: float = math.inf) -> List[Tuple[str, float]]:
+    """
+    [(span name, exclusive ms on the critical path)]. Walks back from the end of
+    the span: the child that finished last (before the cursor) is what the
+    parent was waiting on; time not covered by such a child is the span's own.
+    Only the part of a child before `until` (where the path left it) counts.
+    """
+    if out is None:
+        out = []
+    children = sorted(span.get("spans", []), key=_end, reverse=True)
+    cursor = min(_end(span), until)
+    own = 0.0
+    for child in children:
+        if child["start_ms"] >= cursor:
+            continue
+        end = min(_end(child), cursor)
+        own += cursor - end
+        critical_path(child, out, until=end)
+        cursor = child["start_ms"]
+    own += max(0.0, cursor - span["start_ms"])
+    out.append((span["name"], own))
+    return out
+
+def walk(span: dict) -> Iterator[dict]:
+    yield span
+    for child in span.get("spans", []):
+        yield from walk(child)
+
+# --- input ---
+
+def iter_trace_files(paths: Iterable[str]) -> Iterator[str]:
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for name in sorted(files):
+                    if name.endswith((".json", ".jsonl")):
+                        yield os.path.join(root, name)
+        else:
+            yield path
+
+def load_traces(path: str) -> Iterator[dict]:
+    with open(path) as f:
+        if path.endswith(".jsonl"):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield json.load(f)
+
+def analyze_files(paths: List[str]) -> Tuple[Dict[str, SpanStats], int, float]:
+    """Runs in a worker: (stats per span name, traces, total root ms) for a batch of files."""
+    stats: Dict[str, SpanStats] = {}
+    traces = 0
+    total_ms = 0.0
+    for path in paths:
+        for trace in load_traces(path):
+            root = trace["rootSpan"]
+            assign_starts(root)
+            traces += 1
+            total_ms += root["duration_ms"]
+            for span in walk(root):
+                s = stats.get(span["name"])
+                if s is None:
+                    s = stats[span["name"]] = SpanStats()
+                s.latency.add(span["duration_ms"])
+                if span.get("error"):
+                    s.errors += 1
+            path_ms: Dict[str, float] = {}
+            for name, ms in critical_path(root):
+                path_ms[name] = path_ms.get(name, 0.0) + ms
+            for name, ms in path_ms.items():
+                stats[name].critical_ms += ms
+            stats[max(path_ms, key=path_ms.get)].dominant += 1
+            stats[root["name"]].roots += 1
+    return stats, traces, total_ms
+
+def analyze(paths: Iterable[str], workers: int = 1, files_per_task: int = 200) -> Tuple[Dict[str, SpanStats], int, float]:
+    files = list(iter_trace_files(paths))
+    batches = [files[i:i + files_per_task] for i in range(0, len(files), files_per_task)]
+    merged: Dict[str, SpanStats] = {}
+    traces, total_ms = 0, 0.0
+
+    def absorb(part: Tuple[Dict[str, SpanStats], int, float]) -> None:
+        nonlocal traces, total_ms
+        stats, n, ms = part
+        traces += n
+        total_ms += ms
+        for name, s in stats.items():
+            if name in merged:
+                merged[name].merge(s)
+            else:
+                merged[name] = s
+
+    if workers <= 1 or len(batches) <= 1:
+        for batch in batches:
+            absorb(analyze_files(batch))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for part in pool.map(analyze_files, batches):
+                absorb(part)
+    return merged, traces, total_ms
+
+# --- synthetic traces (for trying this out at scale) ---
+
+def generate(out_dir: str, n: int, seed: int) -> None:
+    rng = random.Random(seed)
+    os.makedirs(out_dir, exist_ok=True)
+    for i in range(n):
+        timeout = rng.random() < 0.08
+        spans = [
+            {"name": "auth.verifyToken", "duration_ms": round(rng.lognormvariate(2.4, 0.3), 1)},
+            {"name": "cart.get", "duration_ms": round(rng.lognormvariate(3.0, 0.3), 1)},
+            {"name": "inventory.reserve", "duration_ms": 410.0 if timeout else round(rng.lognormvariate(3.4, 0.4), 1)},
+            {"name": "payments.charge", "duration_ms": round(rng.lognormvariate(3.5, 0.3), 1)},
+            {"name": "db.writeOrder", "duration_ms": round(rng.lognormvariate(2.9, 0.5), 1)},
+        ]
+        if timeout:
+            spans[2]["error"] = "timeout"
+        root = {"name": "POST /checkout", "duration_ms": round(sum(s["duration_ms"] for s in spans) + rng.uniform(2, 15), 1),
+                "spans": spans}
+        with open(os.path.join(out_dir, f"trace-{i:06d}.json"), "w") as f:
+            json.dump({"traceId": f"t-{i:06x}", "rootSpan": root}, f)
+
+def main():
+    ap = argparse.ArgumentParser(description="Critical path + per-span latency percentiles across traces")
+    ap.add_argument("paths", nargs="*", default=["data/trace.json"], help="Trace files and/or directories")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--top", type=int, default=15)
+    ap.add_argument("--generate", type=int, metavar="N",
+                    help="First write N synthetic traces into the (single) directory given")
+    ap.add_argument("--seed", type=int, default=11)
+    args = ap.parse_args()
+
+    if args.generate:
+        generate(args.paths[0], args.generate, args.seed)
+
+    t0 = time.perf_counter()
+    stats, traces, total_ms = analyze(args.paths, workers=args.workers)
+    elapsed = time.perf_counter() - t0
+
+    print("==============================================")
+    print(f"Trace analysis: {traces:,} trace(s) in {elapsed:.2f}s")
+    print("==============================================")
+    print(f"{'span':<24} {'count':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'err%':>6} {'crit%':>6} {'dominant':>9}")
+    ranked = sorted(stats.items(), key=lambda kv: kv[1].critical_ms, reverse=True)
+    for name, s in ranked[:args.top]:
+        q = s.latency.quantile
+        crit = s.critical_ms / total_ms * 100 if total_ms else 0.0
+        err = s.errors / s.latency.count * 100
+        print(f"{name:<24} {s.latency.count:>8,} {q(0.5):>8.0f} {q(0.95):>8.0f} {q(0.99):>8.0f} "
+              f"{err:>5.1f}% {crit:>5.1f}% {s.dominant:>9,}")
+    print("(latency in ms; crit% = share of all critical-path time; dominant = traces where it was the top contributor)")
+
+    # the root is on every critical path; the answer people want is the top child
+    children = [(n, s) for n, s in ranked if s.dominant and s.latency.count and not s.roots]
+    if children:
+        name, s = children[0]
+        print(f"\nDominant latency contributor: {name} "
+              f"(largest critical-path share in {s.dominant:,} of {traces:,} traces)")
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,45 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import PlainTextResponse
 from pydantic import BaseModel, Field
+from starlette.routing import Match
 from typing import Optional, Dict, Any, Literal
 from uuid import uuid4
 from datetime import datetime, timezone
+import os
+import sys
 import time
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "shared"))
+import instrument
+
 app = FastAPI(
     title="CNPE Platform API",
     description="Lesson 7 demo: Self-service resource provisioning via Platform API",
     version="1.0.0",
 )
 
+# --- Metrics: request latency per route template (not raw path, to keep series bounded) ---
+PROVISION_SECONDS = instrument.REGISTRY.histogram("provisioning_seconds", "Time to provision a resource",
+                                                  labels=("resource_type", "status"))
+
+def route_template(request: Request) -> str:
+    for route in request.app.routes:
+        if route.matches(request.scope)[0] == Match.FULL:
+            return route.path
+    return "other"
+
+@app.middleware("http")
+async def record_latency(request: Request, call_next):
+    t0 = time.perf_counter_ns()
+    response = await call_next(request)
+    instrument.HTTP_REQUESTS.labels(request.method, route_template(request),
+                                    str(response.status_code)).observe_ns(time.perf_counter_ns() - t0)
+    return response
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    return PlainTextResponse(instrument.render_prometheus(), media_type=instrument.CONTENT_TYPE)
+
 # --- In-memory store for demo purposes ---
 JOBS: Dict[str, Dict[str, Any]] = {}
 
@@ -114,7 +143,9 @@ def create_provision_request(req: ProvisionRequest):
 
     # For simplicity in a local demo: do sync "background" simulation.
     # In a real platform API: queue + worker + async callbacks.
+    t0 = time.perf_counter_ns()
     simulate_provisioning(job_id)
+    PROVISION_SECONDS.labels(req.resource_type, JOBS[job_id]["status"]).observe_ns(time.perf_counter_ns() - t0)
 
     return ProvisionResponse(
         request_id=job_id,
@@ -0,0 +1,202 @@
+# lesson8/ingress-demo/bulk_validate.py
+
+"""
+Bulk guardrail validation for a whole platform repo of ingress configs.
+
+CI runs this on every push:
+- find every *.yaml / *.yml config under the given paths
+- skip files whose content hash already has a cached verdict
+- parse + validate the rest in parallel (C YAML loader when available)
+- print ONE aggregated report and exit non-zero if anything was rejected
+
+Usage:
+  python3 bulk_validate.py configs/
+  python3 bulk_validate.py services/ --workers 8 --format json
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import yaml
+
+from policy import validate_config
+
+# libyaml bindings are ~10x faster than the pure-Python loader
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+CACHE_FILE = ".validate_cache.json"
+CONFIG_SUFFIXES = (".yaml", ".yml")
+SECTIONS = ("security", "traffic")
+SKIP_DIRS = {".git", "__pycache__", ".venv", "venv", "node_modules"}
+
+def policy_fingerprint() -> str:
+    """
+    Cached verdicts are only valid for the guardrails that produced them.
+    Hash the policy source so editing policy.py invalidates the cache.
+    """
+    import policy
+    with open(policy.__file__, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()[:16]
+
+def discover(paths: Iterable[str]) -> List[str]:
+    found: List[str] = []
+    for p in paths:
+        if os.path.isfile(p):
+            found.append(p)
+            continue
+        for root, dirs, files in os.walk(p):
+            dirs[:] = [d for d in dirs if d not in SKIP_DIRS]
+            for name in files:
+                if name.endswith(CONFIG_SUFFIXES):
+                    found.append(os.path.join(root, name))
+    return sorted(found)
+
+def content_hash(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+def check_document(data: bytes) -> List[str]:
+    try:
+        cfg = yaml.load(data, Loader=SafeLoader)
+    except yaml.YAMLError as e:
+        return [f"invalid YAML: {str(e).splitlines()[0]}"]
+    if not isinstance(cfg, dict):
+        return ["config must be a YAML mapping"]
+    # policy.py assumes well-formed sections; one bad file must not abort the run
+    bad = [k for k in SECTIONS if k in cfg and not isinstance(cfg[k], dict)]
+    if bad:
+        return [f"{k} must be a mapping (got: {type(cfg[k]).__name__})" for k in bad]
+    try:
+        return validate_config(cfg)
+    except Exception as e:
+        return [f"could not validate: {type(e).__name__}: {e}"]
+
+def check_batch(batch: List[Tuple[str, bytes]]) -> List[Tuple[str, List[str]]]:
+    # Runs in a worker process: one round-trip per batch, not per file
+    return [(digest, check_document(data)) for digest, data in batch]
+
+def load_cache(path: str, fingerprint: str) -> Dict[str, List[str]]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if cache.get("policy") != fingerprint:
+        return {}
+    return cache.get("results", {})
+
+def save_cache(path: str, fingerprint: str, results: Dict[str, List[str]]) -> None:
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"policy": fingerprint, "results": results}, f, separators=(",", ":"))
+    os.replace(tmp, path)
+
+def validate_all(files: List[str], cache: Dict[str, List[str]], workers: Optional[int],
+                 batch_size: int = 256) -> Tuple[Dict[str, List[str]], Dict[str, Any]]:
+    """
+    Returns ({path: errors}, stats). `cache` maps content hash -> errors and is
+    updated in place (and pruned to the current tree), so identical files across
+    services are validated once.
+    """
+    per_file: Dict[str, str] = {}
+    pending: Dict[str, bytes] = {}
+    for path in files:
+        with open(path, "rb") as f:
+            data = f.read()
+        digest = content_hash(data)
+        per_file[path] = digest
+        if digest not in cache:
+            pending[digest] = data
+
+    items = list(pending.items())
+    batches = [items[i:i + batch_size] for i in range(0, len(items), batch_size)]
+    if len(batches) > 1 and workers != 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for results in pool.map(check_batch, batches):
+                cache.update(results)
+    else:
+        for batch in batches:
+            cache.update(check_batch(batch))
+
+    live = set(per_file.values())
+    for digest in [d for d in cache if d not in live]:
+        del cache[digest]
+
+    stats = {
+        "files": len(files),
+        "unique": len(set(per_file.values())),
+        "validated": len(pending),
+        "cached": len(files) - sum(1 for d in per_file.values() if d in pending),
+    }
+    return {path: cache[d] for path, d in per_file.items()}, stats
+
+def print_report(results: Dict[str, List[str]], stats: Dict[str, Any]) -> None:
+    rejected = {p: errs for p, errs in results.items() if errs}
+
+    print("==============================================")
+    print("Bulk Guardrail Validation")
+    print("==============================================")
+    print(f"Files:      {stats['files']}  (unique contents: {stats['unique']})")
+    print(f"Validated:  {stats['validated']}  (cache hits: {stats['cached']})")
+    print(f"Elapsed:    {stats['elapsed_s']:.2f}s")
+    print("")
+
+    if not rejected:
+        print(f"✅ ALL {len(results)} CONFIGS ACCEPTED")
+        return
+
+    print(f"❌ {len(rejected)} CONFIG(S) REJECTED")
+    for path in sorted(rejected):
+        print(f"\n{path}")
+        for e in rejected[path]:
+            print(" -", e)
+
+    # Roll-up: which guardrails fire most often across the repo
+    counts: Dict[str, int] = {}
+    for errs in rejected.values():
+        for e in errs:
+            counts[e] = counts.get(e, 0) + 1
+    print("\nMost common violations:")
+    for e, n in sorted(counts.items(), key=lambda x: x[1], reverse=True)[:10]:
+        print(f" {n:>6}  {e}")
+
+def main():
+    ap = argparse.ArgumentParser(description="Validate many ingress configs against platform guardrails")
+    ap.add_argument("paths", nargs="*", default=["configs"], help="Config files or directories to scan")
+    ap.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    ap.add_argument("--cache", default=CACHE_FILE, help=f"Result cache file (default: {CACHE_FILE})")
+    ap.add_argument("--no-cache", action="store_true", help="Revalidate everything")
+    ap.add_argument("--format", choices=["text", "json"], default="text")
+    args = ap.parse_args()
+
+    start = time.perf_counter()
+    fingerprint = policy_fingerprint()
+    cache = {} if args.no_cache else load_cache(args.cache, fingerprint)
+
+    files = discover(args.paths)
+    results, stats = validate_all(files, cache, args.workers)
+    stats["elapsed_s"] = time.perf_counter() - start
+
+    if not args.no_cache:
+        save_cache(args.cache, fingerprint, cache)
+
+    if args.format == "json":
+        print(json.dumps({
+            "stats": stats,
+            "rejected": {p: errs for p, errs in sorted(results.items()) if errs},
+        }, indent=2))
+    else:
+        print_report(results, stats)
+
+    sys.exit(1 if any(results.values()) else 0)
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,20 @@
 # lesson8/ingress-demo/gateway.py
 
+import os
 import random
+import sys
 import time
 from typing import Dict, Any, Optional
 import yaml
 
 from policy import validate_config
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "shared"))
+import instrument
+
+# routed_total{backend} makes the canary / blue-green split visible
+ROUTED = instrument.REGISTRY.counter("gateway_routed_total", "Requests routed, per backend", labels=("backend",))
+
 #CONFIG_FILE = "config.yaml"
 
 def load_config(path: str) -> Dict[str, Any]:
@@ -48,6 +56,12 @@ def route_request(cfg: Dict[str, Any], headers: Optional[Dict[str, str]] = None)
     - canary: percentage routing to v2, with header override
     - bluegreen: all traffic to active color, with header override
     """
+    backend = _route(cfg, headers)
+    ROUTED.labels(backend).inc()
+    return backend
+
+@instrument.timed("gateway_route_seconds", "Time to pick a backend for one request")
+def _route(cfg: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> str:
     headers = headers or {}
     traffic = cfg["traffic"]
     service = cfg["service"]
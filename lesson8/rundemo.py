@@ -1,8 +1,11 @@
 # lesson8/ingress-demo/run_demo.py
 
+import argparse
+import sys
 import yaml
 import time
 from gateway import (
+    instrument,
     validate_config,
     secure_ingress_check,
     print_banner,
@@ -42,6 +45,10 @@ def run(label, cfg):
     demo_before_after(cfg)
 
 def main():
+    ap = argparse.ArgumentParser(description="Canary + blue/green traffic control demos")
+    ap.add_argument("--metrics", action="store_true", help="Print routing counts and latencies at the end")
+    args = ap.parse_args()
+
     canary = load("configs/canary.yaml")
     bluegreen = load("configs/bluegreen.yaml")
 
@@ -51,6 +58,9 @@ def main():
     print("\n🎯 Demo complete.")
     print("Notice how the *developer intent* changed,")
     print("but the platform behavior stayed secure-by-default.")
+    if args.metrics:
+        print("")
+        instrument.dump(file=sys.stdout)
 
 if __name__ == "__main__":
     main()
@@ -1,9 +1,8 @@
 import json
+from typing import Any, Dict
 from schemas import PlatformEvent
 
-def adapt_github_event(json_path: str) -> PlatformEvent:
-    raw = json.loads(open(json_path, "r", encoding="utf-8").read())
-
+def adapt_github_payload(raw: Dict[str, Any]) -> PlatformEvent:
     # Minimal mapping for demo purposes
     status = raw["deployment"]["status"]          # "success" | "failure"
     evt_type = "deployment.completed" if status == "success" else "deployment.failed"
@@ -22,3 +21,7 @@ def adapt_github_event(json_path: str) -> PlatformEvent:
             "reason": raw["deployment"].get("reason", ""),
         },
     )
+
+def adapt_github_event(json_path: str) -> PlatformEvent:
+    with open(json_path, "r", encoding="utf-8") as f:
+        return adapt_github_payload(json.load(f))
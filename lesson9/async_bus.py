@@ -0,0 +1,177 @@
+import asyncio
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from bus import SubscriptionIndex
+from schemas import PlatformEvent
+
+# asyncio event bus: every subscriber gets its own bounded queue + worker task,
+# so a slow consumer can only ever slow down itself.
+
+Handler = Callable[[PlatformEvent], Any]   # plain function or `async def`
+
+OVERFLOW_POLICIES = ("block", "drop_newest", "drop_oldest")
+
+_STOP = object()
+
+@dataclass
+class Subscription:
+    name: str
+    event_type: str
+    handler: Handler
+    overflow: str
+    queue: "asyncio.Queue[Any]"
+    is_async: bool
+    task: Optional["asyncio.Task[None]"] = None
+
+    # visibility
+    enqueued: int = 0
+    processed: int = 0
+    dropped: int = 0
+    errors: int = 0
+    in_flight: int = 0
+    latency_total_s: float = 0.0
+    latency_max_s: float = 0.0
+    recent_latencies: Deque[float] = field(default_factory=lambda: deque(maxlen=1024))
+    # enqueue times of the queued events, oldest first (mirrors the queue, for lag_seconds)
+    enqueued_at: Deque[float] = field(default_factory=deque)
+
+    def stats(self) -> Dict[str, Any]:
+        recent = sorted(self.recent_latencies)
+        p95 = recent[int(0.95 * (len(recent) - 1))] if recent else 0.0
+        oldest_wait = time.perf_counter() - self.enqueued_at[0] if self.enqueued_at else 0.0
+        return {
+            "event_type": self.event_type,
+            "overflow": self.overflow,
+            "queue_depth": self.queue.qsize(),
+            "queue_max": self.queue.maxsize,
+            "lag_events": self.queue.qsize() + self.in_flight,
+            "lag_seconds": oldest_wait,
+            "enqueued": self.enqueued,
+            "processed": self.processed,
+            "dropped": self.dropped,
+            "errors": self.errors,
+            "latency_avg_ms": 1000 * self.latency_total_s / self.processed if self.processed else 0.0,
+            "latency_p95_ms": 1000 * p95,
+            "latency_max_ms": 1000 * self.latency_max_s,
+        }
+
+class AsyncEventBus:
+    def __init__(self, max_threads: int = 8) -> None:
+        self._index = SubscriptionIndex()
+        self._executor = ThreadPoolExecutor(max_workers=max_threads, thread_name_prefix="bus-handler")
+        self._started = False
+
+    def subscribe(self, event_type: str, handler: Handler, *, maxsize: int = 1000,
+                  overflow: str = "block", name: Optional[str] = None,
+                  service: Optional[str] = None, environment: Optional[str] = None) -> Subscription:
+        """
+        overflow decides what happens when this subscriber's queue is full:
+        - block:       publisher waits (backpressure) until there is room
+        - drop_newest: the incoming event is dropped for this subscriber
+        - drop_oldest: the oldest queued event is evicted to make room
+        """
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"overflow must be one of {OVERFLOW_POLICIES} (got: {overflow})")
+        sub = Subscription(
+            name=name or getattr(handler, "__name__", repr(handler)),
+            event_type=event_type,
+            handler=handler,
+            overflow=overflow,
+            queue=asyncio.Queue(maxsize=maxsize),
+            is_async=asyncio.iscoroutinefunction(handler),
+        )
+        self._index.add(event_type, sub, service, environment)
+        if self._started:
+            sub.task = asyncio.create_task(self._worker(sub), name=f"bus:{sub.name}")
+        return sub
+
+    def _subscribers_for(self, event: PlatformEvent) -> List[Subscription]:
+        # same pattern/filter matching as EventBus
+        return [s.handler for s in self._index.match(event)]
+
+    async def start(self) -> None:
+        self._started = True
+        for sub in self.subscriptions():
+            if sub.task is None:
+                sub.task = asyncio.create_task(self._worker(sub), name=f"bus:{sub.name}")
+
+    async def publish(self, event: PlatformEvent) -> None:
+        if not self._started:
+            await self.start()
+        now = time.perf_counter()
+        item: Tuple[float, PlatformEvent] = (now, event)
+        for sub in self._subscribers_for(event):
+            q = sub.queue
+            if not q.full():
+                q.put_nowait(item)
+            elif sub.overflow == "block":
+                await q.put(item)
+            elif sub.overflow == "drop_newest":
+                sub.dropped += 1
+                continue
+            else:  # drop_oldest
+                q.get_nowait()
+                q.task_done()
+                sub.enqueued_at.popleft()
+                sub.dropped += 1
+                q.put_nowait(item)
+            sub.enqueued_at.append(now)           # same step as the put: stays in queue order
+            sub.enqueued += 1
+
+    async def _worker(self, sub: Subscription) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await sub.queue.get()
+            try:
+                if item is _STOP:
+                    return
+                sub.enqueued_at.popleft()
+                _, event = item
+                started = time.perf_counter()
+                sub.in_flight = 1
+                try:
+                    if sub.is_async:
+                        await sub.handler(event)
+                    else:
+                        await loop.run_in_executor(self._executor, sub.handler, event)
+                except Exception as e:
+                    sub.errors += 1
+                    print(f"[bus] handler {sub.name} failed on {event.type}: {e!r}")
+                elapsed = time.perf_counter() - started
+                sub.in_flight = 0
+                sub.processed += 1
+                sub.latency_total_s += elapsed
+                sub.latency_max_s = max(sub.latency_max_s, elapsed)
+                sub.recent_latencies.append(elapsed)
+            finally:
+                sub.queue.task_done()
+
+    async def drain(self) -> None:
+        """Wait until every subscriber has processed everything queued so far."""
+        await asyncio.gather(*(sub.queue.join() for sub in self.subscriptions()))
+
+    async def close(self) -> None:
+        await self.drain()
+        for sub in self.subscriptions():
+            if sub.task is not None:
+                await sub.queue.put(_STOP)
+        await asyncio.gather(*(s.task for s in self.subscriptions() if s.task is not None))
+        self._executor.shutdown(wait=True)
+        self._started = False
+
+    def subscriptions(self) -> List[Subscription]:
+        return [s.handler for s in self._index.all()]
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {f"{s.name}@{s.event_type}": s.stats() for s in self.subscriptions()}
+
+def print_stats(bus: AsyncEventBus) -> None:
+    print("\n📊 BUS STATS (per subscriber)")
+    print(f"{'subscriber':<48} {'depth':>5} {'lag':>5} {'done':>6} {'drop':>5} {'err':>4} {'avg ms':>8} {'p95 ms':>8}")
+    for key, s in bus.stats().items():
+        print(f"{key:<48} {s['queue_depth']:>5} {s['lag_events']:>5} {s['processed']:>6} "
+              f"{s['dropped']:>5} {s['errors']:>4} {s['latency_avg_ms']:>8.2f} {s['latency_p95_ms']:>8.2f}")
@@ -0,0 +1,100 @@
+import argparse
+import fnmatch
+import random
+import time
+
+from bus import EventBus
+from schemas import PlatformEvent
+
+# Publish cost vs number of subscriptions: trie + cached resolution (EventBus)
+# against re-testing every subscription pattern on every publish. Events are a
+# mix of types, services and environments (--keys distinct ones), timed twice:
+# cold (resolution cache cleared before every publish, so each one walks the
+# trie) and warm (the mix repeats, as a steady stream does).
+#
+#   python3 bench_bus.py --subs 10 100 1000 10000 --keys 2000
+
+def make_patterns(n: int):
+    # mostly subscriptions that do NOT match the hot event type, like a real fleet
+    domains = ["deployment", "incident", "build", "release", "policy"]
+    actions = ["started", "completed", "failed", "rolled_back"]
+    for i in range(n):
+        kind = i % 4
+        if kind == 0:
+            yield f"team{i}.{domains[i % 5]}.{actions[i % 4]}", None
+        elif kind == 1:
+            yield f"team{i}.#", None
+        elif kind == 2:
+            yield f"{domains[i % 5]}.*", f"svc{i}"       # attribute-filtered
+        else:
+            yield f"*.{actions[i % 4]}", f"svc{i}"
+
+class NaiveBus:
+    """Baseline: match every subscription on every publish."""
+
+    def __init__(self) -> None:
+        self._subs = []
+
+    def subscribe(self, pattern, handler, service=None):
+        self._subs.append((pattern.replace("#", "*"), handler, service))
+
+    def publish(self, event):
+        for pattern, handler, service in self._subs:
+            if fnmatch.fnmatchcase(event.type, pattern) and (service is None or service == event.service):
+                handler(event)
+
+def make_events(n_keys: int, n_events: int):
+    """n_events drawn from n_keys distinct (type, service, environment) keys, in random order."""
+    domains = ["deployment", "incident", "build", "release", "policy"]
+    actions = ["started", "completed", "failed", "rolled_back"]
+    keys = []
+    for k in range(n_keys):
+        etype = f"{domains[k % 5]}.{actions[(k // 5) % 4]}"
+        if k % 5 == 4:
+            etype = f"team{k % 100}.{etype}"              # team-scoped types reach the "teamN.#" subscriptions
+        keys.append((etype, f"svc{(k * 7) % 1000}", ("prod", "staging")[k % 2]))
+    rng = random.Random(1)
+    return [PlatformEvent(t, "github", svc, env, "1.2.4", f"run-{i}", {})
+            for i, (t, svc, env) in enumerate(rng.choice(keys) for _ in range(n_events))]
+
+def bench(bus_cls, n_subs: int, events, cold: bool = False) -> float:
+    bus = bus_cls()
+    delivered = [0]
+    def handler(_e):
+        delivered[0] += 1
+    for pattern, service in make_patterns(n_subs):
+        bus.subscribe(pattern, handler, service=service)
+    bus.subscribe("deployment.failed", handler)
+    publish = bus.publish
+    if cold:
+        clear = bus._subs._cache.clear
+        t0 = time.perf_counter()
+        for evt in events:
+            clear()
+            publish(evt)
+        return (time.perf_counter() - t0) / len(events)
+    for evt in events:
+        publish(evt)                                  # warm-up: fill the cache with the key mix
+    t0 = time.perf_counter()
+    for evt in events:
+        publish(evt)
+    return (time.perf_counter() - t0) / len(events)
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--subs", type=int, nargs="+", default=[10, 100, 1000, 10000])
+    ap.add_argument("--events", type=int, default=20000)
+    ap.add_argument("--keys", type=int, default=2000, help="Distinct (type, service, environment) keys")
+    args = ap.parse_args()
+
+    events = make_events(args.keys, args.events)
+    print(f"{args.events:,} events over {args.keys:,} distinct keys (µs per publish)")
+    print(f"{'subscriptions':>13}  {'trie cold':>10}  {'trie warm':>10}  {'naive':>10}")
+    for n in args.subs:
+        cold = bench(EventBus, n, events, cold=True)
+        warm = bench(EventBus, n, events)
+        naive = bench(NaiveBus, n, events[:max(10, args.events // max(1, n // 10))])
+        print(f"{n:>13,}  {cold * 1e6:>10.2f}  {warm * 1e6:>10.2f}  {naive * 1e6:>10.2f}")
+
+if __name__ == "__main__":
+    main()
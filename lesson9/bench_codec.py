@@ -0,0 +1,98 @@
+import argparse
+import json
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Any, Dict
+
+import codec
+from schemas import PlatformEvent
+
+# Memory + serialization speed: slotted/interned PlatformEvent with the binary
+# codec vs a plain dataclass with JSON.
+#
+#   python3 bench_codec.py --events 200000
+
+@dataclass
+class DictEvent:
+    """The previous PlatformEvent shape: regular dataclass, one __dict__ per instance."""
+    type: str
+    source: str
+    service: str
+    environment: str
+    version: str
+    correlation_id: str
+    payload: Dict[str, Any]
+
+SERVICES = ["orders", "payments", "search", "web-frontend"]
+
+def fields(i: int):
+    # build strings at runtime (like a parser would) so nothing is shared by accident
+    return (
+        "deployment." + ("completed" if i % 10 else "failed"),
+        "git" + "hub",
+        SERVICES[i % 4] + "",
+        "".join(["pr", "od"]) if i % 3 else "".join(["stag", "ing"]),
+        f"1.{i % 50}.{i % 7}",
+        f"run-{i}",
+        {"commit": f"{i:07x}", "actor": "ci-bot", "run_url": f"https://ci.example/runs/{i}"},
+    )
+
+def measure_memory(cls, n: int) -> float:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    items = [cls(*fields(i)) for i in range(n)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del items
+    return (after - before) / n
+
+def json_encode(e) -> bytes:
+    return json.dumps({
+        "type": e.type, "source": e.source, "service": e.service, "environment": e.environment,
+        "version": e.version, "correlation_id": e.correlation_id, "payload": e.payload,
+    }, separators=(",", ":")).encode("utf-8")
+
+def json_decode(b: bytes) -> DictEvent:
+    return DictEvent(**json.loads(b))
+
+def timed(fn, items) -> float:
+    t0 = time.perf_counter()
+    for x in items:
+        fn(x)
+    return (time.perf_counter() - t0) / len(items)
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--events", type=int, default=200_000)
+    args = ap.parse_args()
+    n = args.events
+
+    mem_dict = measure_memory(DictEvent, n)
+    mem_slot = measure_memory(PlatformEvent, n)
+
+    dict_events = [DictEvent(*fields(i)) for i in range(n)]
+    slot_events = [PlatformEvent(*fields(i)) for i in range(n)]
+
+    json_blobs = [json_encode(e) for e in dict_events]
+    bin_blobs = [codec.encode(e) for e in slot_events]
+
+    enc_json = timed(json_encode, dict_events)
+    enc_bin = timed(codec.encode, slot_events)
+    dec_json = timed(json_decode, json_blobs)
+    dec_bin = timed(codec.decode, bin_blobs)
+    peek_bin = timed(codec.peek, bin_blobs)
+
+    size_json = sum(map(len, json_blobs)) / n
+    size_bin = sum(map(len, bin_blobs)) / n
+
+    print(f"events: {n:,}\n")
+    print(f"{'':<28} {'dataclass+JSON':>15} {'slots+binary':>13}")
+    print(f"{'memory / event (bytes)':<28} {mem_dict:>15,.0f} {mem_slot:>13,.0f}")
+    print(f"{'wire size / event (bytes)':<28} {size_json:>15,.0f} {size_bin:>13,.0f}")
+    print(f"{'encode (µs / event)':<28} {enc_json * 1e6:>15.2f} {enc_bin * 1e6:>13.2f}")
+    print(f"{'decode (µs / event)':<28} {dec_json * 1e6:>15.2f} {dec_bin * 1e6:>13.2f}")
+    print(f"{'route fields only (µs)':<28} {dec_json * 1e6:>15.2f} {peek_bin * 1e6:>13.2f}  (codec.peek)")
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,232 @@
-from typing import Callable, Dict, List
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+from retry import RetryPolicy, RetryScheduler
 from schemas import PlatformEvent
 
 Handler = Callable[[PlatformEvent], None]
 
+# Topic patterns are dot-separated, like event types:
+#   "deployment.failed"   exact type
+#   "deployment.*"        "*" matches exactly one segment
+#   "*.failed"
+#   "deployment.#"        "#" matches zero or more segments
+#   "*"                   (legacy) every event, same as "#"
+
+class Subscription(NamedTuple):
+    seq: int
+    pattern: str
+    handler: Any                      # Handler, or a per-subscriber object (see async_bus)
+    service: Optional[str]
+    environment: Optional[str]
+    name: str = ""
+    retry: Optional[RetryPolicy] = None
+
+    @property
+    def is_wildcard(self) -> bool:
+        return "*" in self.pattern or "#" in self.pattern
+
+    def accepts(self, event: PlatformEvent) -> bool:
+        return ((self.service is None or self.service == event.service) and
+                (self.environment is None or self.environment == event.environment))
+
+class _Node:
+    __slots__ = ("children", "subs")
+
+    def __init__(self) -> None:
+        self.children: Dict[str, "_Node"] = {}
+        self.subs: List[Subscription] = []
+
+class SubscriptionIndex:
+    """
+    Patterns compiled into a trie keyed by topic segment. Resolving an event
+    walks the trie once per (type, service, environment) and the result is
+    cached, so publish cost doesn't grow with the number of subscriptions.
+    """
+
+    MAX_CACHE = 10_000
+
+    def __init__(self) -> None:
+        self._root = _Node()
+        self._seq = 0
+        self._cache: Dict[Tuple[str, str, str], Tuple[Subscription, ...]] = {}
+
+    def add(self, pattern: str, handler: Any, service: Optional[str] = None,
+            environment: Optional[str] = None, name: Optional[str] = None,
+            retry: Optional[RetryPolicy] = None) -> Subscription:
+        if pattern == "*":
+            pattern = "#"
+        name = name or getattr(handler, "__name__", repr(handler))
+        sub = Subscription(self._seq, pattern, handler, service, environment, name, retry)
+        self._seq += 1
+        node = self._root
+        for seg in pattern.split("."):
+            node = node.children.setdefault(seg, _Node())
+        node.subs.append(sub)
+        self._cache.clear()
+        return sub
+
+    def all(self) -> List[Subscription]:
+        out: List[Subscription] = []
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            out.extend(node.subs)
+            stack.extend(node.children.values())
+        return sorted(out)
+
+    def _collect(self, node: _Node, segs: List[str], i: int, out: List[Subscription]) -> None:
+        if i == len(segs):
+            out.extend(node.subs)
+        else:
+            child = node.children.get(segs[i])
+            if child is not None:
+                self._collect(child, segs, i + 1, out)
+            child = node.children.get("*")
+            if child is not None:
+                self._collect(child, segs, i + 1, out)
+        hash_node = node.children.get("#")
+        if hash_node is not None:
+            # "#" swallows zero..all remaining segments
+            for j in range(i, len(segs) + 1):
+                self._collect(hash_node, segs, j, out)
+
+    def match(self, event: PlatformEvent) -> Tuple[Subscription, ...]:
+        key = (event.type, event.service, event.environment)
+        hit = self._cache.get(key)
+        if hit is not None:
+            return hit
+        found: List[Subscription] = []
+        self._collect(self._root, event.type.split("."), 0, found)
+        # dedupe ("#" can reach the same node twice); exact patterns before wildcards,
+        # then subscription order — the same delivery order as before patterns existed
+        unique = {s.seq: s for s in found if s.accepts(event)}
+        resolved = tuple(sorted(unique.values(), key=lambda s: (s.is_wildcard, s.seq)))
+        if len(self._cache) >= self.MAX_CACHE:
+            self._cache.clear()
+        self._cache[key] = resolved
+        return resolved
+
 # in-memory event bus
+#
+# Each handler runs isolated: an exception is retried per the subscriber's
+# RetryPolicy (scheduled, not slept) and, once attempts run out, written to the
+# dead-letter queue. Other subscribers always get the event.
+#
+# Metrics are opt-in: pass a registry (shared/instrument.py's REGISTRY) and
+# publish / publish_batch are timed, events and failed deliveries counted.
+# Without one the bus pays nothing.
 
 class EventBus:
-    def __init__(self) -> None:
-        self._subs: Dict[str, List[Handler]] = {}
+    def __init__(self, dlq: Any = None, clock: Callable[[], float] = time.time, metrics: Any = None) -> None:
+        self._subs = SubscriptionIndex()
+        self._retries = RetryScheduler()
+        self.dlq = dlq                      # anything with .append(entry: dict), e.g. dlq.DeadLetterQueue
+        self.clock = clock
+        self.failures = 0
+        self._failed = None
+        if metrics is not None:
+            self._instrument(metrics)
+
+    def _instrument(self, metrics: Any) -> None:
+        publish = metrics.histogram("bus_publish_seconds", "Time to publish one event to every subscriber")
+        batch = metrics.histogram("bus_publish_batch_seconds", "Time to publish one batch to every subscriber")
+        events = metrics.counter("bus_events_published_total", "Events published")
+        self._failed = metrics.counter("bus_delivery_failures_total", "Handler exceptions (before retry/DLQ)")
+        # instance attributes shadow the methods, so the uninstrumented path stays untouched
+        timed_publish, timed_batch = publish.timed(self.publish), batch.timed(self.publish_batch)
+
+        def publish_counted(event: PlatformEvent) -> None:
+            events.inc()
+            timed_publish(event)
+
+        def publish_batch_counted(batch_events: List[PlatformEvent]) -> None:
+            events.inc(len(batch_events))
+            timed_batch(batch_events)
 
-    def subscribe(self, event_type: str, handler: Handler) -> None:
-        self._subs.setdefault(event_type, []).append(handler)
+        self.publish = publish_counted
+        self.publish_batch = publish_batch_counted
+
+    def subscribe(self, event_type: str, handler: Handler, *, service: Optional[str] = None,
+                  environment: Optional[str] = None, name: Optional[str] = None,
+                  retry: Optional[RetryPolicy] = None) -> None:
+        self._subs.add(event_type, handler, service, environment, name, retry)
 
     def publish(self, event: PlatformEvent) -> None:
-        # exact match + wildcard "*" for “all events”
-        for h in self._subs.get(event.type, []):
-            h(event)
-        for h in self._subs.get("*", []):
-            h(event)
+        for sub in self._subs.match(event):
+            self._deliver(sub, event, 1)
+
+    def publish_batch(self, events: List[PlatformEvent]) -> None:
+        match = self._subs.match
+        for event in events:
+            for sub in match(event):
+                self._deliver(sub, event, 1)
+
+    def _deliver(self, sub: Subscription, event: PlatformEvent, attempt: int) -> bool:
+        try:
+            sub.handler(event)
+            return True
+        except Exception as e:
+            self.failures += 1
+            if self._failed is not None:
+                self._failed.inc()
+            policy = sub.retry
+            if policy is not None and attempt < policy.max_attempts:
+                self._retries.schedule(self.clock() + policy.delay(attempt + 1), (sub, event, attempt + 1))
+            else:
+                self._dead_letter(sub, event, attempt, e)
+            return False
+
+    def _dead_letter(self, sub: Subscription, event: PlatformEvent, attempts: int, error: Exception) -> None:
+        entry = {
+            "subscriber": sub.name,
+            "pattern": sub.pattern,
+            "attempts": attempts,
+            "error": f"{type(error).__name__}: {error}",
+            "failed_at": datetime.now(timezone.utc).isoformat(),
+            "event": event.to_dict(),
+        }
+        if self.dlq is not None:
+            self.dlq.append(entry)
+        else:
+            print(f"[bus] {sub.name} failed on {event.type} after {attempts} attempt(s): {entry['error']}",
+                  file=sys.stderr)
+
+    # --- retries ---
+
+    def run_due(self, now: Optional[float] = None, limit: Optional[int] = None) -> int:
+        """Re-deliver every retry that is due; returns how many were attempted."""
+        due = self._retries.pop_due(self.clock() if now is None else now, limit)
+        for sub, event, attempt in due:
+            self._deliver(sub, event, attempt)
+        return len(due)
+
+    def next_retry_at(self) -> Optional[float]:
+        return self._retries.next_due()
+
+    @property
+    def pending_retries(self) -> int:
+        return len(self._retries)
+
+    def run_until_idle(self, max_wait_s: float = 60.0) -> None:
+        """Block until no retries are pending (CLI/demo helper; services call run_due from their loop)."""
+        deadline = self.clock() + max_wait_s
+        while self.pending_retries and self.clock() < deadline:
+            wait = (self.next_retry_at() or 0) - self.clock()
+            if wait > 0:
+                time.sleep(min(wait, max(0.0, deadline - self.clock())))
+            self.run_due()
+
+    # --- dead-letter re-drive ---
+
+    def redeliver(self, subscriber: str, event: PlatformEvent) -> None:
+        """Deliver straight to the named subscriber (no retry/DLQ); raises if its handler fails."""
+        subs = [s for s in self._subs.all() if s.name == subscriber]
+        if not subs:
+            raise KeyError(f"no subscriber named {subscriber!r}")
+        for sub in subs:
+            if sub.accepts(event):
+                sub.handler(event)
+                return
+        raise KeyError(f"subscriber {subscriber!r} does not accept {event.type} for {event.service}")
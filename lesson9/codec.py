@@ -0,0 +1,132 @@
+import json
+import struct
+from typing import Any, Dict, Iterator, Tuple, Union
+
+from schemas import PlatformEvent
+
+# Compact binary wire format for PlatformEvent (version 1).
+#
+#   offset  size  field
+#   0       1     format version (1)
+#   1       1     len(type)            \
+#   2       1     len(source)           |  low-cardinality strings, <= 255 bytes
+#   3       1     len(service)          |
+#   4       1     len(environment)     /
+#   5       1     len(version)             <= 255 bytes
+#   6       2     len(correlation_id)      <= 65535 bytes
+#   8       4     len(payload)
+#   12      ...   the strings (utf-8), back to back, then the payload (compact JSON)
+#
+# The header is fixed-size, so routing fields can be read with `peek` straight
+# out of a buffer / mmap without touching (or copying) the payload. Only the
+# low-cardinality fields go through the encode/decode caches: version and
+# correlation_id change with nearly every event and would just churn them.
+
+VERSION = 1
+HEADER = struct.Struct("<6BHI")
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+_ENCODED: Dict[str, bytes] = {}       # str -> utf-8 for low-cardinality fields
+_DECODED: Dict[bytes, str] = {}       # utf-8 -> (interned) str
+_CACHE_LIMIT = 4096
+
+def _enc(s: str) -> bytes:
+    b = _ENCODED.get(s)
+    if b is None:
+        b = s.encode("utf-8")
+        if len(_ENCODED) >= _CACHE_LIMIT:
+            _ENCODED.clear()
+        _ENCODED[s] = b
+    return b
+
+def _too_long(field: str, value: bytes, limit: int) -> ValueError:
+    return ValueError(f"PlatformEvent.{field} is {len(value):,} bytes, the wire format allows at most "
+                      f"{limit:,}: {value[:40]!r}...")
+
+def _dec(view: memoryview) -> str:
+    # read-only memoryview slices hash/compare like bytes: cache hits decode without copying
+    try:
+        s = _DECODED.get(view)
+    except (TypeError, ValueError):   # slices of writable buffers (bytearray) are unhashable
+        view = view.tobytes()
+        s = _DECODED.get(view)
+    if s is None:
+        b = bytes(view)
+        s = b.decode("utf-8")
+        if len(_DECODED) >= _CACHE_LIMIT:
+            _DECODED.clear()
+        _DECODED[b] = s
+    return s
+
+_dumps = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False).encode
+_scan = json.JSONDecoder().scan_once      # C scanner, skips json.loads' Python-level checks
+
+def _loads(text: str) -> Any:
+    return _scan(text, 0)[0]
+
+def encode(event: PlatformEvent) -> bytes:
+    t = _enc(event.type)
+    src = _enc(event.source)
+    svc = _enc(event.service)
+    env = _enc(event.environment)
+    ver = event.version.encode("utf-8")
+    cid = event.correlation_id.encode("utf-8")
+    payload = _dumps(event.payload).encode("utf-8") if event.payload else b""
+    if len(t) > 255 or len(src) > 255 or len(svc) > 255 or len(env) > 255 or len(ver) > 255 \
+            or len(cid) > 0xFFFF or len(payload) > 0xFFFFFFFF:
+        # checked here, not left to HEADER.pack: struct.error wouldn't say which field
+        for field, value, limit in (("type", t, 255), ("source", src, 255), ("service", svc, 255),
+                                    ("environment", env, 255), ("version", ver, 255),
+                                    ("correlation_id", cid, 0xFFFF), ("payload", payload, 0xFFFFFFFF)):
+            if len(value) > limit:
+                raise _too_long(field, value, limit)
+    return b"".join((
+        HEADER.pack(VERSION, len(t), len(src), len(svc), len(env), len(ver), len(cid), len(payload)),
+        t, src, svc, env, ver, cid, payload,
+    ))
+
+def decode(buf: Buffer, offset: int = 0) -> Tuple[PlatformEvent, int]:
+    """Decode one event at `offset`; returns (event, offset of the next event)."""
+    version, lt, lsrc, lsvc, lenv, lver, lcid, lpay = HEADER.unpack_from(buf, offset)
+    if version != VERSION:
+        raise ValueError(f"unsupported PlatformEvent wire format version: {version}")
+    view = buf if isinstance(buf, memoryview) else memoryview(buf)
+    p = offset + HEADER.size
+    n = lt + lsrc + lsvc + lenv + lver + lcid
+    text = str(view[p:p + n], "utf-8")
+    if len(text) == n:
+        # ASCII (the common case): byte lengths are char lengths, slice the one decoded str
+        a = lt; b = a + lsrc; c = b + lsvc; d = c + lenv; e = d + lver
+        etype, source, service, env, ver, cid = text[:a], text[a:b], text[b:c], text[c:d], text[d:e], text[e:]
+    else:
+        etype = _dec(view[p:p + lt]); p += lt
+        source = _dec(view[p:p + lsrc]); p += lsrc
+        service = _dec(view[p:p + lsvc]); p += lsvc
+        env = _dec(view[p:p + lenv]); p += lenv
+        ver = str(view[p:p + lver], "utf-8"); p += lver
+        cid = str(view[p:p + lcid], "utf-8")
+    p = offset + HEADER.size + n
+    payload = _loads(str(view[p:p + lpay], "utf-8")) if lpay else {}
+    return PlatformEvent(etype, source, service, env, ver, cid, payload), p + lpay
+
+def peek(buf: Buffer, offset: int = 0) -> Tuple[str, str, str]:
+    """(type, service, environment) without decoding the payload — enough to route/filter."""
+    version, lt, lsrc, lsvc, lenv, *_ = HEADER.unpack_from(buf, offset)
+    if version != VERSION:
+        raise ValueError(f"unsupported PlatformEvent wire format version: {version}")
+    view = buf if isinstance(buf, memoryview) else memoryview(buf)
+    p = offset + HEADER.size
+    etype = _dec(view[p:p + lt])
+    p += lt + lsrc
+    service = _dec(view[p:p + lsvc])
+    p += lsvc
+    return etype, service, _dec(view[p:p + lenv])
+
+def iter_decode(buf: Buffer) -> Iterator[PlatformEvent]:
+    """Decode a buffer of back-to-back encoded events."""
+    view = buf if isinstance(buf, memoryview) else memoryview(buf)
+    offset, end = 0, len(view)
+    while offset < end:
+        event, offset = decode(view, offset)
+        yield event
@@ -0,0 +1,127 @@
+import argparse
+import json
+import os
+from typing import Any, Dict, Iterator, List, Optional
+
+from bus import EventBus
+from schemas import PlatformEvent
+
+# Persisted dead-letter queue: one JSON entry per line (NDJSON), appended by the
+# bus once a subscriber has used up its retries. The CLI lists entries and
+# re-drives them to their subscriber in batches.
+#
+#   python3 dlq.py list .dlq.ndjson
+#   python3 dlq.py redrive .dlq.ndjson --batch-size 100 [--subscriber issue_consumer]
+
+class DeadLetterQueue:
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+    def append(self, entry: Dict[str, Any]) -> None:
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+    def count(self) -> int:
+        return sum(1 for _ in self)
+
+    def size(self) -> int:
+        return os.path.getsize(self.path) if os.path.exists(self.path) else 0
+
+    def rewrite(self, entries: List[Dict[str, Any]], read_up_to: int) -> int:
+        """
+        Replace the first `read_up_to` bytes of the file with `entries`. Anything
+        appended after that point (new dead letters during a re-drive) is kept.
+        Atomic: a crash leaves either the old or the new file. Returns the byte
+        length of the rewritten prefix (the next call's `read_up_to`).
+        """
+        tmp = self.path + ".tmp"
+        written = 0
+        with open(tmp, "wb") as out:
+            for entry in entries:
+                written += out.write((json.dumps(entry, separators=(",", ":")) + "\n").encode("utf-8"))
+            if os.path.exists(self.path):
+                with open(self.path, "rb") as f:
+                    f.seek(read_up_to)
+                    out.write(f.read())
+        os.replace(tmp, self.path)
+        return written
+
+def redrive(dlq: DeadLetterQueue, bus: EventBus, batch_size: int = 100,
+            subscriber: Optional[str] = None) -> Dict[str, int]:
+    """
+    Re-deliver dead letters batch by batch. After each batch the file is
+    rewritten without the delivered entries, so an interrupted run can simply
+    be started again.
+    """
+    read_up_to = dlq.size()
+    entries = list(dlq)
+    stats = {"redriven": 0, "failed": 0, "skipped": 0}
+    i = 0
+    while i < len(entries):
+        batch = entries[i:i + batch_size]
+        keep: List[Dict[str, Any]] = []
+        for entry in batch:
+            if subscriber and entry["subscriber"] != subscriber:
+                keep.append(entry)
+                stats["skipped"] += 1
+                continue
+            try:
+                bus.redeliver(entry["subscriber"], PlatformEvent.from_dict(entry["event"]))
+                stats["redriven"] += 1
+            except Exception as e:
+                entry["attempts"] = entry.get("attempts", 0) + 1
+                entry["error"] = f"{type(e).__name__}: {e}"
+                keep.append(entry)
+                stats["failed"] += 1
+        entries[i:i + batch_size] = keep
+        i += len(keep)
+        # only our prefix: entries appended meanwhile stay after it, untouched
+        read_up_to = dlq.rewrite(entries, read_up_to)
+    return stats
+
+def main():
+    ap = argparse.ArgumentParser(description="Inspect and re-drive the lesson9 dead-letter queue")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p_list = sub.add_parser("list", help="Show dead-lettered deliveries")
+    p_list.add_argument("path")
+    p_redrive = sub.add_parser("redrive", help="Re-deliver dead letters to their subscriber")
+    p_redrive.add_argument("path")
+    p_redrive.add_argument("--batch-size", type=int, default=100)
+    p_redrive.add_argument("--subscriber", default=None, help="Only re-drive this subscriber's entries")
+    p_redrive.add_argument("--enable", default="", help="Same as run_demo.py --enable")
+    args = ap.parse_args()
+
+    dlq = DeadLetterQueue(args.path)
+    if args.cmd == "list":
+        n = 0
+        for n, entry in enumerate(dlq, 1):
+            evt = entry["event"]
+            print(f"{n:>4}  {entry['subscriber']:<24} {evt['type']:<22} {evt['service']:<14} "
+                  f"attempts={entry['attempts']}  {entry['error']}")
+        print(f"\n{n} dead-lettered deliveries in {args.path}")
+        return
+
+    # the consumers a re-drive targets are the same ones run_demo wires up
+    from run_demo import wire_consumers
+    bus = EventBus()
+    wire_consumers(bus, args.enable)
+    stats = redrive(dlq, bus, batch_size=args.batch_size, subscriber=args.subscriber)
+
+    print("==============================================")
+    print(f"DLQ re-drive: {args.path}")
+    print("==============================================")
+    print(f"Re-driven:  {stats['redriven']}")
+    print(f"Failed:     {stats['failed']}  (kept, attempts incremented)")
+    print(f"Skipped:    {stats['skipped']}")
+    print(f"Remaining:  {dlq.count()}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+import argparse
+import bisect
+import json
+import mmap
+import os
+import struct
+import time
+import zlib
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+import codec
+from schemas import PlatformEvent
+
+# Durable, append-only event log (a tiny local Kafka partition).
+#
+# <dir>/
+#   00000000000000000000.log     records: header + PlatformEvent (codec.py wire format)
+#   00000000000000000000.index   sparse index: (relative offset, file position, timestamp)
+#   00000000000000052113.log     next segment, named by its first offset
+#   offsets.json                 committed offset per consumer
+#
+# Segments are read through mmap; the index is sparse (one entry every few KB),
+# so lookups are bisect-on-index + a short forward scan.
+
+RECORD_HEADER = struct.Struct("<IIQd")   # payload length, crc32, offset, timestamp
+INDEX_ENTRY = struct.Struct("<IId")      # relative offset, position, timestamp
+LOG_SUFFIX = ".log"
+INDEX_SUFFIX = ".index"
+OFFSETS_FILE = "offsets.json"
+
+class LogRecord(NamedTuple):
+    offset: int
+    timestamp: float
+    event: PlatformEvent
+
+def encode_event(event: PlatformEvent) -> bytes:
+    return codec.encode(event)
+
+def decode_event(data: bytes) -> PlatformEvent:
+    if data[:1] == b"[":
+        # logs written before the binary codec stored a JSON array per record
+        return PlatformEvent(*json.loads(data))
+    return codec.decode(data)[0]
+
+class Segment:
+    def __init__(self, directory: str, base_offset: int) -> None:
+        self.base_offset = base_offset
+        name = f"{base_offset:020d}"
+        self.log_path = os.path.join(directory, name + LOG_SUFFIX)
+        self.index_path = os.path.join(directory, name + INDEX_SUFFIX)
+        self.index: List[Tuple[int, int, float]] = []
+        if os.path.exists(self.index_path):
+            with open(self.index_path, "rb") as f:
+                raw = f.read()
+            usable = len(raw) - len(raw) % INDEX_ENTRY.size
+            self.index = list(INDEX_ENTRY.iter_unpack(raw[:usable]))
+
+    def size(self) -> int:
+        try:
+            return os.path.getsize(self.log_path)
+        except FileNotFoundError:
+            return 0
+
+    @staticmethod
+    def scan(mm, position: int, end: int) -> Iterator[Tuple[int, int, float, bytes]]:
+        """Yield (position, offset, timestamp, payload) for every valid record from `position`."""
+        hsize = RECORD_HEADER.size
+        unpack_from = RECORD_HEADER.unpack_from
+        while position + hsize <= end:
+            length, crc, offset, ts = unpack_from(mm, position)
+            start = position + hsize
+            if start + length > end:
+                return
+            payload = mm[start:start + length]
+            if zlib.crc32(payload) != crc:
+                return   # torn or corrupt tail
+            yield position, offset, ts, payload
+            position = start + length
+
+    def seek_offset(self, offset: int) -> int:
+        i = bisect.bisect_right(self.index, (offset - self.base_offset, float("inf"))) - 1
+        return self.index[i][1] if i >= 0 else 0
+
+    def seek_time(self, ts: float) -> int:
+        # index timestamps are non-decreasing; start one entry early to not skip matches
+        i = bisect.bisect_left([e[2] for e in self.index], ts) - 1
+        return self.index[i][1] if i >= 0 else 0
+
+class EventLog:
+    def __init__(self, directory: str, segment_bytes: int = 64 * 1024 * 1024,
+                 index_interval_bytes: int = 4096, fsync: bool = False) -> None:
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.index_interval_bytes = index_interval_bytes
+        self.fsync = fsync
+        os.makedirs(directory, exist_ok=True)
+
+        bases = sorted(int(n[:-len(LOG_SUFFIX)]) for n in os.listdir(directory) if n.endswith(LOG_SUFFIX))
+        self.segments: List[Segment] = [Segment(directory, b) for b in bases] or [Segment(directory, 0)]
+        self._next_offset = self._recover(self.segments[-1])
+        self._open_active()
+
+    # --- write path ---
+
+    def _recover(self, seg: Segment) -> int:
+        """Drop a torn trailing record (crash mid-write) and return the next offset."""
+        size = seg.size()
+        next_offset, valid_end = seg.base_offset, 0
+        if size:
+            start = 0
+            if seg.index and seg.index[-1][1] < size:
+                # the indexed record is the first one scanned: if it is the torn
+                # one, its offset is the next to hand out
+                rel, start, _ = seg.index[-1]
+                next_offset = seg.base_offset + rel
+            with open(seg.log_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                valid_end = start
+                for pos, offset, _, payload in seg.scan(mm, start, size):
+                    valid_end = pos + RECORD_HEADER.size + len(payload)
+                    next_offset = offset + 1
+            if valid_end < size:
+                os.truncate(seg.log_path, valid_end)
+        seg.index = [e for e in seg.index if e[1] < valid_end]
+        with open(seg.index_path, "wb") as f:
+            f.write(b"".join(INDEX_ENTRY.pack(*e) for e in seg.index))
+        return next_offset
+
+    def _open_active(self) -> None:
+        seg = self.segments[-1]
+        self._log = open(seg.log_path, "ab", buffering=1024 * 1024)
+        self._idx = open(seg.index_path, "ab")
+        self._position = seg.size()
+        self._last_indexed = seg.index[-1][1] if seg.index else -self.index_interval_bytes
+
+    def _roll(self) -> None:
+        self.flush()
+        self._log.close()
+        self._idx.close()
+        self.segments.append(Segment(self.directory, self._next_offset))
+        self._open_active()
+
+    def append(self, event: PlatformEvent, timestamp: Optional[float] = None) -> int:
+        if self._position >= self.segment_bytes:
+            self._roll()
+        ts = time.time() if timestamp is None else timestamp
+        payload = encode_event(event)
+        offset = self._next_offset
+        if self._position - self._last_indexed >= self.index_interval_bytes:
+            seg = self.segments[-1]
+            entry = (offset - seg.base_offset, self._position, ts)
+            seg.index.append(entry)
+            self._idx.write(INDEX_ENTRY.pack(*entry))
+            self._last_indexed = self._position
+        self._log.write(RECORD_HEADER.pack(len(payload), zlib.crc32(payload), offset, ts) + payload)
+        self._position += RECORD_HEADER.size + len(payload)
+        self._next_offset = offset + 1
+        return offset
+
+    def flush(self) -> None:
+        self._log.flush()
+        self._idx.flush()
+        if self.fsync:
+            os.fsync(self._log.fileno())
+            os.fsync(self._idx.fileno())
+
+    def close(self) -> None:
+        self.flush()
+        self._log.close()
+        self._idx.close()
+
+    def __enter__(self) -> "EventLog":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    @property
+    def next_offset(self) -> int:
+        return self._next_offset
+
+    # --- read path ---
+
+    def _read_segment(self, seg: Segment, position: int, min_offset: int,
+                      min_ts: float) -> Iterator[LogRecord]:
+        size = seg.size()
+        if size == 0:
+            return
+        with open(seg.log_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for _, offset, ts, payload in seg.scan(mm, position, size):
+                if offset >= min_offset and ts >= min_ts:
+                    yield LogRecord(offset, ts, decode_event(payload))
+
+    def read(self, offset: int = 0, timestamp: Optional[float] = None) -> Iterator[LogRecord]:
+        """Yield records starting at `offset` (or the first record at/after `timestamp`)."""
+        self.flush()
+        if timestamp is not None:
+            firsts = [seg.index[0][2] if seg.index else float("-inf") for seg in self.segments]
+            start = max(0, bisect.bisect_right(firsts, timestamp) - 1)
+            for seg in self.segments[start:]:
+                pos = seg.seek_time(timestamp) if seg is self.segments[start] else 0
+                yield from self._read_segment(seg, pos, offset, timestamp)
+            return
+
+        start = max(0, bisect.bisect_right([s.base_offset for s in self.segments], offset) - 1)
+        for seg in self.segments[start:]:
+            pos = seg.seek_offset(offset) if seg is self.segments[start] else 0
+            yield from self._read_segment(seg, pos, offset, float("-inf"))
+
+    # --- consumer offsets ---
+
+    def _offsets_path(self) -> str:
+        return os.path.join(self.directory, OFFSETS_FILE)
+
+    def offsets(self) -> Dict[str, int]:
+        try:
+            with open(self._offsets_path(), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def committed(self, consumer: str) -> int:
+        """Next offset `consumer` should read (0 if it never committed)."""
+        return self.offsets().get(consumer, 0)
+
+    def commit(self, consumer: str, next_offset: int) -> None:
+        offsets = self.offsets()
+        offsets[consumer] = next_offset
+        tmp = self._offsets_path() + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(offsets, f, indent=2, sort_keys=True)
+        os.replace(tmp, self._offsets_path())
+
+    def replay(self, consumer: str, handler: Callable[[PlatformEvent], None],
+               from_offset: Optional[int] = None, from_timestamp: Optional[float] = None,
+               commit_every: int = 1000) -> int:
+        """
+        Deliver history to `handler`, resuming from the consumer's committed offset
+        unless an explicit offset/timestamp is given. Commits as it goes, so a
+        crash mid-replay resumes close to where it stopped.
+        """
+        offset = self.committed(consumer) if from_offset is None else from_offset
+        delivered, next_offset = 0, offset
+        for rec in self.read(offset, from_timestamp):
+            handler(rec.event)
+            delivered += 1
+            next_offset = rec.offset + 1
+            if delivered % commit_every == 0:
+                self.commit(consumer, next_offset)
+        if delivered or from_offset is not None or from_timestamp is not None:
+            self.commit(consumer, next_offset)
+        return delivered
+
+def parse_time(value: str) -> float:
+    dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+def main():
+    ap = argparse.ArgumentParser(description="Inspect or replay the durable event log")
+    ap.add_argument("log_dir", help="Event log directory (e.g. .eventlog)")
+    ap.add_argument("--consumer", help="Replay as this consumer from its committed offset, then commit")
+    ap.add_argument("--from-offset", type=int, default=None, help="Start at this offset")
+    ap.add_argument("--from-time", default=None, help="Start at this ISO-8601 timestamp")
+    args = ap.parse_args()
+
+    ts = parse_time(args.from_time) if args.from_time else None
+    with EventLog(args.log_dir) as log:
+        print(f"Log: {args.log_dir}  segments={len(log.segments)}  next_offset={log.next_offset}")
+        if args.consumer:
+            before = log.committed(args.consumer)
+            def show(evt: PlatformEvent) -> None:
+                print(f"- [{evt.type}] {evt.service} {evt.version} → {evt.environment} ({evt.correlation_id})")
+            n = log.replay(args.consumer, show, from_offset=args.from_offset, from_timestamp=ts)
+            print(f"\n{args.consumer}: replayed {n} event(s) from offset {args.from_offset if args.from_offset is not None else before}"
+                  f", committed {log.committed(args.consumer)}")
+            return
+        for rec in log.read(args.from_offset or 0, ts):
+            when = datetime.fromtimestamp(rec.timestamp, timezone.utc).isoformat()
+            e = rec.event
+            print(f"{rec.offset:>8}  {when}  [{e.type}] {e.service} {e.version} → {e.environment} ({e.correlation_id})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+import heapq
+import itertools
+from dataclasses import dataclass
+from typing import Any, List, Optional, Tuple
+
+# Retry scheduling without sleeping threads: failed deliveries go into a
+# min-heap keyed by due time, and whoever drives the bus calls run_due()
+# (from its loop, a timer, or between batches). Scheduling is O(log n), so
+# overhead stays flat even with 100k retries pending.
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    max_attempts: int = 3          # total attempts, including the first delivery
+    base_delay_s: float = 1.0
+    multiplier: float = 2.0
+    max_delay_s: float = 300.0
+
+    def delay(self, attempt: int) -> float:
+        """Delay before `attempt` (2 = first retry): base, base*m, base*m^2, ... capped."""
+        return min(self.max_delay_s, self.base_delay_s * self.multiplier ** (attempt - 2))
+
+class RetryScheduler:
+    def __init__(self) -> None:
+        self._heap: List[Tuple[float, int, Any]] = []
+        self._seq = itertools.count()      # tie-breaker: FIFO for equal due times
+
+    def schedule(self, due: float, item: Any) -> None:
+        heapq.heappush(self._heap, (due, next(self._seq), item))
+
+    def pop_due(self, now: float, limit: Optional[int] = None) -> List[Any]:
+        out = []
+        heap = self._heap
+        while heap and heap[0][0] <= now and (limit is None or len(out) < limit):
+            out.append(heapq.heappop(heap)[2])
+        return out
+
+    def next_due(self) -> Optional[float]:
+        return self._heap[0][0] if self._heap else None
+
+    def __len__(self) -> int:
+        return len(self._heap)
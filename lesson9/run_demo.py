@@ -1,5 +1,11 @@
 import argparse
+import asyncio
+import os
 from bus import EventBus
+from dlq import DeadLetterQueue
+from retry import RetryPolicy
+from async_bus import AsyncEventBus, print_stats
+from event_log import EventLog
 from adapters.github_adapter import adapt_github_event
 from consumers.issue_consumer import issue_consumer
 from consumers.notify_consumer import notify_consumer
@@ -10,11 +16,42 @@ def new_consumer(event):
     print("\n🧩 NEW CONSUMER (added later)")
     print(f"- Doing something new with: {event.type} / {event.service}")
 
+def flaky_consumer(event):
+    # demo-only: a downstream that is down (set FLAKY_CONSUMER_OK=1 to "fix" it before a re-drive)
+    if os.environ.get("FLAKY_CONSUMER_OK") != "1":
+        raise ConnectionError("ticketing API unavailable (503)")
+    print(f"\n🩹 FLAKY CONSUMER recovered: handled {event.type} / {event.service}")
+
+def wire_consumers(bus, enable: str = "") -> None:
+    # Consumers subscribe to events (decoupled)
+    bus.subscribe("*", notify_consumer)
+    bus.subscribe("deployment.completed", deploy_marker_consumer)
+    bus.subscribe("deployment.failed", deploy_marker_consumer)
+    bus.subscribe("deployment.failed", issue_consumer)
+
+    if enable == "new_consumer":
+        bus.subscribe("*", new_consumer)
+    if enable == "flaky_consumer":
+        # fails every time: retried with backoff, then dead-lettered; the others still run
+        bus.subscribe("*", flaky_consumer, retry=RetryPolicy(max_attempts=3, base_delay_s=0.2))
+
+async def publish_async(evt, enable: str = "") -> None:
+    # Same consumers, but each gets its own queue + worker: a slow one can't block the rest
+    bus = AsyncEventBus()
+    wire_consumers(bus, enable)
+    await bus.publish(evt)
+    await bus.close()
+    print_stats(bus)
+
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("event_json", help="Path to sample GitHub event JSON")
-    ap.add_argument("--enable", default="", help="Optional: enable 'new_consumer'")
+    ap.add_argument("--enable", default="", help="Optional: enable 'new_consumer' or 'flaky_consumer'")
     ap.add_argument("--fanout", action="store_true", help="Print a fan-out summary")
+    ap.add_argument("--async", dest="use_async", action="store_true",
+                    help="Dispatch via the asyncio bus (per-consumer queues + workers)")
+    ap.add_argument("--log", default="", help="Optional: also append the event to a durable log directory")
+    ap.add_argument("--dlq", default="", help="Optional: dead-letter queue file (NDJSON) for failed deliveries")
     args = ap.parse_args()
 
     print("==============================================")
@@ -22,16 +59,8 @@ def main():
     print("Adapter → Normalized Event Stream → Consumers")
     print("==============================================\n")
 
-    bus = EventBus()
-
-    # Consumers subscribe to events (decoupled)
-    bus.subscribe("*", notify_consumer)
-    bus.subscribe("deployment.completed", deploy_marker_consumer)
-    bus.subscribe("deployment.failed", deploy_marker_consumer)
-    bus.subscribe("deployment.failed", issue_consumer)
-
-    if args.enable == "new_consumer":
-        bus.subscribe("*", new_consumer)
+    bus = EventBus(dlq=DeadLetterQueue(args.dlq) if args.dlq else None)
+    wire_consumers(bus, args.enable)
 
     # Adapter converts inbound GitHub event into platform schema
     evt = adapt_github_event(args.event_json)
@@ -43,8 +72,21 @@ def main():
     print(f"- version: {evt.version}")
     print(f"- correlation_id: {evt.correlation_id}")
 
+    if args.log:
+        with EventLog(args.log) as log:
+            offset = log.append(evt)
+        print(f"\n💾 Appended to durable log {args.log} at offset {offset}")
+
     print("\n➡️ Publishing event on bus...")
-    bus.publish(evt)
+    if args.use_async:
+        asyncio.run(publish_async(evt, args.enable))
+    else:
+        bus.publish(evt)
+        if bus.pending_retries:
+            print(f"\n⏳ {bus.pending_retries} failed delivery(ies) scheduled for retry...")
+            bus.run_until_idle()
+        if args.dlq and bus.failures:
+            print(f"\n📮 Exhausted retries go to {args.dlq} (re-drive: python3 dlq.py redrive {args.dlq})")
 
     if args.fanout:
         print("\n🔁 FAN-OUT SUMMARY")
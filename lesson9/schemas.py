@@ -1,9 +1,14 @@
-from dataclasses import dataclass
+import sys
+from dataclasses import dataclass, fields
 from typing import Dict, Any
 
 # platform event schema
+#
+# slots=True: no per-instance __dict__ (millions of events in flight on the bus / in the log).
+# type/source/service/environment are low-cardinality, so they are interned: every
+# "deployment.completed" across all events is the same str object.
 
-@dataclass
+@dataclass(slots=True)
 class PlatformEvent:
     type: str                 # e.g., "deployment.completed", "deployment.failed"
     source: str               # e.g., "github"
@@ -12,3 +17,16 @@ class PlatformEvent:
     version: str              # e.g., "1.2.3"
     correlation_id: str       # tie multiple events together
     payload: Dict[str, Any]   # flexible details (commit, actor, url, etc.)
+
+    def __post_init__(self) -> None:
+        self.type = sys.intern(self.type)
+        self.source = sys.intern(self.source)
+        self.service = sys.intern(self.service)
+        self.environment = sys.intern(self.environment)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {f.name: getattr(self, f.name) for f in fields(self)}
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "PlatformEvent":
+        return cls(**d)
@@ -0,0 +1,268 @@
+import argparse
+import heapq
+import random
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from bus import EventBus
+from schemas import PlatformEvent
+
+# Aggregation window between the bus and consumers.
+#
+#   raw bus --(deployment.#)--> WindowStage --(1 aggregated event per window)--> consumer bus
+#
+# A flapping pipeline that emits 30 deployment.failed events for the same run
+# becomes ONE event (with a count) per window, so consumers create one marker /
+# one issue instead of thirty.
+
+Key = Tuple[str, ...]
+
+KEY_FUNCS: Dict[str, Callable[[PlatformEvent], Key]] = {
+    "correlation_id": lambda e: (e.correlation_id,),
+    "service_env": lambda e: (e.service, e.environment),
+}
+
+def payload_time(event: PlatformEvent) -> Optional[float]:
+    """Event time from payload["ts"] (epoch seconds or ISO-8601), if the producer set it."""
+    ts = event.payload.get("ts")
+    if ts is None:
+        return None
+    if isinstance(ts, (int, float)):
+        return float(ts)
+    return datetime.fromisoformat(str(ts).replace("Z", "+00:00")).timestamp()
+
+@dataclass
+class Window:
+    key: Key
+    start: float
+    end: float                    # tumbling: fixed; session: last event + gap
+    first_ts: float
+    last_ts: float
+    last: PlatformEvent
+    count: int = 0
+    types: Dict[str, int] = field(default_factory=dict)
+    versions: List[str] = field(default_factory=list)
+
+    def add(self, event: PlatformEvent, ts: float) -> None:
+        self.count += 1
+        self.types[event.type] = self.types.get(event.type, 0) + 1
+        if event.version not in self.versions:
+            self.versions.append(event.version)
+        self.first_ts = min(self.first_ts, ts)
+        if ts >= self.last_ts:
+            self.last_ts = ts
+            self.last = event
+
+class WindowStage:
+    def __init__(self, downstream: EventBus, key: str = "correlation_id", mode: str = "tumbling",
+                 size_s: float = 60.0, gap_s: float = 30.0, allowed_lateness_s: float = 5.0,
+                 max_open_windows: int = 10_000, late_policy: str = "drop",
+                 event_time: Callable[[PlatformEvent], Optional[float]] = payload_time,
+                 clock: Callable[[], float] = time.time) -> None:
+        if key not in KEY_FUNCS:
+            raise ValueError(f"key must be one of {sorted(KEY_FUNCS)} (got: {key})")
+        if mode not in ("tumbling", "session"):
+            raise ValueError(f"mode must be 'tumbling' or 'session' (got: {mode})")
+        if late_policy not in ("drop", "passthrough"):
+            raise ValueError(f"late_policy must be 'drop' or 'passthrough' (got: {late_policy})")
+        self.downstream = downstream
+        self.key_func = KEY_FUNCS[key]
+        self.mode = mode
+        self.size_s = size_s
+        self.gap_s = gap_s
+        self.allowed_lateness_s = allowed_lateness_s
+        self.max_open_windows = max_open_windows
+        self.late_policy = late_policy
+        self.event_time = event_time
+        self.clock = clock
+
+        self._open: Dict[Tuple[Key, float], Window] = {}   # tumbling: (key, start); session: (key, 0)
+        self._closing: List[Tuple[float, Tuple[Key, float]]] = []   # heap of (end, window id)
+        self._max_ts = float("-inf")
+        self.counters = {"received": 0, "emitted": 0, "suppressed": 0, "late": 0, "evicted": 0}
+
+    # --- watermark ---
+
+    @property
+    def watermark(self) -> float:
+        return self._max_ts - self.allowed_lateness_s
+
+    def advance(self, now: Optional[float] = None) -> int:
+        """Move the watermark with processing time (closes idle windows when no events arrive)."""
+        now = self.clock() if now is None else now
+        self._max_ts = max(self._max_ts, now)
+        return self._close_ready()
+
+    # --- processing ---
+
+    def __call__(self, event: PlatformEvent) -> None:
+        self.process(event)
+
+    def process(self, event: PlatformEvent) -> None:
+        self.counters["received"] += 1
+        ts = self.event_time(event)
+        if ts is None:
+            ts = self.clock()
+
+        key = self.key_func(event)
+        if self.mode == "tumbling":
+            start = ts - (ts % self.size_s)
+            wid, end = (key, start), start + self.size_s
+        else:
+            wid, start, end = (key, 0.0), ts, ts + self.gap_s
+
+        win = self._open.get(wid)
+        if win is None and end <= self.watermark:
+            # its window has already closed (or would have): late data
+            self.counters["late"] += 1
+            if self.late_policy == "passthrough":
+                self._emit_single(event)
+            return
+
+        if self.mode == "session" and win is not None and ts > win.end:
+            # gap exceeded: the old session is done, start a new one
+            self._emit(self._open.pop(wid))
+            win = None
+
+        if win is None:
+            if len(self._open) >= self.max_open_windows:
+                self._evict_one()
+            win = Window(key, start, end, ts, ts, event)
+            self._open[wid] = win
+            heapq.heappush(self._closing, (end, wid))
+        elif self.mode == "session" and end > win.end:
+            win.end = end
+            heapq.heappush(self._closing, (end, wid))   # older heap entry becomes stale
+
+        win.add(event, ts)
+        self._max_ts = max(self._max_ts, ts)
+        self._close_ready()
+
+    def _close_ready(self) -> int:
+        closed = 0
+        wm = self.watermark
+        while self._closing and self._closing[0][0] <= wm:
+            end, wid = heapq.heappop(self._closing)
+            win = self._open.get(wid)
+            if win is None or win.end != end:
+                continue     # stale entry (session was extended or already emitted)
+            self._emit(self._open.pop(wid))
+            closed += 1
+        return closed
+
+    def _evict_one(self) -> None:
+        # bounded state: close the window that would close soonest anyway
+        while self._closing:
+            end, wid = heapq.heappop(self._closing)
+            win = self._open.get(wid)
+            if win is not None and win.end == end:
+                self._emit(self._open.pop(wid))
+                self.counters["evicted"] += 1
+                return
+
+    def flush(self) -> None:
+        for wid in sorted(self._open, key=lambda w: self._open[w].end):
+            self._emit(self._open[wid])
+        self._open.clear()
+        self._closing.clear()
+
+    # --- output ---
+
+    def _emit(self, win: Window) -> None:
+        last = win.last
+        payload = dict(last.payload)
+        payload["window"] = {
+            "mode": self.mode,
+            "key": list(win.key),
+            "count": win.count,
+            "types": win.types,
+            "versions": win.versions,
+            "first_ts": win.first_ts,
+            "last_ts": win.last_ts,
+        }
+        self.counters["emitted"] += 1
+        self.counters["suppressed"] += win.count - 1
+        # the aggregate carries the window's latest state, so existing consumers work unchanged
+        self.downstream.publish(PlatformEvent(
+            type=last.type, source=last.source, service=last.service, environment=last.environment,
+            version=last.version, correlation_id=last.correlation_id, payload=payload,
+        ))
+
+    def _emit_single(self, event: PlatformEvent) -> None:
+        self.counters["emitted"] += 1
+        self.downstream.publish(event)
+
+    def metrics(self) -> Dict[str, Any]:
+        c = self.counters
+        return {
+            **c,
+            "open_windows": len(self._open),
+            "suppression_rate": c["suppressed"] / c["received"] if c["received"] else 0.0,
+            "watermark": self.watermark,
+        }
+
+def flapping_events(n: int, runs: int, seed: int, start: float) -> List[PlatformEvent]:
+    """A flapping pipeline: the same few runs retrying and failing over and over."""
+    rng = random.Random(seed)
+    out = []
+    t = start
+    for i in range(n):
+        run = rng.randrange(runs)
+        t += rng.uniform(0.1, 3.0)
+        jitter = rng.uniform(-4.0, 0.0) if rng.random() < 0.1 else 0.0   # some arrive out of order
+        out.append(PlatformEvent(
+            type=rng.choice(["deployment.failed", "deployment.failed", "deployment.completed"]),
+            source="github", service=["orders", "payments"][run % 2], environment="prod",
+            version=f"1.2.{run}", correlation_id=f"run-{2000 + run}",
+            payload={"ts": t + jitter, "attempt": i, "run_url": f"https://ci.example/runs/{2000 + run}"},
+        ))
+    return out
+
+def main():
+    ap = argparse.ArgumentParser(description="Demo: collapse a deployment event storm with windows")
+    ap.add_argument("--events", type=int, default=300)
+    ap.add_argument("--runs", type=int, default=4, help="Distinct pipeline runs (correlation_ids)")
+    ap.add_argument("--key", choices=sorted(KEY_FUNCS), default="correlation_id")
+    ap.add_argument("--mode", choices=["tumbling", "session"], default="tumbling")
+    ap.add_argument("--size", type=float, default=60.0, help="Tumbling window size (seconds)")
+    ap.add_argument("--gap", type=float, default=30.0, help="Session gap (seconds)")
+    ap.add_argument("--lateness", type=float, default=2.0, help="Allowed lateness (seconds)")
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args()
+
+    # downstream consumers just count what they would have done
+    issues = {"raw": 0, "windowed": 0}
+    def issue_counter(kind):
+        def handler(event: PlatformEvent) -> None:
+            if event.type == "deployment.failed":
+                issues[kind] += 1
+        return handler
+
+    raw_bus, consumer_bus = EventBus(), EventBus()
+    consumer_bus.subscribe("deployment.failed", issue_counter("windowed"))
+    stage = WindowStage(consumer_bus, key=args.key, mode=args.mode, size_s=args.size,
+                        gap_s=args.gap, allowed_lateness_s=args.lateness)
+    raw_bus.subscribe("deployment.#", stage)
+    raw_bus.subscribe("deployment.failed", issue_counter("raw"))
+
+    for evt in flapping_events(args.events, args.runs, args.seed, start=1_760_000_000.0):
+        raw_bus.publish(evt)
+    stage.flush()
+
+    m = stage.metrics()
+    print("==============================================")
+    print(f"Windowing: {args.mode} windows keyed by {args.key}")
+    print("==============================================")
+    print(f"Events received:     {m['received']}")
+    print(f"Aggregates emitted:  {m['emitted']}")
+    print(f"Suppressed:          {m['suppressed']}  ({m['suppression_rate']:.0%})")
+    print(f"Late (dropped):      {m['late']}")
+    print(f"Evicted (bounded):   {m['evicted']}")
+    print("")
+    print(f"Issues without windowing: {issues['raw']}")
+    print(f"Issues with windowing:    {issues['windowed']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,400 @@
+"""
+Low-overhead metrics shared by the lesson servers and pipelines.
+
+  counters     monotonically increasing counts (requests, events, failures)
+  histograms   latency distributions, HDR-style: log-linear buckets with 64
+               sub-buckets per power of two, so any value from 1ns to ~73
+               minutes is recorded within ~3% and p50/p99/max come out exact
+               to that precision (no pre-chosen bucket boundaries to get wrong)
+
+Hot path: every thread writes to its own shard (a plain list), so observing
+takes no lock and never loses an increment; shards are only summed when
+someone reads (a /metrics scrape or a CLI dump). Shards are keyed by thread
+ident, which gets reused, so thread-per-request servers don't grow them.
+bench_instrument.py checks each recording operation against a 1µs budget;
+for time()/timed that is what they add beyond an empty with-block or wrapper
+reading the clock twice, which any Python timer pays.
+
+  import instrument
+  LATENCY = instrument.REGISTRY.histogram("jwt_verify_seconds", "Time to verify a bearer token")
+
+  @LATENCY.timed
+  def verify_jwt(token): ...
+
+  with LATENCY.time():
+      ...
+
+  print(instrument.render_prometheus())   # Prometheus text format (/metrics)
+  instrument.dump()                       # human-readable table (CLIs)
+
+Lessons import it from the repo's shared/ directory:
+  sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "shared"))
+"""
+
+import functools
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from time import perf_counter_ns
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, TextIO, Tuple, Union
+from urllib.parse import urlparse
+
+_get_ident = threading.get_ident
+
+SIG_BITS = 6                     # 64 sub-buckets per power of two -> <= 1/32 relative error
+MAX_SHIFT = 36                   # up to 2**42 ns (~73 min); larger values land in the top bucket
+_SUB = 1 << SIG_BITS
+_NBUCKETS = (MAX_SHIFT + 1) << SIG_BITS
+_TOP = _NBUCKETS - 1
+_SUM = _NBUCKETS                 # shard slot holding the sum of observed ns
+
+# Prometheus `le` buckets (seconds) derived from the HDR counts at scrape time
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def bucket_index(ns: int) -> int:
+    e = ns.bit_length()
+    if e <= SIG_BITS:
+        return ns
+    shift = e - SIG_BITS
+    return (shift << SIG_BITS) | (ns >> shift) if shift <= MAX_SHIFT else _TOP
+
+def bucket_bounds(idx: int) -> Tuple[int, int]:
+    """[low, high] ns covered by bucket `idx`."""
+    shift, m = idx >> SIG_BITS, idx & (_SUB - 1)
+    if shift == 0:
+        return m, m
+    return m << shift, ((m + 1) << shift) - 1
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self) -> None:
+        self._shards: Dict[int, List[int]] = {}
+        self._lock = threading.Lock()
+
+    def _new_shard(self) -> List[int]:
+        with self._lock:
+            return self._shards.setdefault(_get_ident(), [0])
+
+    def inc(self, n: int = 1) -> None:
+        try:
+            shard = self._shards[_get_ident()]
+        except KeyError:
+            shard = self._new_shard()
+        shard[0] += n
+
+    @property
+    def value(self) -> int:
+        return sum(s[0] for s in list(self._shards.values()))
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self.buckets = tuple(sorted(buckets))
+        self._shards: Dict[int, List[int]] = {}
+        self._lock = threading.Lock()
+
+    def _new_shard(self) -> List[int]:
+        with self._lock:
+            return self._shards.setdefault(_get_ident(), [0] * (_NBUCKETS + 1))
+
+    def observe_ns(self, ns: int) -> None:
+        try:
+            shard = self._shards[_get_ident()]
+        except KeyError:
+            shard = self._new_shard()
+        if ns < 0:
+            ns = 0
+        e = ns.bit_length()
+        if e <= SIG_BITS:
+            shard[ns] += 1
+        else:
+            shift = e - SIG_BITS
+            shard[(shift << SIG_BITS) | (ns >> shift) if shift <= MAX_SHIFT else _TOP] += 1
+        shard[_SUM] += ns
+
+    def observe(self, seconds: float) -> None:
+        self.observe_ns(int(seconds * 1e9))
+
+    def time(self) -> "_Timing":
+        """`with hist.time(): ...` records the block's wall-clock duration."""
+        return _Timing(self)
+
+    def timed(self, fn: Callable) -> Callable:
+        """Decorator: record each call's duration (including calls that raise)."""
+        shards, new_shard = self._shards, self._new_shard
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            t0 = perf_counter_ns()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                # observe_ns inlined: the extra call would cost more than the bucketing
+                ns = perf_counter_ns() - t0
+                try:
+                    shard = shards[_get_ident()]
+                except KeyError:
+                    shard = new_shard()
+                e = ns.bit_length()
+                if e <= SIG_BITS:
+                    shard[ns] += 1
+                else:
+                    e -= SIG_BITS
+                    shard[(e << SIG_BITS) | (ns >> e) if e <= MAX_SHIFT else _TOP] += 1
+                shard[_SUM] += ns
+        return wrapper
+
+    # --- reading (sums the per-thread shards) ---
+
+    def snapshot(self) -> "Snapshot":
+        merged = [0] * (_NBUCKETS + 1)
+        for shard in list(self._shards.values()):
+            for i, v in enumerate(shard):
+                if v:
+                    merged[i] += v
+        return Snapshot(merged)
+
+class _Timing:
+    __slots__ = ("hist", "t0")
+
+    def __init__(self, hist: Histogram) -> None:
+        self.hist = hist
+
+    def __enter__(self) -> "_Timing":
+        self.t0 = perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        ns = perf_counter_ns() - self.t0
+        hist = self.hist
+        try:
+            shard = hist._shards[_get_ident()]
+        except KeyError:
+            shard = hist._new_shard()
+        e = ns.bit_length()                 # observe_ns, inlined as in Histogram.timed
+        if e <= SIG_BITS:
+            shard[ns] += 1
+        else:
+            e -= SIG_BITS
+            shard[(e << SIG_BITS) | (ns >> e) if e <= MAX_SHIFT else _TOP] += 1
+        shard[_SUM] += ns
+
+class Snapshot:
+    """Merged histogram counts; values are reported in seconds."""
+
+    def __init__(self, counts: List[int]) -> None:
+        self.sum_ns = counts[_SUM]
+        self.nonzero = [(i, c) for i, c in enumerate(counts[:_NBUCKETS]) if c]
+        self.count = sum(c for _, c in self.nonzero)
+
+    @property
+    def sum(self) -> float:
+        return self.sum_ns / 1e9
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+    @property
+    def max(self) -> float:
+        return bucket_bounds(self.nonzero[-1][0])[1] / 1e9 if self.nonzero else 0.0
+
+    def quantile(self, q: float) -> float:
+        """Highest value (within bucket precision) at or below which `q` of observations fall."""
+        if not self.count:
+            return 0.0
+        rank = max(1, int(q * self.count + 0.5))
+        seen = 0
+        for idx, c in self.nonzero:
+            seen += c
+            if seen >= rank:
+                return bucket_bounds(idx)[1] / 1e9
+        return self.max
+
+    def cumulative(self, bounds: Sequence[float]) -> Iterator[Tuple[float, int]]:
+        """(le, count of observations <= le) for Prometheus buckets."""
+        i, seen = 0, 0
+        for le in bounds:
+            le_ns = le * 1e9
+            while i < len(self.nonzero) and bucket_bounds(self.nonzero[i][0])[0] <= le_ns:
+                seen += self.nonzero[i][1]
+                i += 1
+            yield le, seen
+
+Metric = Union[Counter, Histogram]
+
+class Family:
+    """A metric with labels; `.labels(...)` returns (and caches) the child for one label set."""
+
+    def __init__(self, factory: Callable[[], Metric], labelnames: Sequence[str]) -> None:
+        self.factory = factory
+        self.labelnames = tuple(labelnames)
+        self.kind = factory().kind
+        self.children: Dict[Tuple[str, ...], Metric] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values: str) -> Metric:
+        child = self.children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"expected labels {self.labelnames}, got {values}")
+            with self._lock:
+                child = self.children.setdefault(values, self.factory())
+        return child
+
+class Registry:
+    def __init__(self) -> None:
+        self.metrics: Dict[str, Tuple[str, Union[Metric, Family]]] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, name: str, help: str, kind: str, make: Callable[[], Union[Metric, Family]]):
+        with self._lock:
+            if name in self.metrics:
+                existing = self.metrics[name][1]
+                if existing.kind != kind:
+                    raise ValueError(f"metric {name!r} already registered as a {existing.kind}")
+                return existing
+            metric = make()
+            self.metrics[name] = (help, metric)
+            return metric
+
+    def counter(self, name: str, help: str = "", labels: Sequence[str] = ()) -> Union[Counter, Family]:
+        return self._get(name, help, "counter", lambda: Family(Counter, labels) if labels else Counter())
+
+    def histogram(self, name: str, help: str = "", labels: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Union[Histogram, Family]:
+        make = functools.partial(Histogram, buckets)
+        return self._get(name, help, "histogram", lambda: Family(make, labels) if labels else make())
+
+    def collect(self) -> Iterator[Tuple[str, str, str, List[Tuple[Dict[str, str], Metric]]]]:
+        """(name, help, kind, [(labels, metric)]) for every registered metric, sorted by name."""
+        for name in sorted(self.metrics):
+            help, m = self.metrics[name]
+            if isinstance(m, Family):
+                series = [(dict(zip(m.labelnames, values)), child) for values, child in sorted(m.children.items())]
+            else:
+                series = [({}, m)]
+            yield name, help, m.kind, series
+
+REGISTRY = Registry()
+
+def timed(name: str, help: str = "", registry: Registry = REGISTRY) -> Callable[[Callable], Callable]:
+    """`@timed("x_seconds")`: shorthand for registering a histogram and decorating with it."""
+    return registry.histogram(name, help).timed
+
+# --- output ---
+
+def _labels(labels: Dict[str, str], extra: Optional[Tuple[str, str]] = None) -> str:
+    items = list(labels.items()) + ([extra] if extra else [])
+    if not items:
+        return ""
+    esc = lambda v: str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+    return "{" + ",".join(f'{k}="{esc(v)}"' for k, v in items) + "}"
+
+def render_prometheus(registry: Registry = REGISTRY) -> str:
+    """Prometheus text exposition format (version 0.0.4)."""
+    out: List[str] = []
+    for name, help, kind, series in registry.collect():
+        out.append(f"# HELP {name} {help or name}")
+        out.append(f"# TYPE {name} {kind}")
+        for labels, m in series:
+            if kind == "counter":
+                out.append(f"{name}{_labels(labels)} {m.value}")
+                continue
+            snap = m.snapshot()
+            for le, n in snap.cumulative(m.buckets):
+                out.append(f"{name}_bucket{_labels(labels, ('le', f'{le:g}'))} {n}")
+            out.append(f"{name}_bucket{_labels(labels, ('le', '+Inf'))} {snap.count}")
+            out.append(f"{name}_sum{_labels(labels)} {snap.sum:.9g}")
+            out.append(f"{name}_count{_labels(labels)} {snap.count}")
+    return "\n".join(out) + "\n"
+
+def fmt_duration(seconds: float) -> str:
+    for unit, scale in (("s", 1.0), ("ms", 1e-3), ("µs", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.3g}{unit}"
+    return f"{seconds * 1e9:.0f}ns"
+
+def dump(registry: Registry = REGISTRY, file: TextIO = sys.stderr) -> None:
+    """Human-readable summary for CLIs: counters, then count/mean/p50/p90/p99/max per histogram."""
+    rows = [(name + _labels(labels), kind, m) for name, _, kind, series in registry.collect() for labels, m in series]
+    if not rows:
+        return
+    width = max(len(r[0]) for r in rows)
+    print("==============================================", file=file)
+    print("Metrics", file=file)
+    print("==============================================", file=file)
+    for series, kind, m in rows:
+        if kind == "counter":
+            print(f"{series:<{width}}  {m.value:>10,}", file=file)
+    hists = [(s, snap) for s, kind, m in rows if kind == "histogram" for snap in [m.snapshot()] if snap.count]
+    if hists:
+        print(f"{'':<{width}}  {'count':>10} {'mean':>8} {'p50':>8} {'p90':>8} {'p99':>8} {'max':>8}", file=file)
+        for series, snap in hists:
+            cells = [snap.mean, snap.quantile(0.5), snap.quantile(0.9), snap.quantile(0.99), snap.max]
+            print(f"{series:<{width}}  {snap.count:>10,} " + " ".join(f"{fmt_duration(v):>8}" for v in cells),
+                  file=file)
+
+# --- HTTP ---
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+def send_metrics(handler: BaseHTTPRequestHandler, registry: Registry = REGISTRY) -> None:
+    """Answer the current request with the registry in Prometheus format (for http.server handlers)."""
+    body = render_prometheus(registry).encode("utf-8")
+    handler.send_response(200)
+    handler.send_header("Content-Type", CONTENT_TYPE)
+    handler.send_header("Content-Length", str(len(body)))
+    handler.end_headers()
+    handler.wfile.write(body)
+
+HTTP_REQUESTS = REGISTRY.histogram("http_request_duration_seconds", "HTTP request latency",
+                                   labels=("method", "path", "code"))
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    """
+    Mixin for http.server handlers: times every request into
+    http_request_duration_seconds{method,path,code}. Paths not listed in
+    `metric_paths` are labelled "other" so unknown URLs can't blow up the
+    number of series.
+
+      class Handler(instrument.MetricsHandler):
+          metric_paths = ("/platform/resource", "/metrics")
+    """
+
+    metric_paths: Sequence[str] = ()
+
+    def send_response(self, code, message=None):
+        self._metrics_code = code
+        super().send_response(code, message)
+
+    def handle_one_request(self):
+        # a malformed request line is answered before path/command are parsed, and on
+        # keep-alive connections the previous request's values would still be there
+        self._metrics_code = None
+        self.path, self.command = "", None
+        t0 = perf_counter_ns()
+        super().handle_one_request()
+        if self._metrics_code is not None:
+            path = urlparse(getattr(self, "path", "")).path
+            HTTP_REQUESTS.labels(self.command or "other", path if path in self.metric_paths else "other",
+                                 str(self._metrics_code)).observe_ns(perf_counter_ns() - t0)
+
+def start_http_server(port: int, host: str = "127.0.0.1", registry: Registry = REGISTRY) -> ThreadingHTTPServer:
+    """Serve /metrics from a daemon thread, for long-running processes that aren't HTTP servers."""
+    class _Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if urlparse(self.path).path != "/metrics":
+                self.send_error(404)
+                return
+            send_metrics(self, registry)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
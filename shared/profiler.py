@@ -0,0 +1,166 @@
+"""
+`--profile` for the lesson CLIs: where does the time go on real data?
+
+  phases      wall-clock breakdown of the run (load, parse, compute, render),
+              printed as a table at the end
+  sampler     signal-based stack sampling: a timer signal (SIGPROF for CPU
+              time, SIGALRM for wall time) interrupts the main thread every few
+              milliseconds and the handler records its Python stack. Nothing
+              is traced per call, so overhead stays around a percent
+  output      <path>.collapsed         one "frame;frame;frame count" per stack
+                                       (flamegraph.pl, inferno, speedscope)
+              <path>.speedscope.json   open at https://www.speedscope.app
+
+Each sample's root frame is the phase it was taken in, so the flame graph
+splits by phase first.
+
+  ap = argparse.ArgumentParser()
+  profiler.add_arguments(ap)
+  args = ap.parse_args()
+  prof = profiler.from_args(args)
+  with prof.phase("load"):
+      ...
+  prof.finish()
+
+Unix only (signal.setitimer); samples the main thread.
+"""
+
+import argparse
+import collections
+import json
+import os
+import signal
+import sys
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, TextIO, Tuple
+
+Frame = Tuple[str, str, int]            # (function, file, first line)
+
+MODES = {"cpu": ("ITIMER_PROF", "SIGPROF"), "wall": ("ITIMER_REAL", "SIGALRM")}
+
+class Profile:
+    def __init__(self, enabled: bool = False, out: str = "profile", interval_s: float = 0.005,
+                 mode: str = "cpu") -> None:
+        self.enabled = enabled
+        self.out = out
+        self.interval_s = interval_s
+        self.mode = mode
+        self.phases: Dict[str, float] = {}            # insertion order = first-entered order
+        self.current = "(no phase)"
+        self.samples: collections.Counter = collections.Counter()
+        self._start = time.perf_counter()
+        self._prev_handler = None
+        if enabled:
+            self._start_sampler()
+
+    # --- phases ---
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        outer, self.current = self.current, name
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - t0
+            self.current = outer
+
+    # --- sampler ---
+
+    def _start_sampler(self) -> None:
+        if not hasattr(signal, "setitimer"):
+            raise SystemExit("--profile needs signal.setitimer (Linux/macOS)")
+        timer, sig = (getattr(signal, n) for n in MODES[self.mode])
+        self._timer, self._sig = timer, sig
+        self._prev_handler = signal.signal(sig, self._sample)
+        signal.setitimer(timer, self.interval_s, self.interval_s)
+
+    def _sample(self, signum, frame) -> None:
+        stack: List[Frame] = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append((code.co_name, code.co_filename, code.co_firstlineno))
+            frame = frame.f_back
+        stack.append((f"phase:{self.current}", "", 0))
+        stack.reverse()
+        self.samples[tuple(stack)] += 1
+
+    def _stop_sampler(self) -> None:
+        signal.setitimer(self._timer, 0, 0)
+        signal.signal(self._sig, self._prev_handler or signal.SIG_DFL)
+
+    # --- output ---
+
+    def finish(self, file: TextIO = sys.stderr) -> None:
+        """Stop sampling, write the profiles and print the phase breakdown (no-op unless enabled)."""
+        if not self.enabled:
+            return
+        self._stop_sampler()
+        self.enabled = False
+        total = time.perf_counter() - self._start
+        os.makedirs(os.path.dirname(self.out) or ".", exist_ok=True)
+        write_collapsed(self.samples, f"{self.out}.collapsed")
+        write_speedscope(self.samples, f"{self.out}.speedscope.json", self.interval_s,
+                         name=os.path.basename(sys.argv[0]), mode=self.mode)
+        print_phases(self.phases, total, file)
+        n = sum(self.samples.values())
+        print(f"{n:,} {self.mode} samples every {self.interval_s * 1000:g}ms -> "
+              f"{self.out}.collapsed, {self.out}.speedscope.json", file=file)
+
+def frame_label(frame: Frame) -> str:
+    name, filename, line = frame
+    if not filename:
+        return name
+    return f"{name} ({os.path.basename(filename)}:{line})"
+
+def write_collapsed(samples: collections.Counter, path: str) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        for stack, n in sorted(samples.items(), key=lambda kv: -kv[1]):
+            f.write(";".join(frame_label(fr).replace(";", ":") for fr in stack) + f" {n}\n")
+
+def write_speedscope(samples: collections.Counter, path: str, interval_s: float, name: str = "profile",
+                     mode: str = "cpu") -> None:
+    frames: Dict[Frame, int] = {}
+    stacks, weights = [], []
+    for stack, n in samples.items():
+        stacks.append([frames.setdefault(fr, len(frames)) for fr in stack])
+        weights.append(n * interval_s)
+    doc = {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "shared": {"frames": [{"name": fn, **({"file": f, "line": line} if f else {})}
+                              for fn, f, line in frames]},
+        "profiles": [{"type": "sampled", "name": f"{name} ({mode})", "unit": "seconds",
+                      "startValue": 0, "endValue": sum(weights), "samples": stacks, "weights": weights}],
+        "name": name,
+        "exporter": "shared/profiler.py",
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(doc, f)
+
+def print_phases(phases: Dict[str, float], total: float, file: TextIO = sys.stderr) -> None:
+    print("==============================================", file=file)
+    print("Profile: wall-clock by phase", file=file)
+    print("==============================================", file=file)
+    rows = list(phases.items())
+    other = total - sum(phases.values())
+    if other > 0.00005:
+        rows.append(("(other)", other))
+    for name, secs in rows:
+        pct = 100 * secs / total if total else 0.0
+        print(f"{name:<12} {secs * 1000:11.2f}ms  {pct:5.1f}%  {'█' * int(pct / 2.5)}", file=file)
+    print(f"{'total':<12} {total * 1000:11.2f}ms", file=file)
+
+def add_arguments(ap: argparse.ArgumentParser) -> None:
+    # a plain flag: an optional PATH would swallow the next positional argument
+    ap.add_argument("--profile", action="store_true",
+                    help="Print time per phase and write a sampled flame graph (see --profile-out)")
+    ap.add_argument("--profile-out", default=None, metavar="PATH",
+                    help="Write PATH.collapsed + PATH.speedscope.json (default: profile; implies --profile)")
+    ap.add_argument("--profile-interval-ms", type=float, default=5.0, help="Sampling interval")
+    ap.add_argument("--profile-mode", choices=sorted(MODES), default="cpu",
+                    help="cpu: CPU time only (SIGPROF); wall: include waiting on I/O (SIGALRM)")
+
+def from_args(args: argparse.Namespace) -> Profile:
+    return Profile(enabled=args.profile or args.profile_out is not None, out=args.profile_out or "profile",
+                   interval_s=args.profile_interval_ms / 1000.0, mode=args.profile_mode)